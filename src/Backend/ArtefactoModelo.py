@@ -0,0 +1,234 @@
+import json
+import mmap
+import os
+import pickle as pk
+import struct
+import time
+import zlib
+
+# Formato de archivo de los modelos guardados (versión 1).
+#
+#   magia (8 bytes) | versión (uint32) | longitud de la cabecera (uint64) | cabecera JSON
+#   | relleno hasta múltiplo de 64 | sección de datos
+#
+# La cabecera JSON lleva los metadatos que la interfaz necesita (columnas,
+# métricas, fórmula, descripción, dicColumnaSalida, el preprocesado ajustado
+# como dict de PipelinePreprocesado.aDiccionario...) y un índice de la
+# sección de datos, así que puede leerse sin deserializar el estimador. En la
+# sección de datos va el estimador en pickle protocolo 5; los arrays de numpy
+# grandes (p.ej. el conjunto de entrenamiento que guarda un KNN o un SVR) se
+# sacan del pickle como buffers fuera de banda, alineados a 64 bytes. Cada
+# buffer se guarda comprimido con zlib si se comprime bien, o tal cual si no,
+# en cuyo caso al cargar se proyecta en memoria (mmap) sin copiarlo. En Windows
+# no se proyecta: un archivo proyectado no se puede sustituir con os.replace
+# mientras el modelo siga cargado, y no se podría volver a guardar en su ruta.
+
+magiaArtefacto = b"PIPEMDL\n"
+versionArtefacto = 1
+
+# Campos del diccionario del modelo que van en la cabecera JSON (el resto, al pickle)
+camposCabecera = ["columnasEntrada", "columnaSalida", "metricas", "formula", "descripcion", "dicColumnaSalida",
+                  "preprocesado"]
+
+_alineacion = 64
+# Los buffers menores que esto se quedan dentro del pickle
+_minBytesFueraDeBanda = 64 * 1024
+# Se comprime si la muestra baja de esta proporción del tamaño original
+_umbralCompresion = 0.75
+_tamMuestraCompresion = 1 << 20
+_prefijo = struct.Struct("<8sIQ")
+_proyectarBuffers = os.name != "nt"
+
+
+def _relleno(posicion):
+    return -posicion % _alineacion
+
+
+def _aJson(valor):
+    """Convierte escalares de numpy y similares a tipos nativos para json."""
+    if hasattr(valor, "item"):
+        return valor.item()
+    return str(valor)
+
+
+def _cabeceraDesdeDiccionario(datosModelo):
+    metadatos = {campo: datosModelo.get(campo) for campo in camposCabecera}
+    dicSalida = metadatos["dicColumnaSalida"]
+    # Las claves de dicColumnaSalida pueden no ser texto (bool, números): se guardan como pares
+    metadatos["dicColumnaSalida"] = [[k, v] for k, v in dicSalida.items()] if dicSalida else None
+    preprocesado = metadatos["preprocesado"]
+    if hasattr(preprocesado, "aDiccionario"):
+        metadatos["preprocesado"] = preprocesado.aDiccionario()
+    estimador = datosModelo.get("modelo")
+    metadatos["tipoEstimador"] = type(estimador).__name__ if estimador is not None else None
+    metadatos["guardado"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    return metadatos
+
+
+def _diccionarioDesdeCabecera(cabecera):
+    metadatos = {campo: cabecera["metadatos"].get(campo) for campo in camposCabecera}
+    pares = metadatos["dicColumnaSalida"]
+    metadatos["dicColumnaSalida"] = {k: v for k, v in pares} if pares else None
+    return metadatos
+
+
+def _comprimirSiCompensa(vista):
+    """Devuelve los bytes comprimidos si la compresión ahorra lo suficiente; si no, None."""
+    muestra = vista[:_tamMuestraCompresion]
+    if len(zlib.compress(muestra, 1)) > _umbralCompresion * len(muestra):
+        return None
+    comprimido = zlib.compress(vista, 1)
+    return comprimido if len(comprimido) <= _umbralCompresion * len(vista) else None
+
+
+#Entradas: dict, str -> Salidas: None
+def guardarArtefacto(datosModelo, ruta):
+    """
+    Escribe el diccionario del modelo (como el de crearDiccionarioModelo) en `ruta`.
+
+    Se escribe en un archivo temporal y se renombra al final: si el modelo
+    anterior de esa ruta sigue proyectado en memoria, no se corrompe.
+    """
+    buffers = []
+
+    def alSerializarBuffer(buffer):
+        vista = buffer.raw()
+        if vista.nbytes < _minBytesFueraDeBanda:
+            return True  # dentro del pickle
+        buffers.append(vista)
+        return False
+
+    carga = {k: v for k, v in datosModelo.items() if k not in camposCabecera}
+    bytesPickle = pk.dumps(carga, protocol=5, buffer_callback=alSerializarBuffer)
+
+    # Índice de la sección de datos (desplazamientos relativos a su inicio)
+    indice, trozos, posicion = [], [], 0
+    for datos, compresion in [(bytesPickle, None)] + [(v, "zlib") for v in buffers]:
+        if compresion:
+            comprimido = _comprimirSiCompensa(datos)
+            if comprimido is None:
+                compresion = None
+            else:
+                datos = comprimido
+        longitud = datos.nbytes if isinstance(datos, memoryview) else len(datos)
+        indice.append({"posicion": posicion, "longitud": longitud, "compresion": compresion})
+        trozos.append(datos)
+        posicion += longitud + _relleno(longitud)
+
+    cabecera = json.dumps({
+        "metadatos": _cabeceraDesdeDiccionario(datosModelo),
+        "pickle": indice[0],
+        "buffers": indice[1:],
+    }, ensure_ascii=False, default=_aJson).encode("utf-8")
+
+    descriptor, rutaTemporal = _crearTemporal(ruta)
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(_prefijo.pack(magiaArtefacto, versionArtefacto, len(cabecera)))
+            f.write(cabecera)
+            f.write(b"\0" * _relleno(_prefijo.size + len(cabecera)))
+            for datos, entrada in zip(trozos, indice):
+                f.write(datos)
+                f.write(b"\0" * _relleno(entrada["longitud"]))
+        if os.path.exists(ruta):
+            # Al sustituir un modelo se conservan sus permisos
+            os.chmod(rutaTemporal, os.stat(ruta).st_mode & 0o777)
+        os.replace(rutaTemporal, ruta)
+    except BaseException:
+        if os.path.exists(rutaTemporal):
+            os.remove(rutaTemporal)
+        raise
+
+
+def _crearTemporal(ruta):
+    """
+    Crea un archivo temporal junto a `ruta`. Devuelve (descriptor, rutaTemporal).
+
+    Se crea con 0666 para que el sistema aplique la umask como con open()
+    (mkstemp lo dejaría en 0600, solo para el propietario).
+    """
+    while True:
+        rutaTemporal = f"{os.path.abspath(ruta)}.{os.urandom(4).hex()}.tmp"
+        try:
+            return os.open(rutaTemporal, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0),
+                           0o666), rutaTemporal
+        except FileExistsError:
+            continue
+
+
+def _leerCabecera(f):
+    """Lee la cabecera de un archivo abierto. Devuelve (cabecera, inicioDatos) o None si no es un artefacto."""
+    prefijo = f.read(_prefijo.size)
+    if len(prefijo) < _prefijo.size or prefijo[:len(magiaArtefacto)] != magiaArtefacto:
+        return None
+    _, version, longitud = _prefijo.unpack(prefijo)
+    if version > versionArtefacto:
+        raise ValueError(f"El modelo se guardó con un formato más reciente (versión {version}).")
+    try:
+        cabecera = json.loads(f.read(longitud).decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cabecera del modelo dañada: {e}")
+    inicioDatos = _prefijo.size + longitud
+    return cabecera, inicioDatos + _relleno(inicioDatos)
+
+
+def esArtefacto(ruta):
+    """True si el archivo tiene el formato de artefacto (y no es un pickle antiguo)."""
+    with open(ruta, "rb") as f:
+        return f.read(len(magiaArtefacto)) == magiaArtefacto
+
+
+#Entradas: str -> Salidas: dict | None
+def leerMetadatos(ruta):
+    """
+    Metadatos del modelo leyendo solo la cabecera, o None si el archivo no es
+    un artefacto (p.ej. un .pkl del formato antiguo).
+    """
+    with open(ruta, "rb") as f:
+        leido = _leerCabecera(f)
+    if leido is None:
+        return None
+    cabecera = leido[0]
+    metadatos = _diccionarioDesdeCabecera(cabecera)
+    metadatos["tipoEstimador"] = cabecera["metadatos"].get("tipoEstimador")
+    metadatos["guardado"] = cabecera["metadatos"].get("guardado")
+    return metadatos
+
+
+#Entradas: str -> Salidas: dict
+def cargarArtefacto(ruta):
+    """
+    Carga el diccionario completo del modelo (metadatos + estimador).
+
+    Los buffers sin comprimir se proyectan en memoria con copia en escritura
+    (los arrays son modificables y el sistema solo lee las páginas que se usan).
+    En Windows se leen a memoria para no bloquear el archivo.
+    """
+    with open(ruta, "rb") as f:
+        leido = _leerCabecera(f)
+        if leido is None:
+            raise ValueError("El archivo no tiene el formato de modelo de la aplicación.")
+        cabecera, inicioDatos = leido
+        proyeccion = None
+        if _proyectarBuffers and any(b["compresion"] is None for b in cabecera["buffers"]):
+            proyeccion = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        def trozo(entrada):
+            inicio = inicioDatos + entrada["posicion"]
+            if entrada["compresion"] == "zlib":
+                f.seek(inicio)
+                return bytearray(zlib.decompress(f.read(entrada["longitud"])))
+            if entrada["compresion"] is not None:
+                raise ValueError(f"Compresión desconocida en el modelo: {entrada['compresion']}")
+            if proyeccion is None:
+                f.seek(inicio)
+                return bytearray(f.read(entrada["longitud"]))
+            return memoryview(proyeccion)[inicio:inicio + entrada["longitud"]]
+
+        f.seek(inicioDatos + cabecera["pickle"]["posicion"])
+        bytesPickle = f.read(cabecera["pickle"]["longitud"])
+        buffers = [trozo(entrada) for entrada in cabecera["buffers"]]
+
+    datosModelo = pk.loads(bytesPickle, buffers=buffers)
+    datosModelo.update(_diccionarioDesdeCabecera(cabecera))
+    return datosModelo
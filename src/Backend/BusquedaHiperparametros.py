@@ -0,0 +1,262 @@
+import math
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs, hash as huellaJoblib
+
+from . import ProcesadoDatos as ProcDat
+
+# Búsqueda de hiperparámetros para los modelos de ProcesadoDatos.configuracionModelos.
+# Cada candidato se evalúa con validación cruzada; los pares (candidato, pliegue) se
+# reparten entre los núcleos por tandas, comprobando el presupuesto de tiempo entre
+# tanda y tanda. Las puntuaciones de cada pliegue se guardan en una caché en memoria,
+# así que repetir una búsqueda (o ampliarla) solo evalúa lo que no se había evaluado.
+
+# Espacios de búsqueda por modelo (nombres de parámetros de sklearn; en los
+# pipelines el nombre va precedido del paso, p.ej. "polynomialfeatures__degree")
+espaciosBusqueda = {
+    "Regresión Lineal": {
+        "fit_intercept": [True, False],
+    },
+    "Regresión Polinómica": {
+        "polynomialfeatures__degree": [1, 2, 3, 4, 5],
+        "polynomialfeatures__interaction_only": [False, True],
+    },
+    "SVR": {
+        "C": [0.01, 0.1, 1.0, 10.0, 100.0, 1000.0],
+        "gamma": ["scale", "auto", 0.01, 0.1, 1.0],
+        "epsilon": [0.01, 0.1, 0.5],
+    },
+    "Árbol de Decisión": {
+        "max_depth": [2, 3, 4, 5, 6, 8, 10, None],
+        "min_samples_leaf": [1, 2, 5, 10],
+    },
+    "KNN": {
+        "n_neighbors": [1, 3, 5, 7, 9, 15, 25],
+        "weights": ["uniform", "distance"],
+        "p": [1, 2],
+    },
+    "Regresión Logística": {
+        "C": [0.001, 0.01, 0.1, 1.0, 10.0, 100.0, 1000.0],
+        "class_weight": [None, "balanced"],
+    },
+    "Regresión Logística Binaria": {
+        "C": [0.001, 0.01, 0.1, 1.0, 10.0, 100.0, 1000.0],
+        "class_weight": [None, "balanced"],
+    },
+    "Árbol de Decisión (Clasif)": {
+        "max_depth": [2, 3, 4, 5, 6, 8, 10, None],
+        "min_samples_leaf": [1, 2, 5, 10],
+        "criterion": ["gini", "entropy"],
+    },
+    "KNN (Clasificación)": {
+        "n_neighbors": [1, 3, 5, 7, 9, 15, 25],
+        "weights": ["uniform", "distance"],
+        "p": [1, 2],
+    },
+}
+
+estrategiasBusqueda = ["rejilla", "aleatoria", "halving"]
+presupuestoPorDefectoSegundos = 60
+
+# (huella datos, modelo, huella parámetros, huella pliegue) -> puntuación del pliegue
+_cacheResultados = {}
+_maxEntradasCache = 20_000
+
+
+def limpiarCacheBusqueda():
+    """Vacía la caché de puntuaciones de pliegues."""
+    _cacheResultados.clear()
+
+
+def textoParametros(parametros):
+    """Representación legible de un conjunto de hiperparámetros."""
+    return ", ".join(f"{clave}={valor}" for clave, valor in sorted(parametros.items())) or "(por defecto)"
+
+
+#Generación de candidatos
+
+def candidatosRejilla(espacio):
+    """Todas las combinaciones del espacio de búsqueda."""
+    return list(ProcDat.skSeleccion.ParameterGrid(espacio))
+
+
+def candidatosAleatorios(espacio, nCandidatos, semilla=ProcDat.semillaPorDefecto):
+    """`nCandidatos` combinaciones distintas elegidas al azar (o todas si hay menos)."""
+    nCandidatos = min(nCandidatos, len(ProcDat.skSeleccion.ParameterGrid(espacio)))
+    return list(ProcDat.skSeleccion.ParameterSampler(espacio, n_iter=nCandidatos, random_state=semilla))
+
+
+#Evaluación
+
+def _particiones(y, nPliegues, estratificado, semilla):
+    """Pliegues estratificados si es posible; si alguna clase es demasiado pequeña, normales."""
+    if estratificado:
+        try:
+            return ProcDat.generarParticionesCV(y, nPliegues, 1, True, semilla)
+        except ValueError:
+            pass
+    return ProcDat.generarParticionesCV(y, nPliegues, 1, False, semilla)
+
+
+def _puntuarPliegue(nombreModelo, metrica, x, y, idxTrain, idxTest, parametros):
+    """Puntuación de test de un candidato en un pliegue (NaN si la combinación no es válida)."""
+    try:
+        return ProcDat._evaluarPliegue(nombreModelo, x, y, idxTrain, idxTest, parametros)[metrica]
+    except ValueError:
+        # p.ej. más vecinos que filas en el pliegue
+        return np.nan
+
+
+def _evaluarCandidatos(paralelo, nucleos, nombreModelo, metrica, x, y, particiones, candidatos, limite):
+    """
+    Evalúa los candidatos en todos los pliegues usando la caché y devuelve
+    (medias, desviaciones, presupuestoAgotado). Los candidatos que no se
+    terminaron de evaluar por falta de tiempo quedan con NaN.
+    """
+    huellaDatos = huellaJoblib((x, y))
+    clavesPliegues = [huellaJoblib((idxTrain, idxTest)) for idxTrain, idxTest in particiones]
+    claves = [[(huellaDatos, nombreModelo, huellaJoblib(textoParametros(c)), clavePliegue)
+               for clavePliegue in clavesPliegues] for c in candidatos]
+
+    pendientes = [(i, k) for i in range(len(candidatos)) for k in range(len(particiones))
+                  if claves[i][k] not in _cacheResultados]
+
+    # Tandas de dos tareas por núcleo: suficiente para repartir bien y comprobar el tiempo a menudo
+    tamTanda = 2 * nucleos
+    agotado = False
+    for inicio in range(0, len(pendientes), tamTanda):
+        if time.perf_counter() > limite:
+            agotado = True
+            break
+        tanda = pendientes[inicio:inicio + tamTanda]
+        puntuaciones = paralelo(
+            delayed(_puntuarPliegue)(nombreModelo, metrica, x, y, *particiones[k], candidatos[i])
+            for i, k in tanda
+        )
+        for (i, k), puntuacion in zip(tanda, puntuaciones):
+            _cacheResultados[claves[i][k]] = puntuacion
+
+    if len(_cacheResultados) > _maxEntradasCache:
+        # Se descartan las entradas más antiguas (los dict conservan el orden de inserción)
+        for clave in list(_cacheResultados)[:len(_cacheResultados) - _maxEntradasCache]:
+            del _cacheResultados[clave]
+
+    medias, desviaciones = [], []
+    for filaClaves in claves:
+        valores = [_cacheResultados.get(clave) for clave in filaClaves]
+        if any(v is None for v in valores) or np.isnan(valores).any():
+            medias.append(np.nan)
+            desviaciones.append(np.nan)
+        else:
+            medias.append(float(np.mean(valores)))
+            desviaciones.append(float(np.std(valores)))
+    return medias, desviaciones, agotado
+
+
+#Búsqueda
+
+#Entradas: pd.DataFrame, List[str], str, str, str, int, int, float | None ... -> Salidas: dict
+def buscarHiperparametros(dataFrameTrain, columnasEntrada, columnaSalida, nombreModelo, estrategia="aleatoria",
+                          nCandidatos=20, nPliegues=3, presupuestoSegundos=presupuestoPorDefectoSegundos,
+                          factorReduccion=3, espacio=None, semilla=ProcDat.semillaPorDefecto, nJobs=-1):
+    """
+    Busca los mejores hiperparámetros de un modelo con validación cruzada sobre
+    el conjunto de entrenamiento (el de test no se toca).
+
+    Estrategias:
+        "rejilla": todas las combinaciones del espacio.
+        "aleatoria": `nCandidatos` combinaciones al azar.
+        "halving": `nCandidatos` combinaciones al azar evaluadas primero con pocas
+            filas; en cada ronda se queda la mejor 1/`factorReduccion` parte y se
+            multiplican las filas por `factorReduccion` hasta usar todas.
+
+    La puntuación es el R² medio en regresión y el Accuracy medio en clasificación.
+    Si se agota `presupuestoSegundos` se devuelve lo mejor encontrado hasta entonces.
+
+    Returns:
+        dict: "nombreModelo", "mejoresParametros", "mejorPuntuacion", "metrica",
+        "resultados" (DataFrame ordenado de mejor a peor), "presupuestoAgotado", "segundos".
+    """
+    inicio = time.perf_counter()
+    limite = inicio + presupuestoSegundos if presupuestoSegundos else math.inf
+
+    config = ProcDat.configuracionModelos.get(nombreModelo)
+    if not config:
+        raise ValueError(f"El modelo '{nombreModelo}' no se encuentra en la configuración.")
+    if estrategia not in estrategiasBusqueda:
+        raise ValueError(f"Estrategia de búsqueda desconocida: '{estrategia}'. Use una de {estrategiasBusqueda}.")
+
+    columnasImportantes = list(columnasEntrada) + [columnaSalida]
+    if dataFrameTrain[columnasImportantes].isnull().values.any():
+        raise TypeError("Para buscar hiperparámetros no puede haber nulos en las columnas de entrada o salida")
+
+    espacio = espacio if espacio is not None else espaciosBusqueda.get(nombreModelo, {})
+    if estrategia == "rejilla":
+        candidatos = candidatosRejilla(espacio)
+    else:
+        candidatos = candidatosAleatorios(espacio, nCandidatos, semilla)
+
+    estratificado = config["tipo"] == "clasificacion"
+    metrica = "R²" if config["tipo"] == "regresion" else "Accuracy"
+    x = dataFrameTrain[columnasEntrada].reset_index(drop=True)
+    y = dataFrameTrain[columnaSalida].reset_index(drop=True)
+    nFilas = len(y)
+
+    # Filas por ronda: en la última se usan todas; con rejilla/aleatoria solo hay esa ronda
+    if estrategia == "halving":
+        nRondas = max(1, math.floor(math.log(max(len(candidatos), 1), factorReduccion)) + 1)
+        minFilas = min(nFilas, max(10 * nPliegues, nFilas // factorReduccion ** (nRondas - 1)))
+        filasPorRonda = [min(nFilas, minFilas * factorReduccion ** r) for r in range(nRondas - 1)] + [nFilas]
+    else:
+        filasPorRonda = [nFilas]
+    permutacion = np.random.default_rng(semilla).permutation(nFilas)
+
+    nucleos = effective_n_jobs(nJobs)
+    filasResultados = []
+    agotado = False
+    with Parallel(n_jobs=nJobs) as paralelo:
+        for ronda, filas in enumerate(filasPorRonda):
+            indices = np.sort(permutacion[:filas])
+            particiones = [(indices[a], indices[b]) for a, b in
+                           _particiones(y.iloc[indices], nPliegues, estratificado, semilla)]
+
+            medias, desviaciones, agotado = _evaluarCandidatos(paralelo, nucleos, nombreModelo, metrica,
+                                                               x, y, particiones, candidatos, limite)
+            for candidato, media, desviacion in zip(candidatos, medias, desviaciones):
+                filasResultados.append({"Parámetros": textoParametros(candidato), "Puntuación": media,
+                                        "Desv": desviacion, "Filas": filas, "Ronda": ronda,
+                                        "_parametros": candidato})
+            if agotado:
+                break
+
+            # Halving: pasan a la siguiente ronda los mejores candidatos válidos
+            if ronda < len(filasPorRonda) - 1:
+                orden = [i for i in np.argsort(medias)[::-1] if not np.isnan(medias[i])]
+                candidatos = [candidatos[i] for i in orden[:max(1, math.ceil(len(candidatos) / factorReduccion))]]
+
+    resultados = pd.DataFrame(filasResultados)
+    # El mejor se elige entre las evaluaciones con más filas (las de la última ronda alcanzada)
+    validos = resultados.dropna(subset=["Puntuación"])
+    if validos.empty:
+        raise ValueError("Ninguna combinación de hiperparámetros se pudo evaluar "
+                         "(compruebe los datos o aumente el presupuesto de tiempo).")
+    validos = validos[validos["Filas"] == validos["Filas"].max()]
+    mejor = validos.loc[validos["Puntuación"].idxmax()]
+
+    resultados = (resultados.drop(columns="_parametros")
+                  .sort_values(["Filas", "Puntuación"], ascending=False, na_position='last', ignore_index=True))
+    return {
+        "nombreModelo": nombreModelo,
+        "mejoresParametros": mejor["_parametros"],
+        "mejorPuntuacion": float(mejor["Puntuación"]),
+        "metrica": metrica,
+        "resultados": resultados,
+        "presupuestoAgotado": agotado,
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+def crearMejorEstimador(resultadoBusqueda):
+    """Estimador sin ajustar con los mejores hiperparámetros de una búsqueda."""
+    return ProcDat.crearEstimador(resultadoBusqueda["nombreModelo"], **resultadoBusqueda["mejoresParametros"])
@@ -0,0 +1,224 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import os
+import pickle as pk
+import shutil
+import warnings
+
+# Caché en disco de datasets ya parseados.
+# Cada entrada es una carpeta con un .npy por columna (mapeable en memoria), el
+# índice de columnas en pickle (los nombres pueden no ser texto) y un meta.json
+# con el tipo de cada columna y los attrs del DataFrame. La
+# clave es una huella del contenido del archivo original (más la variante de carga,
+# p.ej. "compacto"), así que reabrir el mismo archivo no vuelve a parsearlo.
+
+directorioCachePorDefecto = os.path.join(os.path.expanduser("~"), ".proyectoIS", "cache")
+limiteCachePorDefectoMB = 4096
+
+# Muestreo del archivo para la huella: 64 trozos de 64 KiB repartidos por todo el archivo
+_numTrozosHuella = 64
+_tamTrozoHuella = 64 * 1024
+_versionFormato = 2
+
+
+def huellaArchivo(ruta, variante=""):
+    """
+    Calcula la clave de caché de un archivo.
+
+    Combina el tamaño, la fecha de modificación y un hash BLAKE2 de trozos
+    repartidos uniformemente por el archivo. Así se obtiene en milisegundos
+    incluso para archivos de varios GB (leer el archivo entero para hashearlo
+    costaría casi lo mismo que parsearlo). `variante` distingue cargas distintas
+    del mismo archivo (p.ej. con los tipos compactados).
+    """
+    estado = os.stat(ruta)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{estado.st_size}:{estado.st_mtime_ns}".encode())
+    if variante:
+        h.update(f"|{variante}".encode())
+    with open(ruta, 'rb') as f:
+        if estado.st_size <= _numTrozosHuella * _tamTrozoHuella:
+            h.update(f.read())
+        else:
+            paso = (estado.st_size - _tamTrozoHuella) // (_numTrozosHuella - 1)
+            for i in range(_numTrozosHuella):
+                f.seek(i * paso)
+                h.update(f.read(_tamTrozoHuella))
+    return h.hexdigest()
+
+
+def _tamCarpeta(carpeta):
+    """Suma el tamaño en bytes de los archivos de una carpeta."""
+    return sum(entrada.stat().st_size for entrada in os.scandir(carpeta) if entrada.is_file())
+
+
+#Escritura
+
+def _guardarColumna(serie, carpeta, i):
+    """Guarda una columna en el formato más eficiente posible y devuelve su descripción."""
+    archivo = f"c{i}.npy"
+    ruta = os.path.join(carpeta, archivo)
+    tipo = serie.dtype
+
+    if isinstance(tipo, pd.CategoricalDtype):
+        np.save(ruta, serie.cat.codes.to_numpy())
+        return {"formato": "categoria", "archivo": archivo,
+                "categorias": serie.cat.categories.tolist(), "ordenada": bool(tipo.ordered)}
+
+    if isinstance(tipo, np.dtype) and tipo.kind in "biufcmM":
+        np.save(ruta, serie.to_numpy())
+        return {"formato": "npy", "archivo": archivo}
+
+    # Texto, objetos mixtos o tipos extendidos de pandas: no se pueden mapear en memoria
+    np.save(ruta, serie.to_numpy(dtype=object), allow_pickle=True)
+    return {"formato": "objeto", "archivo": archivo, "tipo": str(tipo)}
+
+
+def guardarEnCache(ruta, df, directorio=directorioCachePorDefecto, limiteMB=limiteCachePorDefectoMB, variante=""):
+    """
+    Guarda un DataFrame en la caché asociado al archivo del que se cargó (y a
+    la `variante` de carga). Tras guardar, aplica la política LRU para no superar `limiteMB`.
+
+    Returns:
+        str | None: La huella usada como clave, o None si no se pudo guardar.
+    """
+    carpetaTmp = None
+    try:
+        huella = huellaArchivo(ruta, variante)
+        carpetaFinal = os.path.join(directorio, huella)
+        if os.path.isdir(carpetaFinal):
+            return huella
+
+        # Se escribe en una carpeta temporal y se renombra para no dejar entradas a medias
+        carpetaTmp = f"{carpetaFinal}.tmp-{os.getpid()}"
+        os.makedirs(carpetaTmp, exist_ok=True)
+
+        # Por posición: admite nombres repetidos o que no son texto
+        columnas = [_guardarColumna(df.iloc[:, i], carpetaTmp, i) for i in range(df.shape[1])]
+        with open(os.path.join(carpetaTmp, "columnas.pkl"), 'wb') as f:
+            pk.dump(df.columns, f, protocol=pk.HIGHEST_PROTOCOL)
+
+        meta = {
+            "version": _versionFormato,
+            "origen": os.path.abspath(ruta),
+            "filas": len(df),
+            "columnas": columnas,
+            "attrs": df.attrs,
+            "bytes": _tamCarpeta(carpetaTmp),
+        }
+        with open(os.path.join(carpetaTmp, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, default=str)
+
+        os.replace(carpetaTmp, carpetaFinal)
+        aplicarLimiteCache(directorio, limiteMB)
+        return huella
+
+    except (OSError, TypeError, ValueError, pk.PicklingError) as e:
+        # La caché es una optimización: si falla se sigue sin ella
+        warnings.warn(f"No se pudo guardar el dataset en caché: {e}", RuntimeWarning, stacklevel=2)
+        if carpetaTmp is not None:
+            shutil.rmtree(carpetaTmp, ignore_errors=True)
+        return None
+
+
+#Lectura
+
+def _cargarColumna(carpeta, descripcion):
+    """Reconstruye una columna a partir de su descripción en meta.json."""
+    ruta = os.path.join(carpeta, descripcion["archivo"])
+    formato = descripcion["formato"]
+
+    if formato == "npy":
+        # mmap_mode='c': las páginas se leen bajo demanda y las escrituras no tocan el disco
+        return np.load(ruta, mmap_mode='c').view(np.ndarray)
+    if formato == "categoria":
+        codigos = np.load(ruta, mmap_mode='c').view(np.ndarray)
+        return pd.Categorical.from_codes(codigos, categories=descripcion["categorias"],
+                                         ordered=descripcion["ordenada"])
+    valores = np.load(ruta, allow_pickle=True)
+    # Tipos extendidos (Int64, string, boolean...): se reconstruye el tipo guardado
+    tipo = descripcion.get("tipo", "object")
+    if tipo == "object":
+        return valores
+    try:
+        return pd.array(valores, dtype=tipo)
+    except (TypeError, ValueError):
+        return valores
+
+
+def cargarDesdeCache(ruta, directorio=directorioCachePorDefecto, variante=""):
+    """
+    Devuelve el DataFrame cacheado para `ruta` (y `variante`) o None si no existe.
+    Las columnas numéricas quedan mapeadas en memoria, sin copiarse a RAM.
+    """
+    try:
+        carpeta = os.path.join(directorio, huellaArchivo(ruta, variante))
+        rutaMeta = os.path.join(carpeta, "meta.json")
+        if not os.path.isfile(rutaMeta):
+            return None
+
+        with open(rutaMeta, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("version") != _versionFormato:
+            return None
+
+        with open(os.path.join(carpeta, "columnas.pkl"), 'rb') as f:
+            nombres = pk.load(f)
+        datos = {i: _cargarColumna(carpeta, d) for i, d in enumerate(meta["columnas"])}
+        # copy=False evita que pandas consolide (y copie) los arrays mapeados
+        df = pd.DataFrame(datos, columns=range(len(datos)), copy=False)
+        df.columns = nombres
+        df.attrs.update(meta.get("attrs", {}))
+
+        # Marcar la entrada como usada recientemente para la política LRU
+        os.utime(rutaMeta)
+        return df
+
+    except (OSError, ValueError, KeyError, pk.UnpicklingError, EOFError) as e:
+        warnings.warn(f"No se pudo leer el dataset de la caché: {e}", RuntimeWarning, stacklevel=2)
+        return None
+
+
+def estaEnCache(ruta, directorio=directorioCachePorDefecto, variante=""):
+    """Indica si el archivo tiene una entrada válida en la caché (para esa `variante` de carga)."""
+    try:
+        return os.path.isfile(os.path.join(directorio, huellaArchivo(ruta, variante), "meta.json"))
+    except OSError:
+        return False
+
+
+#Mantenimiento
+
+def aplicarLimiteCache(directorio=directorioCachePorDefecto, limiteMB=limiteCachePorDefectoMB):
+    """
+    Elimina las entradas usadas hace más tiempo hasta que la caché ocupe
+    como mucho `limiteMB`. El último uso es la fecha de modificación del meta.json.
+    """
+    if not os.path.isdir(directorio):
+        return
+
+    entradas = []
+    for entrada in os.scandir(directorio):
+        rutaMeta = os.path.join(entrada.path, "meta.json")
+        if entrada.is_dir() and os.path.isfile(rutaMeta):
+            try:
+                with open(rutaMeta, encoding='utf-8') as f:
+                    tam = json.load(f).get("bytes", 0)
+            except (OSError, ValueError):
+                tam = _tamCarpeta(entrada.path)
+            entradas.append((os.path.getmtime(rutaMeta), tam, entrada.path))
+
+    limiteBytes = limiteMB * 1024 * 1024
+    total = sum(tam for _, tam, _ in entradas)
+    for _, tam, carpeta in sorted(entradas):
+        if total <= limiteBytes:
+            break
+        shutil.rmtree(carpeta, ignore_errors=True)
+        total -= tam
+
+
+def limpiarCache(directorio=directorioCachePorDefecto):
+    """Borra por completo la caché de datasets."""
+    shutil.rmtree(directorio, ignore_errors=True)
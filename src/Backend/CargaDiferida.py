@@ -0,0 +1,75 @@
+import importlib
+import threading
+import time
+
+# Importación diferida de módulos pesados (scikit-learn, plotly, QtWebEngine).
+# `importarDiferido` devuelve un sustituto que importa el módulo real la primera
+# vez que se accede a uno de sus atributos, de modo que importar un módulo del
+# Backend no obliga a cargar todas sus dependencias. `precargar` permite hacer
+# esas importaciones en segundo plano (p.ej. en cuanto se muestra la ventana)
+# para que el primer uso tampoco tenga que esperar.
+
+# Tiempo (s) que tardó cada módulo precargado, para el benchmark de arranque
+tiemposPrecarga = {}
+
+
+class ModuloDiferido:
+    """Sustituto de un módulo que lo importa en el primer acceso a un atributo."""
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+
+    def _cargar(self):
+        if self._modulo is None:
+            # importlib ya serializa las importaciones concurrentes del mismo módulo
+            self._modulo = importlib.import_module(self._nombre)
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self._cargar(), atributo)
+
+    def __repr__(self):
+        estado = "cargado" if self._modulo is not None else "sin cargar"
+        return f"<ModuloDiferido '{self._nombre}' ({estado})>"
+
+
+def importarDiferido(nombre):
+    """
+    Devuelve un ModuloDiferido para `nombre`.
+
+    Uso típico a nivel de módulo, en lugar de `import sklearn.svm as svm`:
+        svm = importarDiferido("sklearn.svm")
+    """
+    return ModuloDiferido(nombre)
+
+
+def _importarTodos(nombres):
+    for nombre in nombres:
+        inicio = time.perf_counter()
+        try:
+            importlib.import_module(nombre)
+        except Exception as e:
+            # La precarga es una optimización: si falla, el error aparecerá en el primer uso real
+            print(f"No se pudo precargar {nombre}: {e}")
+            continue
+        tiemposPrecarga[nombre] = time.perf_counter() - inicio
+
+
+def precargar(nombres, enSegundoPlano=True):
+    """
+    Importa los módulos indicados para calentar la caché de importaciones.
+
+    Args:
+        nombres (list[str]): Módulos a importar, en orden.
+        enSegundoPlano (bool): Importarlos en un hilo daemon (no vale para módulos
+            de Qt que deban cargarse en el hilo principal).
+
+    Returns:
+        threading.Thread | None: El hilo de precarga, si se lanzó en segundo plano.
+    """
+    if not enSegundoPlano:
+        _importarTodos(nombres)
+        return None
+    hilo = threading.Thread(target=_importarTodos, args=(list(nombres),), name="precarga", daemon=True)
+    hilo.start()
+    return hilo
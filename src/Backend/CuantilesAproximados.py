@@ -0,0 +1,197 @@
+import numpy as np
+
+# Cuantiles en streaming con memoria acotada.
+#
+# SketchKLL es el sketch de Karnin, Lang y Liberty (KLL): una pila de
+# "compactadores", uno por nivel. Los valores entran en el nivel 0; cuando un
+# nivel supera su capacidad se ordena y la mitad de sus valores (los de posición
+# par o impar, al azar) sube al siguiente nivel, donde cada uno representa el
+# doble de valores originales. La capacidad decrece geométricamente hacia los
+# niveles bajos, así que el sketch ocupa O(k·log(n/k)) valores sea cual sea n, y
+# el error de rango de un cuantil es del orden de 1/k (≈1% con k=200). Dos
+# sketches se fusionan nivel a nivel, así que cada bloque o cada hilo puede
+# tener el suyo.
+#
+# EstimadorCuantiles guarda los valores tal cual mientras quepan en
+# `maxExacto` y entonces da el cuantil exacto por selección (np.partition); solo
+# si se supera ese límite pasa a un SketchKLL.
+
+kPorDefecto = 200
+maxExactoPorDefecto = 1 << 20
+_factorCapacidad = 2 / 3
+
+
+#Entradas: np.ndarray, list[float] -> Salidas: np.ndarray
+def cuantilesExactos(valores, probabilidades, sobrescribir=False):
+    """
+    Cuantiles de `valores` (sin NaN) por selección, con la misma interpolación
+    lineal que np.quantile. Con `sobrescribir` se reordena `valores` in situ.
+    """
+    probabilidades = np.asarray(probabilidades, dtype=np.float64)
+    if len(valores) == 0:
+        return np.full(probabilidades.shape, np.nan)
+    valores = valores if sobrescribir else np.array(valores, dtype=np.float64)
+    posiciones = probabilidades * (len(valores) - 1)
+    bajos = np.floor(posiciones).astype(np.intp)
+    altos = np.ceil(posiciones).astype(np.intp)
+    valores.partition(np.unique(np.concatenate([bajos, altos])))
+    fraccion = posiciones - bajos
+    return valores[bajos] + (valores[altos] - valores[bajos]) * fraccion
+
+
+class SketchKLL:
+    """
+    Sketch de cuantiles KLL (fusionable, memoria O(k·log(n/k))).
+
+    Args:
+        k (int): Capacidad del nivel más alto; el error de rango es ~1.7/k.
+        semilla (int | None): Semilla de las compactaciones (para resultados reproducibles).
+    """
+    def __init__(self, k=kPorDefecto, semilla=None):
+        self.k = k
+        self.niveles = [np.empty(0)]
+        self.n = 0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self._rng = np.random.default_rng(semilla)
+
+    def __len__(self):
+        return self.n
+
+    def _capacidad(self, nivel):
+        return max(int(np.ceil(self.k * _factorCapacidad ** (len(self.niveles) - nivel - 1))), 2)
+
+    def _compactar(self):
+        nivel = 0
+        while nivel < len(self.niveles):
+            datos = self.niveles[nivel]
+            if len(datos) > self._capacidad(nivel):
+                if nivel + 1 == len(self.niveles):
+                    self.niveles.append(np.empty(0))
+                datos = np.sort(datos)
+                # Con un número impar de valores, el último se queda en este nivel
+                paridad = len(datos) % 2
+                sube = datos[:len(datos) - paridad][self._rng.integers(2)::2]
+                self.niveles[nivel] = datos[len(datos) - paridad:]
+                self.niveles[nivel + 1] = np.concatenate([self.niveles[nivel + 1], sube])
+            nivel += 1
+
+    #Entradas: array-like -> Salidas: SketchKLL
+    def actualizar(self, valores):
+        """Añade un lote de valores (los NaN se ignoran)."""
+        valores = np.asarray(valores, dtype=np.float64).ravel()
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return self
+        self.n += len(valores)
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+        self.niveles[0] = np.concatenate([self.niveles[0], valores])
+        self._compactar()
+        return self
+
+    #Entradas: SketchKLL -> Salidas: SketchKLL
+    def fusionar(self, otro):
+        """Añade a este sketch los valores resumidos en `otro` (no lo modifica)."""
+        while len(self.niveles) < len(otro.niveles):
+            self.niveles.append(np.empty(0))
+        for nivel, datos in enumerate(otro.niveles):
+            self.niveles[nivel] = np.concatenate([self.niveles[nivel], datos])
+        self.n += otro.n
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        self._compactar()
+        return self
+
+    def tamano(self):
+        """Valores guardados (la memoria del sketch)."""
+        return sum(len(datos) for datos in self.niveles)
+
+    #Entradas: list[float] -> Salidas: np.ndarray
+    def cuantiles(self, probabilidades):
+        """Cuantiles aproximados (NaN si el sketch está vacío)."""
+        probabilidades = np.asarray(probabilidades, dtype=np.float64)
+        if self.n == 0:
+            return np.full(probabilidades.shape, np.nan)
+        valores = np.concatenate(self.niveles)
+        pesos = np.concatenate([np.full(len(datos), 2.0 ** nivel) for nivel, datos in enumerate(self.niveles)])
+        orden = np.argsort(valores, kind="stable")
+        valores, acumulado = valores[orden], np.cumsum(pesos[orden])
+        # Primer valor cuyo peso acumulado alcanza el rango pedido
+        indices = np.searchsorted(acumulado, probabilidades * acumulado[-1], side="left")
+        resultado = valores[np.minimum(indices, len(valores) - 1)]
+        # Los extremos se conocen exactamente
+        return np.where(probabilidades <= 0, self.minimo, np.where(probabilidades >= 1, self.maximo, resultado))
+
+    def cuantil(self, probabilidad):
+        return float(self.cuantiles([probabilidad])[0])
+
+
+class EstimadorCuantiles:
+    """
+    Cuantiles de una columna que llega por bloques: exactos mientras los valores
+    quepan en `maxExacto`, aproximados con un SketchKLL a partir de ahí.
+
+    Args:
+        maxExacto (int): Valores que se guardan antes de pasar al sketch (0 = siempre aproximado).
+        k (int): Parámetro del SketchKLL.
+        semilla (int | None): Semilla del SketchKLL.
+    """
+    def __init__(self, maxExacto=maxExactoPorDefecto, k=kPorDefecto, semilla=None):
+        self.maxExacto = maxExacto
+        self.k = k
+        self.semilla = semilla
+        self._valores = []
+        self._nValores = 0
+        self.sketch = None
+
+    @property
+    def esExacto(self):
+        return self.sketch is None
+
+    @property
+    def n(self):
+        return self._nValores if self.esExacto else self.sketch.n
+
+    def _pasarASketch(self):
+        self.sketch = SketchKLL(self.k, self.semilla)
+        for valores in self._valores:
+            self.sketch.actualizar(valores)
+        self._valores, self._nValores = [], 0
+
+    #Entradas: array-like -> Salidas: EstimadorCuantiles
+    def actualizar(self, valores):
+        """Añade un bloque de valores (los NaN se ignoran)."""
+        if not self.esExacto:
+            self.sketch.actualizar(valores)
+            return self
+        valores = np.asarray(valores, dtype=np.float64).ravel()
+        valores = valores[~np.isnan(valores)]
+        self._valores.append(valores)
+        self._nValores += len(valores)
+        if self._nValores > self.maxExacto:
+            self._pasarASketch()
+        return self
+
+    #Entradas: EstimadorCuantiles -> Salidas: EstimadorCuantiles
+    def fusionar(self, otro):
+        """Añade los valores de `otro` (p.ej. el de otro bloque u otro hilo)."""
+        if otro.esExacto:
+            for valores in otro._valores:
+                self.actualizar(valores)
+            return self
+        if self.esExacto:
+            self._pasarASketch()
+        self.sketch.fusionar(otro.sketch)
+        return self
+
+    #Entradas: list[float] -> Salidas: np.ndarray
+    def cuantiles(self, probabilidades):
+        if not self.esExacto:
+            return self.sketch.cuantiles(probabilidades)
+        valores = np.concatenate(self._valores) if self._valores else np.empty(0)
+        # Los bloques guardados ya son copias (el filtrado de NaN copia): la selección puede reordenarlos
+        return cuantilesExactos(valores, probabilidades, sobrescribir=True)
+
+    def mediana(self):
+        return float(self.cuantiles([0.5])[0])
@@ -0,0 +1,187 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+
+from .PuntuadorLineal import obtenerPuntuador
+
+# Despachador de predicciones: agrupa en lotes las llamadas a predict contra un
+# mismo modelo. Cada petición se encola y devuelve un Future; el hilo del modelo
+# espera a que llegue la primera, abre una ventana de `esperaMaxMs` milisegundos
+# (o hasta `maxLote` filas), apila todas las filas recibidas, llama a predict una
+# sola vez y reparte el resultado. Muchas peticiones pequeñas y concurrentes (el
+# servidor HTTP, varias gráficas a la vez) cuestan así una llamada vectorizada en
+# lugar de una por petición.
+#
+# La ventana solo se abre cuando hay concurrencia: si el lote anterior tenía una
+# sola petición, la siguiente se predice en cuanto llega (con lo que ya hubiera
+# en cola), así que una petición aislada (la predicción manual) no paga la espera.
+#
+# Los hilos se crean al llegar la primera petición de cada modelo y terminan
+# tras `inactividadS` segundos sin trabajo, soltando la referencia al modelo.
+
+maxLotePorDefecto = 1024
+esperaMaxMsPorDefecto = 2.0
+inactividadPorDefectoS = 30.0
+
+
+def _predecirMatriz(modelo, matriz, columnas):
+    """predict sobre una matriz, por el puntuador numpy si el modelo es lineal."""
+    puntuador = obtenerPuntuador(modelo)
+    if puntuador is not None and matriz.dtype.kind in "biuf":
+        return puntuador.predecir(matriz)
+    entrada = pd.DataFrame(matriz, columns=columnas) if columnas is not None else matriz
+    return np.asarray(modelo.predict(entrada))
+
+
+class DespachadorPrediccion:
+    """
+    Agrupa las predicciones concurrentes de cada modelo en lotes.
+
+    Args:
+        maxLote (int): Máximo de filas por llamada a predict. Una petición más
+            grande que esto se predice sola, sin partirla.
+        esperaMaxMs (float): Tiempo máximo que la primera petición de un lote
+            espera a que lleguen más (el objetivo de latencia). Con 0 solo se
+            agrupan las que ya estaban en cola.
+        inactividadS (float): Segundos sin peticiones tras los que se cierra
+            el hilo de un modelo.
+    """
+    def __init__(self, maxLote=maxLotePorDefecto, esperaMaxMs=esperaMaxMsPorDefecto,
+                 inactividadS=inactividadPorDefectoS):
+        self.maxLote = maxLote
+        self.esperaMaxMs = esperaMaxMs
+        self.inactividadS = inactividadS
+        self._colas = {}
+        self._candado = threading.Lock()
+        self._contadorHilos = itertools.count()
+        self.peticiones = 0
+        self.lotes = 0
+        self.filas = 0
+
+    # --- API ---
+
+    #Entradas: estimador, array | DataFrame | list, list[str] | None -> Salidas: Future
+    def enviar(self, modelo, filas, columnas=None):
+        """
+        Encola una predicción y devuelve un Future con el array de predicciones.
+
+        Args:
+            modelo: Estimador ajustado.
+            filas: Matriz n × columnas (una fila suelta también vale si `columnas`
+                tiene su longitud) o DataFrame (sus columnas, si no se dan otras).
+            columnas (list[str] | None): Nombres de columna con los que se
+                entrenó el modelo; las peticiones con distintas columnas no se mezclan.
+        """
+        if isinstance(filas, pd.DataFrame):
+            if columnas is None:
+                columnas = list(filas.columns)
+            matriz = filas[columnas].to_numpy()
+        else:
+            matriz = np.asarray(filas)
+            if matriz.ndim == 1:
+                matriz = matriz.reshape(1, -1) if columnas is not None else matriz.reshape(-1, 1)
+        columnas = tuple(columnas) if columnas is not None else None
+        futuro = Future()
+        clave = (id(modelo), columnas)
+        with self._candado:
+            self.peticiones += 1
+            entrada = self._colas.get(clave)
+            if entrada is None or entrada[0] is not modelo:
+                entrada = (modelo, queue.SimpleQueue())
+                self._colas[clave] = entrada
+                threading.Thread(target=self._atenderModelo, args=(clave, modelo, entrada[1]),
+                                 name=f"despachador-{next(self._contadorHilos)}", daemon=True).start()
+            entrada[1].put((matriz, futuro))
+        return futuro
+
+    #Entradas: estimador, array | DataFrame | list, list[str] | None, float | None -> Salidas: np.ndarray
+    def predecir(self, modelo, filas, columnas=None, timeout=None):
+        """Como `enviar`, pero espera el resultado (y relanza la excepción de predict)."""
+        return self.enviar(modelo, filas, columnas).result(timeout)
+
+    def estadisticas(self):
+        """Peticiones recibidas, lotes predichos, filas y filas medias por lote."""
+        with self._candado:
+            return {"peticiones": self.peticiones, "lotes": self.lotes, "filas": self.filas,
+                    "filasPorLote": round(self.filas / self.lotes, 2) if self.lotes else None}
+
+    # --- Hilo de cada modelo ---
+
+    def _recogerLote(self, cola, primera, esperar):
+        """Junta peticiones hasta llenar el lote o agotar la ventana de espera."""
+        pendientes = [primera]
+        filas = len(primera[0])
+        limite = time.monotonic() + (self.esperaMaxMs / 1000 if esperar else 0)
+        while filas < self.maxLote:
+            restante = limite - time.monotonic()
+            try:
+                siguiente = cola.get(timeout=restante) if restante > 0 else cola.get_nowait()
+            except queue.Empty:
+                break
+            pendientes.append(siguiente)
+            filas += len(siguiente[0])
+        return pendientes
+
+    def _atenderModelo(self, clave, modelo, cola):
+        columnas = list(clave[1]) if clave[1] is not None else None
+        concurrente = False
+        while True:
+            try:
+                primera = cola.get(timeout=self.inactividadS)
+            except queue.Empty:
+                with self._candado:
+                    # Solo se cierra si nadie ha encolado nada mientras tanto
+                    if cola.empty():
+                        if self._colas.get(clave, (None,))[0] is modelo:
+                            del self._colas[clave]
+                        return
+                continue
+
+            # Las peticiones canceladas antes de empezar no se predicen
+            pendientes = self._recogerLote(cola, primera, concurrente)
+            concurrente = len(pendientes) > 1
+            pendientes = [p for p in pendientes if p[1].set_running_or_notify_cancel()]
+            if not pendientes:
+                continue
+            try:
+                matriz = pendientes[0][0] if len(pendientes) == 1 else np.concatenate([m for m, _ in pendientes])
+                prediccion = _predecirMatriz(modelo, matriz, columnas)
+            except Exception as e:
+                if len(pendientes) == 1:
+                    pendientes[0][1].set_exception(e)
+                else:
+                    # Una petición con datos inválidos no debe hacer fallar a las demás del lote
+                    self._predecirPorSeparado(modelo, pendientes, columnas)
+                continue
+            self._contarLote(len(matriz))
+            inicio = 0
+            for submatriz, futuro in pendientes:
+                futuro.set_result(prediccion[inicio:inicio + len(submatriz)])
+                inicio += len(submatriz)
+
+    def _predecirPorSeparado(self, modelo, pendientes, columnas):
+        for matriz, futuro in pendientes:
+            try:
+                futuro.set_result(_predecirMatriz(modelo, matriz, columnas))
+                self._contarLote(len(matriz))
+            except Exception as e:
+                futuro.set_exception(e)
+
+    def _contarLote(self, filas):
+        with self._candado:
+            self.lotes += 1
+            self.filas += filas
+
+
+# Despachador compartido por la aplicación
+despachadorPorDefecto = DespachadorPrediccion()
+
+
+#Entradas: estimador, array | DataFrame | list, list[str] | None -> Salidas: np.ndarray
+def predecirAgrupado(modelo, filas, columnas=None):
+    """predict a través del despachador compartido (se agrupa con las demás peticiones del modelo)."""
+    return despachadorPorDefecto.predecir(modelo, filas, columnas)
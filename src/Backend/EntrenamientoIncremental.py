@@ -0,0 +1,367 @@
+import numpy as np
+import pandas as pd
+
+from .ImportacionDatos import leerPorBloques, tamBloquePorDefecto
+from .ProcesadoDatos import (crearEstimador, semillaPorDefecto, skLineal, _validarDatosClasificacion,
+                             _validarDatosNumericos, _validarDatosRegresion)
+from .PuntuadorLineal import PuntuadorLineal
+from .TransformadoresPreprocesado import ImputadorNan, PipelinePreprocesado
+
+# Entrenamiento por bloques (fuera de memoria): el archivo se recorre con
+# leerPorBloques y nunca se carga entero, así que la memoria depende de
+# `tamBloque` y no del tamaño del archivo. El datasplit se decide fila a fila
+# con un generador sembrado por bloque, de modo que cada pasada ve el mismo
+# reparto train/test. Según el modelo:
+#
+#   - Regresión lineal y polinómica: se acumulan las ecuaciones normales
+#     (sumas de X·Xᵀ y X·y centradas, O(p²) de memoria) y se resuelven al final.
+#     Da el mismo modelo que LinearRegression sobre todo el conjunto de train.
+#   - Regresión logística: SGD (SGDClassifier con pérdida logística) sobre las
+#     entradas estandarizadas, varias épocas de partial_fit; al terminar, la
+#     estandarización se integra en los coeficientes y se devuelve un
+#     LogisticRegression con ellos (mismo formato, fórmula y puntuador rápido).
+#   - KNN y árboles: no admiten ajuste parcial; se ajustan sobre una muestra de
+#     reservorio uniforme de como mucho `maxMuestra` filas de train.
+#
+# Las métricas (R²/ECM o accuracy de train y test) se acumulan en una última
+# pasada, igual que las de crearAjustarModelo pero sin tener los datos en memoria.
+
+epocasPorDefecto = 5
+maxMuestraPorDefecto = 200_000
+
+modelosIncrementales = {
+    "Regresión Lineal":            {"tipo": "regresion", "estrategia": "ecuacionesNormales"},
+    "Regresión Polinómica":        {"tipo": "regresion", "estrategia": "ecuacionesNormales"},
+    "Regresión Logística":         {"tipo": "clasificacion", "estrategia": "sgd"},
+    "Regresión Logística Binaria": {"tipo": "clasificacion", "estrategia": "sgd"},
+    "KNN":                         {"tipo": "regresion", "estrategia": "reservorio"},
+    "Árbol de Decisión":           {"tipo": "regresion", "estrategia": "reservorio"},
+    "KNN (Clasificación)":         {"tipo": "clasificacion", "estrategia": "reservorio"},
+    "Árbol de Decisión (Clasif)":  {"tipo": "clasificacion", "estrategia": "reservorio"},
+}
+
+
+class _Momentos:
+    """Media y varianza por columna acumuladas por bloques (desplazadas para evitar cancelaciones)."""
+    def __init__(self):
+        self.n = 0
+        self.desplazamiento = None
+
+    def actualizar(self, x):
+        if len(x) == 0:
+            return
+        if self.desplazamiento is None:
+            self.desplazamiento = x.mean(axis=0)
+            self.suma = np.zeros(x.shape[1])
+            self.sumaCuadrados = np.zeros(x.shape[1])
+        d = x - self.desplazamiento
+        self.n += len(x)
+        self.suma += d.sum(axis=0)
+        self.sumaCuadrados += np.einsum("ij,ij->j", d, d)
+
+    def media(self):
+        return self.desplazamiento + self.suma / self.n
+
+    def desviacion(self):
+        varianza = np.maximum(self.sumaCuadrados / self.n - (self.suma / self.n) ** 2, 0)
+        desviacion = np.sqrt(varianza)
+        return np.where(desviacion > 0, desviacion, 1.0)  # columnas constantes: sin escalar
+
+
+class _EcuacionesNormales:
+    """Sumas centradas de mínimos cuadrados por bloques; `resolver` da coef_ e intercept_."""
+    def __init__(self):
+        self.n = 0
+        self.desplazamientoX = None
+
+    def actualizar(self, x, y):
+        if len(x) == 0:
+            return
+        if self.desplazamientoX is None:
+            self.desplazamientoX, self.desplazamientoY = x.mean(axis=0), y.mean()
+            p = x.shape[1]
+            self.sx, self.sy = np.zeros(p), 0.0
+            self.sxx, self.sxy = np.zeros((p, p)), np.zeros(p)
+        dx = x - self.desplazamientoX
+        dy = y - self.desplazamientoY
+        self.n += len(x)
+        self.sx += dx.sum(axis=0)
+        self.sy += dy.sum()
+        self.sxx += dx.T @ dx
+        self.sxy += dx.T @ dy
+
+    def resolver(self):
+        mediaDx, mediaDy = self.sx / self.n, self.sy / self.n
+        cxx = self.sxx - self.n * np.outer(mediaDx, mediaDx)
+        cxy = self.sxy - self.n * mediaDx * mediaDy
+        # lstsq: solución de norma mínima si hay columnas colineales o constantes
+        coef = np.linalg.lstsq(cxx, cxy, rcond=None)[0]
+        intercepto = (self.desplazamientoY + mediaDy) - (self.desplazamientoX + mediaDx) @ coef
+        return coef, float(intercepto)
+
+
+class _Reservorio:
+    """Muestra uniforme de como mucho `capacidad` filas de un flujo (algoritmo R, vectorizado por bloque)."""
+    def __init__(self, capacidad, rng):
+        self.capacidad = capacidad
+        self.rng = rng
+        self.vistas = 0
+        self.x = None
+        self.y = None
+
+    def actualizar(self, x, y):
+        if len(x) == 0:
+            return
+        if self.x is None:
+            self.x = np.empty((0, x.shape[1]))
+            self.y = np.empty(0, dtype=y.dtype)
+        libres = max(self.capacidad - len(self.x), 0)
+        if libres:
+            self.x = np.concatenate([self.x, x[:libres]])
+            self.y = np.concatenate([self.y, y[:libres]])
+        resto = np.arange(libres, len(x))
+        if len(resto):
+            # La fila t-ésima del flujo sustituye a una posición al azar con probabilidad capacidad/(t+1)
+            posiciones = self.rng.integers(0, self.vistas + resto + 1)
+            entra = posiciones < self.capacidad
+            if self.y.dtype != y.dtype:
+                self.y = self.y.astype(object)
+            self.x[posiciones[entra]] = x[resto[entra]]
+            self.y[posiciones[entra]] = y[resto[entra]]
+        self.vistas += len(x)
+
+
+class _Metricas:
+    """R² y ECM (regresión) o accuracy (clasificación) acumulados por bloques."""
+    def __init__(self, tipo):
+        self.tipo = tipo
+        self.n = 0
+        self.aciertos = 0
+        self.sse = 0.0
+        self.momentos = _Momentos()
+
+    def actualizar(self, y, prediccion):
+        self.n += len(y)
+        if self.tipo == "clasificacion":
+            self.aciertos += int(np.count_nonzero(y == prediccion))
+        else:
+            self.sse += float(np.sum((y - prediccion) ** 2))
+            self.momentos.actualizar(y.reshape(-1, 1).astype(np.float64))
+
+    def resultado(self):
+        """(r2, ecm, accuracy) con el mismo "No compatible" que crearAjustarModelo en las que no aplican."""
+        if self.tipo == "clasificacion":
+            msg = "No compatible (Clasificación)"
+            return msg, msg, self.aciertos / self.n if self.n else float("nan")
+        if not self.n:
+            return float("nan"), float("nan"), "No compatible (Regresion)"
+        sst = float(self.momentos.sumaCuadrados[0] - self.momentos.suma[0] ** 2 / self.n)
+        # Como r2_score: con salida constante vale 1 si el ajuste es perfecto y 0 si no
+        r2 = 1 - self.sse / sst if sst > 0 else (1.0 if self.sse == 0 else 0.0)
+        return r2, self.sse / self.n, "No compatible (Regresion)"
+
+
+class _LectorBloques:
+    """Recorre el archivo las veces que haga falta con el mismo datasplit y preprocesado."""
+    def __init__(self, ruta, columnasEntrada, columnaSalida, tipo, tamTest, semilla, tamBloque,
+                 imputador, eliminarNan):
+        self.ruta = ruta
+        self.columnasEntrada = list(columnasEntrada)
+        self.columnaSalida = columnaSalida
+        self.columnas = self.columnasEntrada + [columnaSalida]
+        self.tipo = tipo
+        self.tamTest = tamTest
+        self.semilla = semilla
+        self.tamBloque = tamBloque
+        self.imputador = imputador
+        self.eliminarNan = eliminarNan
+
+    def bloquesCrudos(self):
+        for bloque, fraccion in leerPorBloques(self.ruta, self.tamBloque):
+            faltan = [c for c in self.columnas if c not in bloque.columns]
+            if faltan:
+                raise ValueError(f"Columnas inexistentes en el archivo: {', '.join(faltan)}")
+            yield bloque[self.columnas], fraccion
+
+    def pasada(self):
+        """Genera (xTrain, yTrain, xTest, yTest, fracción leída) de cada bloque."""
+        for i, (bloque, fraccion) in enumerate(self.bloquesCrudos()):
+            # El reparto depende solo de la semilla y del número de bloque: igual en todas las pasadas
+            esTest = np.random.default_rng([self.semilla, i]).random(len(bloque)) < self.tamTest
+            if self.imputador is not None:
+                bloque = self.imputador.transformar(bloque)
+            nulos = bloque.isna().to_numpy().any(axis=1)
+            if nulos.any():
+                if not self.eliminarNan:
+                    raise ValueError("Hay NaN en las columnas de entrada o salida: elija un preprocesado.")
+                bloque, esTest = bloque[~nulos], esTest[~nulos]
+            _validarDatosNumericos(bloque[self.columnasEntrada], "Entrada (X)")
+            if self.tipo == "regresion":
+                _validarDatosRegresion(bloque[self.columnaSalida])
+            x = bloque[self.columnasEntrada].to_numpy(dtype=np.float64)
+            y = bloque[self.columnaSalida].to_numpy()
+            yield x[~esTest], y[~esTest], x[esTest], y[esTest], fraccion
+
+
+def _linealDesdeCoeficientes(estimador, coef, intercepto, columnas=None):
+    """Deja `estimador` (LinearRegression/LogisticRegression sin ajustar) como si se hubiera ajustado con fit."""
+    estimador.coef_ = coef
+    estimador.intercept_ = intercepto
+    estimador.n_features_in_ = np.shape(coef)[-1]
+    if columnas is not None:
+        estimador.feature_names_in_ = np.asarray(columnas, dtype=object)
+    return estimador
+
+
+def _entrenarEcuacionesNormales(lector, nombreModelo, progreso):
+    modelo = crearEstimador(nombreModelo)
+    polinomio = modelo.steps[0][1] if nombreModelo == "Regresión Polinómica" else None
+    sumas = _EcuacionesNormales()
+    for xTrain, yTrain, _, _, fraccion in lector.pasada():
+        if polinomio is not None:
+            if not hasattr(polinomio, "n_output_features_"):
+                polinomio.fit(pd.DataFrame(xTrain[:1], columns=lector.columnasEntrada))
+            xTrain = polinomio.transform(pd.DataFrame(xTrain, columns=lector.columnasEntrada))
+        sumas.actualizar(xTrain, yTrain.astype(np.float64))
+        progreso(fraccion)
+    if not sumas.n:
+        raise ValueError("No hay filas de entrenamiento.")
+    coef, intercepto = sumas.resolver()
+    if polinomio is None:
+        return _linealDesdeCoeficientes(modelo, coef, intercepto, lector.columnasEntrada)
+    _linealDesdeCoeficientes(modelo.steps[-1][1], coef, intercepto)
+    return modelo
+
+
+def _entrenarSgd(lector, nombreModelo, epocas, semilla, progreso):
+    # Primera pasada: medias y desviaciones para estandarizar, y clases de la salida
+    momentos, clases = _Momentos(), set()
+    for xTrain, yTrain, _, _, fraccion in lector.pasada():
+        momentos.actualizar(xTrain)
+        clases.update(pd.unique(yTrain).tolist())
+        progreso(fraccion)
+    if not momentos.n:
+        raise ValueError("No hay filas de entrenamiento.")
+    clases = np.array(sorted(clases))
+    if nombreModelo == "Regresión Logística Binaria" and len(clases) != 2:
+        raise ValueError(f"Error: La 'Regresión Logística Binaria' requiere exactamente 2 clases. "
+                         f"Tu columna de salida tiene {len(clases)} categorías. "
+                         f"Usa la 'Regresión Logística' estándar (multiclase).")
+    _validarDatosClasificacion(pd.Series(clases))
+
+    media, desviacion = momentos.media(), momentos.desviacion()
+    sgd = skLineal.SGDClassifier(loss="log_loss", random_state=semilla)
+    rng = np.random.default_rng(semilla)
+    for epoca in range(epocas):
+        for xTrain, yTrain, _, _, fraccion in lector.pasada():
+            if len(xTrain):
+                # Se barajan las filas del bloque: los archivos suelen venir ordenados
+                orden = rng.permutation(len(xTrain))
+                sgd.partial_fit((xTrain[orden] - media) / desviacion, yTrain[orden], classes=clases)
+            progreso(fraccion, epoca + 1)
+
+    # La estandarización se integra en los coeficientes: x·(c/σ) + (b − Σ c·μ/σ)
+    coef = sgd.coef_ / desviacion
+    intercepto = sgd.intercept_ - coef @ media
+    modelo = _linealDesdeCoeficientes(crearEstimador(nombreModelo), coef, intercepto, lector.columnasEntrada)
+    modelo.classes_ = sgd.classes_
+    return modelo
+
+
+def _entrenarReservorio(lector, nombreModelo, maxMuestra, semilla, progreso):
+    reservorio = _Reservorio(maxMuestra, np.random.default_rng(semilla))
+    for xTrain, yTrain, _, _, fraccion in lector.pasada():
+        reservorio.actualizar(xTrain, yTrain)
+        progreso(fraccion)
+    if reservorio.x is None or not len(reservorio.x):
+        raise ValueError("No hay filas de entrenamiento.")
+    y = pd.Series(reservorio.y).infer_objects()
+    if modelosIncrementales[nombreModelo]["tipo"] == "clasificacion":
+        _validarDatosClasificacion(y)
+    modelo = crearEstimador(nombreModelo)
+    modelo.fit(pd.DataFrame(reservorio.x, columns=lector.columnasEntrada), y)
+    return modelo
+
+
+#Entradas: str, list[str], str, str, float, int, int, str | None, float, int, int, callable | None -> Salidas: dict
+def entrenarPorBloques(ruta, columnasEntrada, columnaSalida, nombreModelo, tamTest=0.2, semilla=semillaPorDefecto,
+                       tamBloque=tamBloquePorDefecto, preprocesado=None, constante=0.0, epocas=epocasPorDefecto,
+                       maxMuestra=maxMuestraPorDefecto, callbackProgreso=None):
+    """
+    Entrena un modelo recorriendo el archivo por bloques, sin cargarlo en memoria.
+
+    Args:
+        ruta (str): Archivo de datos (.csv, .sqlite/.db; Excel se lee de una vez).
+        columnasEntrada (list[str]), columnaSalida (str): Columnas del modelo.
+        nombreModelo (str): Uno de `modelosIncrementales`.
+        tamTest (float): Proporción de filas de test.
+        semilla (int): Semilla del datasplit y del SGD.
+        tamBloque (int): Filas por bloque.
+        preprocesado (str | None): None (error si hay NaN), 'eliminar' (se descartan
+            las filas con NaN) o 'media' / 'mediana' / 'constante' (imputación
+            ajustada en una pasada previa con ImputadorNan.ajustarPorBloques).
+        constante (float): Valor para preprocesado='constante'.
+        epocas (int): Pasadas de SGD (regresión logística).
+        maxMuestra (int): Filas de la muestra de reservorio (KNN y árboles).
+        callbackProgreso (callable | None): `f(fraccion, pasada)` tras cada bloque.
+
+    Returns:
+        dict: modelo, métricas (r2Train, r2Test, ecmTrain, ecmTest, accTrain,
+        accTest, con "No compatible" en las que no aplican como crearAjustarModelo),
+        filasTrain, filasTest y el PipelinePreprocesado ajustado (o None).
+    """
+    config = modelosIncrementales.get(nombreModelo)
+    if config is None:
+        raise ValueError(f"El modelo '{nombreModelo}' no admite entrenamiento por bloques. "
+                         f"Disponibles: {', '.join(modelosIncrementales)}.")
+    if preprocesado not in (None, "eliminar", "media", "mediana", "constante"):
+        raise ValueError(f"Preprocesado desconocido: {preprocesado}")
+    columnasEntrada = [columnasEntrada] if isinstance(columnasEntrada, str) else list(columnasEntrada)
+    imputar = preprocesado in ("media", "mediana", "constante")
+
+    # Pasadas sobre el archivo: [imputación] + entrenamiento (+ épocas) + métricas
+    pasadas = int(imputar) + {"ecuacionesNormales": 1, "sgd": epocas + 1, "reservorio": 1}[config["estrategia"]] + 1
+    pasada = [0]
+
+    def progreso(fraccion, pasadaEstrategia=0):
+        # `pasadaEstrategia`: pasadas ya completadas dentro de la estrategia (épocas del SGD)
+        if callbackProgreso:
+            actual = pasada[0] + pasadaEstrategia
+            callbackProgreso(min((actual + fraccion) / pasadas, 1.0), actual)
+
+    lector = _LectorBloques(ruta, columnasEntrada, columnaSalida, config["tipo"], tamTest, semilla, tamBloque,
+                            None, preprocesado == "eliminar")
+    imputador = None
+    if imputar:
+        def bloquesConProgreso():
+            for bloque, fraccion in lector.bloquesCrudos():
+                yield bloque
+                progreso(fraccion)
+        imputador = ImputadorNan(lector.columnas, preprocesado, constante).ajustarPorBloques(bloquesConProgreso())
+        lector.imputador = imputador
+        pasada[0] += 1
+
+    if config["estrategia"] == "ecuacionesNormales":
+        modelo = _entrenarEcuacionesNormales(lector, nombreModelo, progreso)
+    elif config["estrategia"] == "sgd":
+        modelo = _entrenarSgd(lector, nombreModelo, epocas, semilla, progreso)
+    else:
+        modelo = _entrenarReservorio(lector, nombreModelo, maxMuestra, semilla, progreso)
+    pasada[0] = pasadas - 1
+
+    # Última pasada: métricas de train y test con el modelo final
+    puntuador = PuntuadorLineal.desdeModelo(modelo)
+    metricasTrain, metricasTest = _Metricas(config["tipo"]), _Metricas(config["tipo"])
+    for xTrain, yTrain, xTest, yTest, fraccion in lector.pasada():
+        for x, y, metricas in ((xTrain, yTrain, metricasTrain), (xTest, yTest, metricasTest)):
+            if len(x):
+                prediccion = (puntuador.predecir(x) if puntuador is not None
+                              else modelo.predict(pd.DataFrame(x, columns=columnasEntrada)))
+                metricas.actualizar(y, np.asarray(prediccion))
+        progreso(fraccion)
+
+    r2Train, ecmTrain, accTrain = metricasTrain.resultado()
+    r2Test, ecmTest, accTest = metricasTest.resultado()
+    return {"modelo": modelo, "r2Train": r2Train, "r2Test": r2Test, "ecmTrain": ecmTrain, "ecmTest": ecmTest,
+            "accTrain": accTrain, "accTest": accTest, "filasTrain": metricasTrain.n, "filasTest": metricasTest.n,
+            "preprocesado": PipelinePreprocesado([imputador]) if imputador is not None else None}
@@ -1,6 +1,9 @@
 import pandas as pd
 import pickle as pk
 import numpy as np
+from . import ArtefactoModelo
+from .PerfilColumnas import perfilarDataFrame, invalidarPerfil
+from .TransformadoresPreprocesado import PipelinePreprocesado
 #LEED LOS COMENTARIOS
 #En este archivo deberia ir todo lo relacionado con carga actualizacion y consulta a datos(CRUD)
 
@@ -20,25 +23,20 @@ def cargaColumnasTotal(datos):
 def cargaColumnasNumericas(datos):
     """
     Extrae columnas numéricas. Si hay columnas con números en formato string,
-    intenta convertirlas a número antes de descartarlas.
+    las convierte a número en lugar de descartarlas.
 
-    Modifica el DataFrame convirtiendo estas columnas a tipo numérico.
+    Modifica el DataFrame convirtiendo estas columnas a tipo numérico. Qué
+    columnas son convertibles lo dice el perfil de columnas (una sola pasada,
+    en caché), así que no se intenta convertir ninguna columna de texto.
     """
     columnas_validas = []
 
-    for col in datos.columns:
-        serie = datos[col]
-
-        if pd.api.types.is_numeric_dtype(serie):
+    for col, perfil in perfilarDataFrame(datos).items():
+        if perfil.numerica:
+            columnas_validas.append(col)
+        elif perfil.convertible:
+            datos[col] = pd.to_numeric(datos[col])
             columnas_validas.append(col)
-        else:
-            # Intentar convertir la columna completa
-            try:
-                datos[col] = pd.to_numeric(serie, errors='raise')
-                columnas_validas.append(col)
-            except Exception:
-                # No se puede convertir, no es numérica
-                pass
 
     return columnas_validas
 
@@ -50,9 +48,12 @@ def cargaColumnas(datos, solo_numericas=True):
         return cargaColumnasTotal(datos)
 
 
-def crearDiccionarioModelo(modelo, columnasEntrada, columnaSalida, r2Train, r2Test, ecmTrain, ecmTest, descripcion, dicColumnaSalida):
+def crearDiccionarioModelo(modelo, columnasEntrada, columnaSalida, r2Train, r2Test, ecmTrain, ecmTest, descripcion, dicColumnaSalida,
+                           preprocesado=None):
     """
     Crea un diccionario con los datos del modelo para guardarlo.
+    `preprocesado` es el PipelinePreprocesado ajustado al entrenar (o None); se
+    aplica a los datos nuevos antes de predecir.
     CORRECCIÓN: Aplana los coeficientes con numpy para soportar Regresión Logística (que devuelve matrices) 
     y Regresión Lineal (que devuelve vectores) sin errores de formato.
     """
@@ -104,14 +105,16 @@ def crearDiccionarioModelo(modelo, columnasEntrada, columnaSalida, r2Train, r2Te
         },
         "formula": formula,
         "descripcion": descripcion,
-        "dicColumnaSalida":dicColumnaSalida
+        "dicColumnaSalida":dicColumnaSalida,
+        "preprocesado": preprocesado
     }
     
     return dict_modelo
 
 def crearModeloDisco(dict_modelo, ruta):
     """
-    Guarda un modelo de regresión lineal y sus metadatos en disco.
+    Guarda un modelo y sus metadatos en disco con el formato de ArtefactoModelo
+    (cabecera JSON legible sin cargar el estimador + estimador en pickle 5).
 
     Parámetros:
         dict_modelo: diccionario con el modelo y su información asociada
@@ -122,8 +125,7 @@ def crearModeloDisco(dict_modelo, ruta):
         str con el mensaje de error si ha ocurrido un fallo durante la serialización o el guardado.
     """
     try:
-        with open(ruta, 'wb') as f:
-            pk.dump(dict_modelo, f)
+        ArtefactoModelo.guardarArtefacto(dict_modelo, ruta)
         return None  # Éxito
     except (pk.PickleError, TypeError) as e:
         # Errores específicos de serialización
@@ -134,7 +136,49 @@ def crearModeloDisco(dict_modelo, ruta):
     except Exception as e:
         # Cualquier otro error no previsto
         return f"Error desconocido al guardar el modelo: {e}"
-    
+
+
+def cargarModeloDisco(ruta):
+    """
+    Carga un modelo guardado con crearModeloDisco (también los .pkl del formato
+    antiguo, que eran el diccionario completo en pickle).
+
+    Parámetros:
+        ruta: ruta del archivo .pkl
+
+    Retorna:
+        dict con el modelo y su información asociada.
+    """
+    if ArtefactoModelo.esArtefacto(ruta):
+        datos = ArtefactoModelo.cargarArtefacto(ruta)
+    else:
+        with open(ruta, 'rb') as f:
+            datos = pk.load(f)
+        if not isinstance(datos, dict) or "modelo" not in datos:
+            raise ValueError("El archivo no contiene un modelo guardado por la aplicación.")
+    # En la cabecera va como dict; los modelos antiguos no tienen preprocesado
+    datos["preprocesado"] = PipelinePreprocesado.desdeDiccionario(datos.get("preprocesado"))
+    return datos
+
+
+def leerCabeceraModelo(ruta, conModelo=False):
+    """
+    Lee los metadatos de un modelo guardado (columnas, métricas, fórmula,
+    descripción, dicColumnaSalida, tipoEstimador) sin cargar el estimador.
+
+    Con un .pkl del formato antiguo no hay cabecera: se carga entero y se
+    devuelven sus metadatos. Con conModelo=True se devuelve además el
+    estimador ya cargado (clave "modelo") para no tener que cargarlo otra vez.
+
+    Retorna:
+        dict con los metadatos (sin la clave "modelo", salvo en el caso anterior).
+    """
+    metadatos = ArtefactoModelo.leerMetadatos(ruta)
+    if metadatos is None:
+        datos = cargarModeloDisco(ruta)
+        metadatos = datos if conModelo else {k: v for k, v in datos.items() if k != "modelo"}
+        metadatos["tipoEstimador"] = type(datos["modelo"]).__name__
+    return metadatos
     
     
 def transformarColumnaBinaria(df, nombreColumna, diccionarioMapeo):
@@ -149,6 +193,7 @@ def transformarColumnaBinaria(df, nombreColumna, diccionarioMapeo):
             raise ValueError(f"La columna '{nombreColumna}' no existe en el DataFrame.")
         df[nombreColumna] = df[nombreColumna].map(diccionarioMapeo)
         df[nombreColumna] = pd.to_numeric(df[nombreColumna], errors='coerce')
+        invalidarPerfil(df, [nombreColumna])
 
 
     except Exception as e:
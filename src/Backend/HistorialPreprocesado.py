@@ -0,0 +1,253 @@
+import numpy as np
+import pandas as pd
+
+from .PreprocesamientoDatos import esFloatNumpy, rellenarBloque, rellenarSerieNullable, valorRellenoSerie
+from .TransformadoresPreprocesado import ImputadorNan, PipelinePreprocesado
+
+# Historial de preprocesado con copia en escritura.
+#
+# El DataFrame cargado nunca se copia ni se modifica. Cada estado del historial
+# guarda solo (a) las posiciones de las filas que siguen vivas y (b) las columnas
+# que algún paso ha modificado; el resto de columnas se leen del original. Un
+# paso nuevo reutiliza las columnas del estado anterior y copia únicamente las
+# que cambia (las que tienen NaN que rellenar), así que la memoria crece con las
+# columnas tocadas y no con el número de pasos. Deshacer y rehacer solo mueven
+# la posición actual; `reproducir` vuelve a aplicar los mismos pasos a otro
+# DataFrame (p.ej. el mismo archivo recargado).
+
+opcionesHistorial = {
+    "Eliminar filas con NaN": None,
+    "Rellenar con la media (Numpy)": "media",
+    "Rellenar con la mediana": "mediana",
+    "Rellenar con un valor constante": "constante",
+}
+
+
+class EstadoPreprocesado:
+    """
+    Resultado de aplicar los pasos hasta un punto del historial.
+
+    Args:
+        filas (np.ndarray | None): Posiciones (en el DataFrame original) de las
+            filas que quedan; None si están todas.
+        columnas (dict): {nombre: Serie} de las columnas modificadas, alineadas
+            con el DataFrame original (todas sus filas).
+    """
+    def __init__(self, filas=None, columnas=None):
+        self.filas = filas
+        self.columnas = columnas if columnas is not None else {}
+
+
+class PasoPreprocesado:
+    """Operación registrada en el historial (lo necesario para repetirla)."""
+    def __init__(self, opcion, columnasEntrada, columnaSalida, constante=0):
+        self.opcion = opcion
+        self.columnasEntrada = list(columnasEntrada)
+        self.columnaSalida = columnaSalida
+        self.constante = constante
+
+    @property
+    def columnas(self):
+        return self.columnasEntrada + [self.columnaSalida]
+
+    def __repr__(self):
+        return f"PasoPreprocesado({self.opcion!r}, {self.columnas})"
+
+
+class HistorialPreprocesado:
+    """
+    Secuencia de pasos de preprocesado sobre un DataFrame, con deshacer/rehacer.
+
+    Args:
+        df (pd.DataFrame): DataFrame original (no se modifica).
+    """
+    def __init__(self, df):
+        self.base = df
+        self._estados = [EstadoPreprocesado()]
+        self._pasos = []
+        self._posicion = 0
+
+    # --- Consulta ---
+
+    @property
+    def estado(self):
+        return self._estados[self._posicion]
+
+    @property
+    def pasos(self):
+        """Pasos aplicados hasta la posición actual."""
+        return self._pasos[:self._posicion]
+
+    @property
+    def puedeDeshacer(self):
+        return self._posicion > 0
+
+    @property
+    def puedeRehacer(self):
+        return self._posicion < len(self._pasos)
+
+    def numeroFilas(self, estado=None):
+        filas = (estado or self.estado).filas
+        return len(self.base) if filas is None else len(filas)
+
+    def columna(self, nombre, estado=None):
+        """Columna en el estado indicado (el actual por defecto), con todas las filas del original."""
+        estado = estado or self.estado
+        serie = estado.columnas.get(nombre)
+        return serie if serie is not None else self.base[nombre]
+
+    def bytesModificados(self):
+        """Memoria ocupada por las columnas modificadas de todos los estados (sin contar repetidas)."""
+        vistas = {}
+        for estado in self._estados:
+            for serie in estado.columnas.values():
+                vistas[id(serie)] = serie
+        return int(sum(s.memory_usage(index=False, deep=False) for s in vistas.values()))
+
+    #Entradas: list[str] | None, EstadoPreprocesado | None -> Salidas: pd.DataFrame
+    def dataFrame(self, columnas=None, estado=None):
+        """
+        DataFrame del estado indicado (el actual por defecto) con las `columnas`
+        pedidas (todas si None). Si se han eliminado filas el índice es 0..n-1,
+        como dropna(ignore_index=True).
+        """
+        estado = estado or self.estado
+        columnas = list(self.base.columns) if columnas is None else list(columnas)
+        filas = estado.filas
+        datos = {}
+        for col in columnas:
+            # .array conserva los tipos de pandas (Int64, category...)
+            valores = self.columna(col, estado).array
+            datos[col] = valores if filas is None else valores.take(filas)
+        indice = self.base.index if filas is None else pd.RangeIndex(len(filas))
+        return pd.DataFrame(datos, index=indice, columns=columnas)
+
+    #Entradas: None -> Salidas: PipelinePreprocesado
+    def pipeline(self):
+        """
+        Pasos de relleno aplicados hasta ahora como transformadores ajustados, para
+        guardarlos con el modelo. Cada ImputadorNan se ajusta sobre el estado previo
+        a su paso (los mismos valores con los que se rellenó), pero para todas las
+        columnas numéricas del paso, no solo las que tenían NaN. Eliminar filas no
+        se traslada: al predecir no se descartan filas.
+        """
+        pasos = []
+        for i, paso in enumerate(self.pasos):
+            metodo = opcionesHistorial[paso.opcion]
+            if metodo is None:
+                continue
+            columnas = list(dict.fromkeys(paso.columnas))
+            valor = float(paso.constante) if metodo == "constante" else None
+            pasos.append(ImputadorNan(columnas, metodo, valor).ajustar(self.dataFrame(columnas, self._estados[i])))
+        return PipelinePreprocesado(pasos)
+
+    # --- Edición ---
+
+    #Entradas: str, list[str], str, float -> Salidas: str
+    def aplicar(self, opcion, columnasEntrada, columnaSalida, constante=0):
+        """
+        Aplica un paso sobre el estado actual y lo añade al historial (descartando
+        lo que se pudiera rehacer). Devuelve el mensaje con el resumen del paso.
+        """
+        if opcion not in opcionesHistorial:
+            raise ValueError(f"Opción de preprocesado desconocida: {opcion}")
+        if isinstance(columnasEntrada, str):
+            columnasEntrada = [columnasEntrada]
+        paso = PasoPreprocesado(opcion, columnasEntrada, columnaSalida, constante)
+        nuevoEstado, mensaje = self._ejecutar(paso, self.estado)
+        del self._estados[self._posicion + 1:]
+        del self._pasos[self._posicion:]
+        self._estados.append(nuevoEstado)
+        self._pasos.append(paso)
+        self._posicion += 1
+        return mensaje
+
+    def deshacer(self):
+        """Vuelve al estado anterior. Devuelve el paso deshecho (None si no había)."""
+        if not self.puedeDeshacer:
+            return None
+        self._posicion -= 1
+        return self._pasos[self._posicion]
+
+    def rehacer(self):
+        """Vuelve a aplicar el último paso deshecho (sin recalcularlo). Devuelve el paso o None."""
+        if not self.puedeRehacer:
+            return None
+        self._posicion += 1
+        return self._pasos[self._posicion - 1]
+
+    #Entradas: pd.DataFrame -> Salidas: HistorialPreprocesado
+    def reproducir(self, df):
+        """Nuevo historial con los pasos actuales aplicados, en orden, a otro DataFrame."""
+        historial = HistorialPreprocesado(df)
+        for paso in self.pasos:
+            historial.aplicar(paso.opcion, paso.columnasEntrada, paso.columnaSalida, paso.constante)
+        return historial
+
+    # --- Pasos ---
+
+    def _valoresActivos(self, estado, columna):
+        """Valores de la columna solo en las filas vivas (vista si no se ha eliminado ninguna)."""
+        valores = self.columna(columna, estado).to_numpy()
+        return valores if estado.filas is None else valores[estado.filas]
+
+    def _ejecutar(self, paso, estado):
+        metodo = opcionesHistorial[paso.opcion]
+        if metodo is None:
+            return self._eliminarFilas(paso, estado)
+        valor = float(paso.constante) if metodo == "constante" else None
+        nuevoEstado = self._rellenar(paso, estado, metodo, valor)
+        mensajes = {"media": "NaN rellenados con la media en columnas seleccionadas",
+                    "mediana": "NaN rellenados con la mediana en columnas seleccionadas",
+                    "constante": f"NaN rellenados con {paso.constante} en columnas seleccionadas"}
+        return nuevoEstado, mensajes[metodo]
+
+    def _eliminarFilas(self, paso, estado):
+        """Solo cambian las posiciones de las filas vivas: no se copia ninguna columna."""
+        filas = estado.filas if estado.filas is not None else np.arange(len(self.base))
+        nan = [pd.isna(self._valoresActivos(estado, col)) for col in paso.columnas]
+        nanAntes = int(sum(m.sum() for m in nan))
+        if nan:
+            filas = filas[~np.logical_or.reduce(nan)]
+        mensaje = f"Filas eliminadas: {self.numeroFilas(estado) - len(filas)}\nNaN eliminados: {nanAntes}"
+        return EstadoPreprocesado(filas, estado.columnas), mensaje
+
+    def _rellenar(self, paso, estado, metodo, valorConstante):
+        """Copia (y rellena) solo las columnas numéricas que tienen NaN en las filas vivas."""
+        columnas = dict(estado.columnas)
+        floats, otras = [], []
+        for col in dict.fromkeys(paso.columnas):
+            serie = self.columna(col, estado)
+            if not pd.api.types.is_numeric_dtype(serie.dtype):
+                continue
+            if esFloatNumpy(serie.dtype):
+                if np.isnan(self._valoresActivos(estado, col)).any():
+                    floats.append(col)
+            elif pd.isna(self._valoresActivos(estado, col)).any():
+                otras.append(col)
+
+        # Columnas float por tipo: medias/medianas de todas a la vez sobre un bloque 2D
+        for tipo in dict.fromkeys(self.columna(c, estado).dtype for c in floats):
+            grupo = [c for c in floats if self.columna(c, estado).dtype == tipo]
+            bloque = np.empty((self.numeroFilas(estado), len(grupo)), dtype=tipo, order="F")
+            for j, col in enumerate(grupo):
+                bloque[:, j] = self._valoresActivos(estado, col)
+            rellenarBloque(bloque, metodo, valorConstante)
+            for j, col in enumerate(grupo):
+                if estado.filas is None:
+                    valores = bloque[:, j]
+                else:
+                    valores = self.columna(col, estado).to_numpy().copy()
+                    valores[estado.filas] = bloque[:, j]
+                columnas[col] = pd.Series(valores, index=self.base.index, name=col, copy=False)
+
+        # Tipos de pandas que admiten nulos (Int64, Float64...)
+        for col in otras:
+            serie = self.columna(col, estado)
+            activa = serie if estado.filas is None else serie.iloc[estado.filas]
+            # El valor sale de las filas vivas; las eliminadas no se vuelven a leer, así que rellenarlas no importa
+            nueva = rellenarSerieNullable(serie, valorRellenoSerie(activa, metodo, valorConstante))
+            if nueva is not serie:
+                columnas[col] = nueva
+
+        return EstadoPreprocesado(estado.filas, columnas)
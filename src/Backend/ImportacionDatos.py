@@ -1,6 +1,16 @@
 import pandas as pd
+import numpy as np
 import sqlite3
 import os
+import threading
+from . import CacheDatos as cache
+
+# Filas por bloque al cargar un archivo en modo streaming.
+tamBloquePorDefecto = 100_000
+# Filas muestreadas para decidir los tipos en la carga compacta
+tamMuestraTipos = 10_000
+# Proporción máxima de valores distintos para convertir texto en categoría
+umbralCategorias = 0.5
 
 
 #Gestion de tipo de carga
@@ -16,19 +26,168 @@ def cargarCsvExcel(ruta):
 def cargarSqlite(ruta):
     """Carga la única tabla de una base de datos SQLite."""
     with sqlite3.connect(ruta) as con:
-        cursor = con.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tablas = cursor.fetchall()
-        
-        if len(tablas) == 0:
-            raise ValueError("La tabla no existe en la base de datos.")
-        if len(tablas) > 1:
-            raise ValueError("La base de datos debe contener exactamente una tabla.")
-            
-        nombreTabla = tablas[0][0]
+        nombreTabla = _nombreTablaUnica(con)
         return pd.read_sql_query(f"SELECT * FROM {nombreTabla}", con)
 
 
+def _nombreTablaUnica(con):
+    """Devuelve el nombre de la única tabla de la base de datos o lanza ValueError."""
+    tablas = con.execute("SELECT name FROM sqlite_master WHERE type='table';").fetchall()
+    if len(tablas) == 0:
+        raise ValueError("La tabla no existe en la base de datos.")
+    if len(tablas) > 1:
+        raise ValueError("La base de datos debe contener exactamente una tabla.")
+    return tablas[0][0]
+
+
+#Gestion de carga por bloques
+
+def leerPorBloques(ruta, tamBloque=tamBloquePorDefecto):
+    """
+    Generador que lee un archivo en bloques de `tamBloque` filas.
+
+    Args:
+        ruta (str): Ruta del archivo (.csv, .sqlite/.db o Excel).
+        tamBloque (int): Número de filas de cada bloque.
+
+    Yields:
+        tuple[pd.DataFrame, float]: El bloque leído y la fracción del archivo
+        procesada hasta ese momento (0.0 - 1.0).
+
+    Los archivos Excel no admiten lectura parcial, por lo que se devuelven
+    en un único bloque.
+    """
+    extension = obtenerExtension(ruta)
+    if extension == '.csv':
+        tamTotal = max(os.path.getsize(ruta), 1)
+        with open(ruta, 'rb') as f:
+            for bloque in pd.read_csv(f, chunksize=tamBloque):
+                # tell() avanza a saltos del buffer del parser, suficiente para informar del progreso
+                yield bloque, min(f.tell() / tamTotal, 1.0)
+    elif extension in ('.sqlite', '.db'):
+        with sqlite3.connect(ruta) as con:
+            nombreTabla = _nombreTablaUnica(con)
+            filasTotales = max(con.execute(f"SELECT COUNT(*) FROM {nombreTabla}").fetchone()[0], 1)
+            filasLeidas = 0
+            for bloque in pd.read_sql_query(f"SELECT * FROM {nombreTabla}", con, chunksize=tamBloque):
+                filasLeidas += len(bloque)
+                yield bloque, min(filasLeidas / filasTotales, 1.0)
+    else:
+        yield cargarCsvExcel(ruta), 1.0
+
+
+class CargaPorBloques:
+    """
+    Carga un archivo por bloques sin bloquear a quien la lanza.
+
+    El primer bloque se lee al crear el objeto y queda disponible en
+    `previsualizacion`; el resto se lee en un hilo de fondo que va acumulando
+    los bloques hasta terminar o hasta superar el presupuesto de memoria.
+
+    Atributos de estado (se pueden consultar desde otro hilo):
+        progreso (float): Fracción del archivo leída (0.0 - 1.0).
+        filasLeidas (int): Filas acumuladas hasta el momento.
+        truncado (bool): True si la lectura se detuvo por el límite de memoria.
+        error (Exception | None): Error producido durante la lectura de fondo.
+    """
+    def __init__(self, ruta, tamBloque=tamBloquePorDefecto, limiteMemoriaMB=None, callbackProgreso=None, usarCache=False, compacto=False):
+        """
+        Args:
+            ruta (str): Ruta del archivo a cargar.
+            tamBloque (int): Filas por bloque.
+            limiteMemoriaMB (float | None): Memoria máxima que pueden ocupar los
+                bloques acumulados. None para no limitar.
+            callbackProgreso (callable | None): Función `f(progreso, filasLeidas)`
+                que se invoca tras cada bloque. Se llama DESDE EL HILO DE FONDO.
+            usarCache (bool): Si es True, al terminar una lectura completa se guarda
+                el resultado en la caché en disco (también desde el hilo de fondo).
+            compacto (bool): Si es True, el DataFrame final se compacta con
+                `compactarTipos` en el hilo de fondo.
+        """
+        self.ruta = ruta
+        self.usarCache = usarCache
+        self.compacto = compacto
+        self.limiteBytes = None if limiteMemoriaMB is None else limiteMemoriaMB * 1024 * 1024
+        self.callbackProgreso = callbackProgreso
+        self.progreso = 0.0
+        self.filasLeidas = 0
+        self.memoriaBytes = 0
+        self.truncado = False
+        self.error = None
+        self._bloques = []
+        self._dfCompleto = None
+        self._cancelado = threading.Event()
+
+        # El primer bloque se lee en el hilo que llama para poder previsualizar al instante
+        self._lector = leerPorBloques(ruta, tamBloque)
+        primerBloque, fraccion = next(self._lector)
+        self.previsualizacion = primerBloque
+        if not self._anadirBloque(primerBloque, fraccion):
+            self.truncado = True
+
+        self._hilo = threading.Thread(target=self._leerResto, daemon=True)
+        self._hilo.start()
+
+    def _anadirBloque(self, bloque, fraccion):
+        """Acumula un bloque y actualiza el progreso. Devuelve False si se agota la memoria."""
+        self._bloques.append(bloque)
+        self.filasLeidas += len(bloque)
+        self.memoriaBytes += int(bloque.memory_usage(index=True, deep=True).sum())
+        self.progreso = fraccion
+        if self.callbackProgreso is not None:
+            self.callbackProgreso(self.progreso, self.filasLeidas)
+        return self.limiteBytes is None or self.memoriaBytes <= self.limiteBytes
+
+    def _leerResto(self):
+        """Cuerpo del hilo de fondo: consume el resto de bloques."""
+        try:
+            if not self.truncado:
+                for bloque, fraccion in self._lector:
+                    if self._cancelado.is_set():
+                        return
+                    if not self._anadirBloque(bloque, fraccion):
+                        self.truncado = True
+                        break
+            if self.compacto:
+                self._dfCompleto = _compactarConInforme(self._concatenar())
+            if self.usarCache and not self.truncado:
+                cache.guardarEnCache(self.ruta, self._concatenar(), variante=varianteCache(self.compacto))
+        except Exception as e:
+            self.error = e
+        finally:
+            self._lector.close()
+
+    def terminado(self):
+        """Indica si el hilo de fondo ha terminado (con éxito, error, truncado o cancelado)."""
+        return not self._hilo.is_alive()
+
+    def cancelar(self):
+        """Pide al hilo de fondo que deje de leer tras el bloque actual."""
+        self._cancelado.set()
+
+    def resultado(self, timeout=None):
+        """
+        Espera a que termine la lectura y devuelve el DataFrame completo.
+
+        Raises:
+            TimeoutError: Si la lectura no termina en `timeout` segundos.
+            ValueError: Si el archivo estaba corrupto a mitad de lectura.
+        """
+        self._hilo.join(timeout)
+        if self._hilo.is_alive():
+            raise TimeoutError("La carga por bloques todavía no ha terminado.")
+        if self.error is not None:
+            raise ValueError("Archivo corrupto o formato de archivo inválido.") from self.error
+        return self._concatenar()
+
+    def _concatenar(self):
+        """Une los bloques leídos en un único DataFrame (solo la primera vez)."""
+        if self._dfCompleto is None:
+            self._dfCompleto = pd.concat(self._bloques, ignore_index=True)
+            self._bloques = [self._dfCompleto]
+        return self._dfCompleto
+
+
 # Asocia cada extensión con la función de carga correspondiente.
 formatos = {
     ".csv": cargarCsvExcel,
@@ -38,6 +197,89 @@ formatos = {
     ".db": cargarSqlite,
 }
 
+#Optimizacion de tipos
+
+def _bytesMemoria(df):
+    """Memoria real ocupada por un DataFrame (incluye el contenido de los strings)."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _reducirNumerica(serie):
+    """
+    Devuelve la serie con el tipo numérico más pequeño que conserva todos sus valores.
+    Enteros: se usa el rango real (min/max) de la columna completa.
+    Decimales: solo se pasa a float32 si la conversión es exacta.
+    """
+    if pd.api.types.is_bool_dtype(serie):
+        return serie
+    if pd.api.types.is_integer_dtype(serie):
+        return pd.to_numeric(serie, downcast='integer')
+    if pd.api.types.is_float_dtype(serie) and serie.dtype != np.float32:
+        valores = serie.to_numpy()
+        reducidos = valores.astype(np.float32)
+        if np.array_equal(reducidos.astype(valores.dtype), valores, equal_nan=True):
+            return pd.Series(reducidos, index=serie.index, name=serie.name)
+    return serie
+
+
+def compactarTipos(df, tamMuestra=tamMuestraTipos, umbral=umbralCategorias):
+    """
+    Reduce la memoria de un DataFrame eligiendo tipos más pequeños.
+
+    Se toma una única muestra de filas para decidir qué hacer con cada columna
+    de texto; la conversión final se valida sobre la columna completa, así que
+    nunca se pierden datos:
+      - Texto con números -> tipo numérico (evita que cargaColumnasNumericas
+        tenga que reintentarlo después).
+      - Texto con pocos valores distintos -> category.
+      - Enteros y decimales -> el tipo más pequeño que admite sus valores.
+
+    Args:
+        df (pd.DataFrame): Datos a compactar (se modifica in-place).
+        tamMuestra (int): Filas de la muestra usada para decidir los tipos.
+        umbral (float): Proporción máxima de valores distintos para usar category.
+
+    Returns:
+        tuple[pd.DataFrame, dict]: El DataFrame compactado y un informe con la
+        memoria antes/después (MB), el ahorro (%) y los cambios por columna.
+    """
+    memoriaAntes = _bytesMemoria(df)
+    muestra = df.sample(n=tamMuestra, random_state=0) if len(df) > tamMuestra else df
+    cambios = {}
+
+    for col in df.columns:
+        serie = df[col]
+        tipoOriginal = str(serie.dtype)
+
+        if pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+            valoresMuestra = muestra[col].dropna()
+            convertidos = pd.to_numeric(valoresMuestra, errors='coerce')
+            if len(valoresMuestra) > 0 and convertidos.notna().all():
+                # La muestra es numérica: se confirma sobre la columna completa
+                try:
+                    serie = _reducirNumerica(pd.to_numeric(serie, errors='raise'))
+                except (ValueError, TypeError):
+                    pass
+            if not pd.api.types.is_numeric_dtype(serie) and valoresMuestra.nunique() <= umbral * max(len(valoresMuestra), 1):
+                if serie.nunique() <= umbral * max(len(serie), 1):
+                    serie = serie.astype('category')
+        elif pd.api.types.is_numeric_dtype(serie):
+            serie = _reducirNumerica(serie)
+
+        if str(serie.dtype) != tipoOriginal:
+            df[col] = serie
+            cambios[col] = f"{tipoOriginal} -> {serie.dtype}"
+
+    memoriaDespues = _bytesMemoria(df)
+    informe = {
+        "memoriaAntesMB": memoriaAntes / 1024**2,
+        "memoriaDespuesMB": memoriaDespues / 1024**2,
+        "ahorroPorcentaje": 100 * (1 - memoriaDespues / memoriaAntes) if memoriaAntes else 0.0,
+        "cambios": cambios,
+    }
+    return df, informe
+
+
 #Funciones Principales
 
 def obtenerExtension(ruta):
@@ -45,10 +287,22 @@ def obtenerExtension(ruta):
     _, extension = os.path.splitext(ruta)
     return extension.lower()
 
-def cargarDatos(ruta):
+def cargarDatos(ruta, porBloques=False, tamBloque=tamBloquePorDefecto, limiteMemoriaMB=None, callbackProgreso=None, usarCache=False, compacto=False):
     """
     Selecciona la función de carga adecuada según la extensión del archivo
     y maneja centralmente los errores durante la ejecución.
+
+    Con `porBloques=True` no devuelve un DataFrame sino un objeto
+    `CargaPorBloques`: su atributo `previsualizacion` contiene el primer bloque
+    y `resultado()` devuelve el DataFrame completo cuando el hilo de fondo termina.
+
+    Con `usarCache=True` se consulta primero la caché en disco (ver CacheDatos)
+    y, si el archivo ya se había cargado antes, se devuelve el DataFrame mapeado
+    en memoria sin volver a parsearlo. En caso contrario se guarda tras cargarlo.
+
+    Con `compacto=True` se aplica `compactarTipos` tras la carga y el informe de
+    memoria ahorrada queda en `df.attrs["informeCompactacion"]`. En la carga por
+    bloques la compactación se hace en el hilo de fondo al terminar la lectura.
     """
     extension = obtenerExtension(ruta)
     funcionCarga = formatos.get(extension)
@@ -57,7 +311,16 @@ def cargarDatos(ruta):
         raise ValueError("Formato de archivo inválido.")
         
     try:
-        return funcionCarga(ruta)
+        if porBloques:
+            return CargaPorBloques(ruta, tamBloque, limiteMemoriaMB, callbackProgreso, usarCache, compacto)
+        df = cache.cargarDesdeCache(ruta, variante=varianteCache(compacto)) if usarCache else None
+        if df is None:
+            df = funcionCarga(ruta)
+            if compacto:
+                df = _compactarConInforme(df)
+            if usarCache:
+                cache.guardarEnCache(ruta, df, variante=varianteCache(compacto))
+        return df
     
     # Gestion Errores
     except FileNotFoundError:
@@ -68,6 +331,18 @@ def cargarDatos(ruta):
         raise ValueError(f"Archivo corrupto o formato de archivo inválido.")
 
 
+def varianteCache(compacto):
+    """Variante de la entrada de caché: la carga compactada y la normal se guardan por separado."""
+    return "compacto" if compacto else ""
+
+
+def _compactarConInforme(df):
+    """Compacta el DataFrame y adjunta el informe de memoria en sus attrs."""
+    df, informe = compactarTipos(df)
+    df.attrs["informeCompactacion"] = informe
+    return df
+
+
 def previsualizar(ruta):
     """Carga datos y muestra una previsualización o un mensaje de error."""
     try:
@@ -0,0 +1,183 @@
+import weakref
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+
+# Perfil de columnas: tipo, si es convertible a número, nulos, cardinalidad,
+# mínimo, máximo y cuantiles aproximados de cada columna, calculados en una sola
+# pasada (las columnas en paralelo con hilos: numpy y el hash de pandas sueltan
+# el GIL). El perfil se guarda asociado al DataFrame, así que las decisiones
+# posteriores (columnas numéricas, detección de salida binaria, comprobación de
+# NaN) se responden sin volver a recorrer los datos.
+#
+# La caché se valida por número de filas y tipo de cada columna. Quien modifique
+# los valores de una columna sin cambiar su tipo debe llamar a `invalidarPerfil`.
+
+probabilidadesCuantiles = (0.05, 0.25, 0.5, 0.75, 0.95)
+# Los cuantiles (y el primer recuento de distintos) se estiman sobre una muestra
+# equiespaciada de como mucho estos valores
+_tamMuestra = 1 << 15
+# Si la muestra ya tiene más valores distintos que esto, la columna es continua:
+# no se cuentan todos (sería un hash de la columna entera) y `unicos` es una cota inferior
+_maxUnicosExactos = 1024
+# Por debajo de estas celdas no compensa repartir las columnas entre hilos
+_minCeldasParalelo = 1_000_000
+
+# id(df) -> (referencia débil al DataFrame, {columna: PerfilColumna})
+_perfiles = {}
+
+
+class PerfilColumna:
+    """
+    Resumen de una columna.
+
+    Args:
+        nombre (str): Nombre de la columna.
+        tipo (str): dtype de pandas.
+        numerica (bool): Si el dtype ya es numérico.
+        convertible (bool): Si es numérica o todos sus valores no nulos se pueden convertir a número.
+        filas (int): Número de filas.
+        nulos (int): Valores nulos (NaN, None, NA).
+        unicos (int): Valores distintos sin contar los nulos (cota inferior si
+            `unicosExactos` es False: columnas con muchos valores distintos).
+        minimo, maximo (float | None): Extremos (None si no es convertible o está vacía).
+        cuantiles (dict | None): {probabilidad: valor} aproximados sobre una muestra.
+    """
+    def __init__(self, nombre, tipo, numerica, convertible, filas, nulos, unicos,
+                 minimo=None, maximo=None, cuantiles=None, unicosExactos=True):
+        self.nombre = nombre
+        self.tipo = tipo
+        self.numerica = numerica
+        self.convertible = convertible
+        self.filas = filas
+        self.nulos = nulos
+        self.unicos = unicos
+        self.unicosExactos = unicosExactos
+        self.minimo = minimo
+        self.maximo = maximo
+        self.cuantiles = cuantiles
+
+    @property
+    def tieneNulos(self):
+        return self.nulos > 0
+
+    @property
+    def esBinaria(self):
+        return self.unicos == 2
+
+    def __repr__(self):
+        return (f"PerfilColumna({self.nombre!r}, {self.tipo}, nulos={self.nulos}, unicos={self.unicos}, "
+                f"min={self.minimo}, max={self.maximo})")
+
+
+def _muestra(validos):
+    """Muestra equiespaciada de como mucho _tamMuestra valores."""
+    if len(validos) > _tamMuestra:
+        return validos[::len(validos) // _tamMuestra]
+    return validos
+
+
+def _contarUnicos(valores):
+    """(valores distintos, si el recuento es exacto): con muchos distintos basta la muestra."""
+    unicosMuestra = len(pd.unique(_muestra(valores)))
+    if unicosMuestra > _maxUnicosExactos:
+        return unicosMuestra, False
+    return len(pd.unique(valores)), True
+
+
+def _resumenNumerico(valores):
+    """Nulos, distintos, extremos y cuantiles de un array numérico (NaN = nulo), como argumentos de PerfilColumna."""
+    if valores.dtype.kind == "b":
+        valores = valores.view(np.uint8)
+    if valores.dtype.kind == "f":
+        nan = np.isnan(valores)
+        nulos = int(np.count_nonzero(nan))
+        validos = valores[~nan] if nulos else valores
+    else:
+        nulos, validos = 0, valores
+    if len(validos) == 0:
+        return {"nulos": nulos, "unicos": 0}
+    unicos, exactos = _contarUnicos(validos)
+    cuantiles = np.quantile(_muestra(validos), probabilidadesCuantiles).tolist()
+    return {"nulos": nulos, "unicos": unicos, "unicosExactos": exactos, "minimo": validos.min().item(),
+            "maximo": validos.max().item(), "cuantiles": dict(zip(probabilidadesCuantiles, cuantiles))}
+
+
+#Entradas: pd.Series -> Salidas: PerfilColumna
+def perfilarColumna(serie):
+    """Perfil de una columna en una pasada (sin caché)."""
+    tipo = serie.dtype
+    numerica = pd.api.types.is_numeric_dtype(tipo)
+    if numerica:
+        if isinstance(tipo, np.dtype):
+            valores = serie.to_numpy()
+        else:
+            # Tipos de pandas que admiten nulos (Int64, Float64, boolean)
+            valores = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+        return PerfilColumna(serie.name, str(tipo), True, True, len(serie), **_resumenNumerico(valores))
+
+    nulos = int(serie.isna().sum())
+    if tipo == object or pd.api.types.is_string_dtype(tipo):
+        # Una sola conversión sin excepciones: es convertible si no aparecen nulos nuevos
+        convertidos = pd.to_numeric(serie, errors="coerce")
+        if int(convertidos.isna().sum()) == nulos:
+            convertidos = convertidos.to_numpy(dtype=np.float64, na_value=np.nan)
+            return PerfilColumna(serie.name, str(tipo), False, True, len(serie), **_resumenNumerico(convertidos))
+    unicos, exactos = _contarUnicos(serie.dropna().to_numpy())
+    return PerfilColumna(serie.name, str(tipo), False, False, len(serie), nulos, unicos, unicosExactos=exactos)
+
+
+def _perfilesEnCache(df):
+    entrada = _perfiles.get(id(df))
+    if entrada is None or entrada[0]() is not df:
+        perfiles = {}
+        _perfiles[id(df)] = (weakref.ref(df, lambda _, clave=id(df): _perfiles.pop(clave, None)), perfiles)
+        return perfiles
+    return entrada[1]
+
+
+#Entradas: pd.DataFrame, list[str] | None, int -> Salidas: dict[str, PerfilColumna]
+def perfilarDataFrame(df, columnas=None, nJobs=-1):
+    """
+    Perfil de las `columnas` de `df` (todas si None), calculando solo las que no
+    estén ya en la caché de ese DataFrame o hayan cambiado de tipo.
+    """
+    columnas = list(df.columns) if columnas is None else list(columnas)
+    perfiles = _perfilesEnCache(df)
+    pendientes = [c for c in columnas
+                  if c not in perfiles or perfiles[c].filas != len(df) or perfiles[c].tipo != str(df[c].dtype)]
+    if pendientes:
+        if len(pendientes) > 1 and len(df) * len(pendientes) >= _minCeldasParalelo:
+            nucleos = min(effective_n_jobs(nJobs), len(pendientes))
+            nuevos = Parallel(n_jobs=nucleos, prefer="threads")(delayed(perfilarColumna)(df[c]) for c in pendientes)
+        else:
+            nuevos = [perfilarColumna(df[c]) for c in pendientes]
+        perfiles.update(zip(pendientes, nuevos))
+    return {c: perfiles[c] for c in columnas}
+
+
+#Entradas: pd.DataFrame, list[str] | None -> Salidas: None
+def invalidarPerfil(df, columnas=None):
+    """Olvida el perfil de las `columnas` de `df` (todas si None) tras modificarlas."""
+    entrada = _perfiles.get(id(df))
+    if entrada is None or entrada[0]() is not df:
+        return
+    if columnas is None:
+        entrada[1].clear()
+    else:
+        for col in columnas:
+            entrada[1].pop(col, None)
+
+
+#Entradas: pd.DataFrame, pd.DataFrame -> Salidas: None
+def heredarPerfil(origen, destino):
+    """
+    Copia a `destino` el perfil ya calculado de sus columnas en `origen`. Solo
+    es válido si `destino` es una selección de columnas de `origen` con todas
+    sus filas (p.ej. df[columnas]).
+    """
+    perfilesOrigen = _perfilesEnCache(origen)
+    perfilesDestino = _perfilesEnCache(destino)
+    for col in destino.columns:
+        if col in perfilesOrigen:
+            perfilesDestino[col] = perfilesOrigen[col]
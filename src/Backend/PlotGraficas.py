@@ -1,51 +1,258 @@
-from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWidgets import QVBoxLayout, QWidget
-import plotly.graph_objects as go
+from PyQt6.QtCore import QUrl, QObject, pyqtSlot
+import os
 import numpy as np
-import pandas as pd
-from sklearn.metrics import confusion_matrix
-from sklearn.base import is_classifier
 from UI.UtilidadesInterfaz import Mensajes as msj
+from .CargaDiferida import importarDiferido
+from .SuperficieModelo import evaluarLinea, evaluarSuperficie
+from .DespachadorPrediccion import predecirAgrupado
+from .Submuestreo import submuestrear, puntosParaVista, maxPuntosPorDefecto, maxPuntos3D
+
+# Plotly, scikit-learn y QtWebEngine se cargan en el primer uso (ver CargaDiferida)
+go = importarDiferido("plotly.graph_objects")
+pio = importarDiferido("plotly.io")
+skMetricas = importarDiferido("sklearn.metrics")
+skBase = importarDiferido("sklearn.base")
+qtWebEngine = importarDiferido("PyQt6.QtWebEngineWidgets")
+qtWebChannel = importarDiferido("PyQt6.QtWebChannel")
+
+# Módulos que conviene precargar antes de la primera gráfica (QtWebEngine, en el hilo principal)
+modulosGraficas = ["plotly.graph_objects", "plotly.io", "sklearn.metrics", "sklearn.base"]
+modulosGraficasQt = ["PyQt6.QtWebEngineWidgets"]
+
+# Página base de los visores: carga plotly.js una sola vez y expone funciones
+# para redibujar o añadir/quitar trazas desde Python con runJavaScript. Los
+# cambios de zoom en 2D se avisan a Python por QWebChannel (objeto "visor").
+_htmlVisor = """<!DOCTYPE html>
+<html><head><meta charset="utf-8">
+<script src="plotly.min.js"></script>
+<script src="qrc:///qtwebchannel/qwebchannel.js"></script>
+<style>html, body { margin: 0; height: 100%; overflow: hidden; } #grafica { width: 100%; height: 100%; }</style>
+</head><body><div id="grafica"></div>
+<script>
+var div = document.getElementById('grafica');
+var config = {responsive: true};
+var visor = null, esperaZoom = null;
+if (typeof qt !== 'undefined' && typeof QWebChannel !== 'undefined') {
+    new QWebChannel(qt.webChannelTransport, function (canal) { visor = canal.objects.visor; });
+}
+function avisarZoom() {
+    var fl = div._fullLayout;
+    if (!visor || !fl || !fl.xaxis || !fl.yaxis) { return; }
+    visor.rangoCambiado(fl.xaxis.range[0], fl.xaxis.range[1], fl.yaxis.range[0], fl.yaxis.range[1],
+                        !!(fl.xaxis.autorange && fl.yaxis.autorange));
+}
+function escucharZoom() {
+    if (div.escuchaZoom) { return; }
+    div.escuchaZoom = true;
+    div.on('plotly_relayout', function (cambios) {
+        if (!Object.keys(cambios).some(function (k) { return k.indexOf('axis') >= 0; })) { return; }
+        clearTimeout(esperaZoom);
+        esperaZoom = setTimeout(avisarZoom, 150);
+    });
+}
+function dibujar(data, layout) { Plotly.react(div, data, layout, config).then(escucharZoom); }
+function actualizarTrazas(eliminar, nuevas) {
+    if (eliminar.length) { Plotly.deleteTraces(div, eliminar); }
+    if (nuevas.length) { Plotly.addTraces(div, nuevas); }
+}
+function refinar(datos, indice) { Plotly.restyle(div, datos, [indice]); }
+function limpiar() { Plotly.purge(div); div.escuchaZoom = false; }
+</script></body></html>"""
+
+
+class _PuenteVisor(QObject):
+    """Objeto publicado en la página por QWebChannel para recibir los cambios de zoom."""
+    def __init__(self, alCambiarRango, parent=None):
+        super().__init__(parent)
+        self._alCambiarRango = alCambiarRango
+
+    @pyqtSlot(float, float, float, float, bool)
+    def rangoCambiado(self, x0, x1, y0, y1, completo):
+        self._alCambiarRango(x0, x1, y0, y1, completo)
+
+
+class VisorPlotly:
+    """
+    Vista web persistente de un placeholder para mostrar figuras de Plotly.
+
+    Se crea una sola vez por placeholder y carga plotly.js desde el paquete
+    instalado (funciona sin conexión). Cada figura nueva se compara traza a
+    traza con la anterior: si solo cambian las últimas trazas (p.ej. el punto
+    de una predicción) se envían únicamente esas; si cambia el layout se
+    redibuja todo con Plotly.react, sin recargar la página.
+
+    Las trazas de dispersión submuestreadas (ver Submuestreo) guardan sus datos
+    completos en la figura; al hacer zoom en 2D se recalcula la submuestra del
+    rango visible y se sustituye con Plotly.restyle.
+    """
+    def __init__(self, placeholder):
+        limpiarLayout(placeholder)
+        self.vista = qtWebEngine.QWebEngineView()
+        self.listo = False
+        self._trazas = []
+        self._layout = None
+        self._pendiente = None
+        self.fuentesLod = {}
+
+        self._puente = _PuenteVisor(self._refinarRango, self.vista)
+        self._canal = qtWebChannel.QWebChannel(self.vista)
+        self._canal.registerObject("visor", self._puente)
+        self.vista.page().setWebChannel(self._canal)
+
+        layout = QVBoxLayout(placeholder)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.vista)
+        placeholder.setLayout(layout)
+
+        self.vista.loadFinished.connect(self._alCargar)
+        rutaPlotlyJs = os.path.join(os.path.dirname(pio.__file__), "..", "package_data", "plotly.min.js")
+        # La barra final es necesaria para que "plotly.min.js" se resuelva dentro de la carpeta
+        baseUrl = QUrl.fromLocalFile(os.path.dirname(os.path.abspath(rutaPlotlyJs)) + os.sep)
+        self.vista.setHtml(_htmlVisor, baseUrl)
+
+    def _alCargar(self, ok):
+        self.listo = ok
+        if ok and self._pendiente is not None:
+            trazas, layout = self._pendiente
+            self._pendiente = None
+            self._dibujarTodo(trazas, layout)
+
+    def _ejecutar(self, codigo):
+        self.vista.page().runJavaScript(codigo)
+
+    def _dibujarTodo(self, trazas, layout):
+        self._ejecutar(f"dibujar([{','.join(trazas)}], {layout});")
+        self._trazas, self._layout = trazas, layout
+
+    def mostrar(self, fig):
+        """Muestra la figura enviando a la página solo lo que ha cambiado."""
+        trazas = [pio.to_json(traza.to_plotly_json(), validate=False) for traza in fig.data]
+        layout = pio.to_json(fig.layout.to_plotly_json(), validate=False)
+        self.fuentesLod = dict(getattr(fig, "_fuentesLod", {}))
+
+        if not self.listo:
+            # La página aún no ha cargado plotly.js: se dibuja la última figura al terminar
+            self._pendiente = (trazas, layout)
+            return
+        if layout != self._layout or not self._trazas:
+            self._dibujarTodo(trazas, layout)
+            return
+
+        comunes = 0
+        while comunes < min(len(trazas), len(self._trazas)) and trazas[comunes] == self._trazas[comunes]:
+            comunes += 1
+        eliminar = list(range(comunes, len(self._trazas)))
+        nuevas = trazas[comunes:]
+        if eliminar or nuevas:
+            self._ejecutar(f"actualizarTrazas({eliminar}, [{','.join(nuevas)}]);")
+        self._trazas = trazas
+
+    def _refinarRango(self, x0, x1, y0, y1, completo):
+        """Sustituye las trazas submuestreadas por la submuestra del rango visible."""
+        # Se pide algo más que lo visible para que un desplazamiento corto no deje huecos
+        margenX, margenY = (x1 - x0) / 2, (y1 - y0) / 2
+        rango = None if completo else [(x0 - margenX, x1 + margenX), (y0 - margenY, y1 + margenY)]
+        for indice, fuente in self.fuentesLod.items():
+            columnas = fuente["columnas"]
+            if len(columnas) != 2 or indice >= len(self._trazas):
+                continue
+            seleccion = fuente["indices"] if completo else submuestrear(columnas, fuente["maxPuntos"], rango)
+            datos = {"x": [columnas[0][seleccion]], "y": [columnas[1][seleccion]]}
+            if fuente["colorPorX"]:
+                datos["marker.color"] = datos["x"]
+            self._ejecutar(f"refinar({pio.to_json(datos, validate=False)}, {indice});")
+            # La traza mostrada ya no coincide con la de la figura: la próxima se reenvía entera
+            self._trazas[indice] = None
+
+    def limpiar(self):
+        """Vacía la gráfica sin destruir la vista."""
+        self._pendiente = None
+        self._trazas, self._layout = [], None
+        self.fuentesLod = {}
+        if self.listo:
+            self._ejecutar("limpiar();")
+
+
+def obtenerVisor(placeholder):
+    """Devuelve el VisorPlotly del placeholder, creándolo la primera vez."""
+    visor = getattr(placeholder, "visorPlotly", None)
+    if visor is None:
+        visor = VisorPlotly(placeholder)
+        placeholder.visorPlotly = visor
+    return visor
+
+
+def prepararVisores(*placeholders):
+    """
+    Crea de antemano los visores (arranca el proceso web y carga plotly.js) para
+    que la primera gráfica se muestre sin esperas. Devuelve False si QtWebEngine
+    no está disponible.
+    """
+    try:
+        for placeholder in placeholders:
+            obtenerVisor(placeholder)
+    except ImportError as e:
+        print(f"No se pudieron preparar los visores de gráficas: {e}")
+        return False
+    return True
 
 
 def _mostrarPlotlyEnQt(fig, placeholder):
     """Helper para incrustar gráficas Plotly en el layout de Qt"""
-    limpiarLayout(placeholder)
-    vistaWeb = QWebEngineView()
-    html = fig.to_html(include_plotlyjs='cdn') 
-    vistaWeb.setHtml(html)
-    layout = QVBoxLayout(placeholder)
-    layout.addWidget(vistaWeb)
-    placeholder.setLayout(layout)
+    obtenerVisor(placeholder).mostrar(fig)
 
 
 
-def plotGrafica(xTrain, yTrain, xTest, yTest, columnasEntradaGraficada, columnaSalidaGraficada, dicColumnaSalida, modelo, placeholderGrafica, puntoPrediccion=None):
+def mostrarFigura(fig, placeholder):
     """
-    Orquestador principal para la generación de gráficas 2D/3D.
+    Muestra en la interfaz una figura ya construida (p.ej. en un hilo de fondo).
+    Debe llamarse desde el hilo de la interfaz.
+    """
+    if fig is not None:
+        _mostrarPlotlyEnQt(fig, placeholder)
+
+
+
+def construirFiguraGrafica(xTrain, yTrain, xTest, yTest, columnasEntradaGraficada, columnaSalidaGraficada, dicColumnaSalida, modelo, puntoPrediccion=None, maxPuntos=maxPuntosPorDefecto):
+    """
+    Construye la figura 2D/3D sin tocar la interfaz, por lo que puede llamarse
+    desde un hilo de fondo. Devuelve None si el modelo no es graficable.
+    `maxPuntos` limita los puntos enviados por cada traza de datos (en 3D,
+    como mucho maxPuntos3D).
     """
     nCols = len(columnasEntradaGraficada)
     if nCols == 0 or nCols > 2:
-        return 
+        return None
     
     if modelo is None:
-            return
+            return None
 
     fig = go.Figure()
 
     if nCols == 1:
-        _configurarGrafica2D(modelo, xTrain, yTrain, xTest, yTest, columnasEntradaGraficada, columnaSalidaGraficada, dicColumnaSalida, fig, puntoPrediccion)
+        _configurarGrafica2D(modelo, xTrain, yTrain, xTest, yTest, columnasEntradaGraficada, columnaSalidaGraficada, dicColumnaSalida, fig, puntoPrediccion, maxPuntos)
     elif nCols == 2:
-        _configurarGrafica3D(modelo,xTrain, yTrain, xTest, yTest, columnasEntradaGraficada, columnaSalidaGraficada, dicColumnaSalida, fig, puntoPrediccion)
+        _configurarGrafica3D(modelo,xTrain, yTrain, xTest, yTest, columnasEntradaGraficada, columnaSalidaGraficada, dicColumnaSalida, fig, puntoPrediccion, min(maxPuntos, maxPuntos3D))
+
+    return fig
+
+
 
-    _mostrarPlotlyEnQt(fig, placeholderGrafica)
+def plotGrafica(xTrain, yTrain, xTest, yTest, columnasEntradaGraficada, columnaSalidaGraficada, dicColumnaSalida, modelo, placeholderGrafica, puntoPrediccion=None):
+    """
+    Orquestador principal para la generación de gráficas 2D/3D.
+    """
+    fig = construirFiguraGrafica(xTrain, yTrain, xTest, yTest, columnasEntradaGraficada, columnaSalidaGraficada, dicColumnaSalida, modelo, puntoPrediccion,
+                                 puntosParaPlaceholder(placeholderGrafica))
+    mostrarFigura(fig, placeholderGrafica)
 
 
 
-def _configurarGrafica2D(modelo, xTrain, yTrain, xTest, yTest, columnasEntradaGraficada, columnaSalidaGraficada, dicColumnaSalida, fig, puntoPrediccion):
+def _configurarGrafica2D(modelo, xTrain, yTrain, xTest, yTest, columnasEntradaGraficada, columnaSalidaGraficada, dicColumnaSalida, fig, puntoPrediccion, maxPuntos=maxPuntosPorDefecto):
     """Configura gráfica 2D y aplica mapeo de texto en eje Y si existe."""
     nombreX = columnasEntradaGraficada[0]
-    xMin, xMax = _dibujarDatosReales2D(xTrain, yTrain, xTest, yTest, fig, nombreX)
+    xMin, xMax = _dibujarDatosReales2D(xTrain, yTrain, xTest, yTest, fig, nombreX, maxPuntos)
     
     if puntoPrediccion and xMin == 0 and xMax == 10:
         valX = puntoPrediccion[0][0]; xMin, xMax = valX - 5, valX + 5
@@ -71,10 +278,10 @@ def _configurarGrafica2D(modelo, xTrain, yTrain, xTest, yTest, columnasEntradaGr
 
 
 
-def _configurarGrafica3D(modelo, xTrain, yTrain, xTest, yTest, columnasEntradaGraficada, columnaSalidaGraficada, dicColumnaSalida, fig, puntoPrediccion):
+def _configurarGrafica3D(modelo, xTrain, yTrain, xTest, yTest, columnasEntradaGraficada, columnaSalidaGraficada, dicColumnaSalida, fig, puntoPrediccion, maxPuntos=maxPuntos3D):
     """Configura gráfica 3D y aplica mapeo de texto en eje Z si existe."""
     nombreX, nombreY = columnasEntradaGraficada
-    limites = _dibujarDatosReales3D(xTrain, yTrain, xTest, yTest, fig, nombreX, nombreY)
+    limites = _dibujarDatosReales3D(xTrain, yTrain, xTest, yTest, fig, nombreX, nombreY, maxPuntos)
     
     if puntoPrediccion and limites == (0, 10, 0, 10):
         vx, vy = puntoPrediccion[0]; limites = (vx-5, vx+5, vy-5, vy+5)
@@ -95,22 +302,20 @@ def _configurarGrafica3D(modelo, xTrain, yTrain, xTest, yTest, columnasEntradaGr
     fig.update_layout(title="Modelo 3D", scene=sceneDict)
 
 
-def _configurarGraficaCorrelacion(modelo, xTest, yTest, columnaSalidaGraficada, fig):
+def _configurarGraficaCorrelacion(modelo, xTest, yTest, columnaSalidaGraficada, fig, maxPuntos=maxPuntosPorDefecto):
     """Genera la gráfica clásica de Real vs Predicho para regresión."""
-    yPred = modelo.predict(xTest)
+    yPred = predecirAgrupado(modelo, xTest)
     
-    # Puntos
-    fig.add_trace(go.Scatter(
-        x=yTest, y=yPred, 
+    # Puntos (el color sigue al valor real: mantener escala visual)
+    _agregarDispersion(fig, go.Scatter, [yTest, yPred], maxPuntos, colorPorX=True,
         mode='markers', name='Datos Test',
         marker=dict(
-            color=yTest, # Opcional: mantener escala visual
             colorscale='Viridis',
             showscale=True,
             opacity=0.7,
             line=dict(width=0.5, color='DarkSlateGrey')
         )
-    ))
+    )
 
     # Línea Ideal
     minVal = min(yTest.min(), yPred.min())
@@ -131,7 +336,7 @@ def _configurarGraficaCorrelacion(modelo, xTest, yTest, columnaSalidaGraficada,
 
 # --- MÉTODOS HELPER 2D (Privados) ---
 
-def _dibujarDatosReales2D(xTrain, yTrain, xTest, yTest, fig, colX):
+def _dibujarDatosReales2D(xTrain, yTrain, xTest, yTest, fig, colX, maxPuntos=maxPuntosPorDefecto):
     """Dibuja scatter de entrenamiento y test si existen. Retorna (min, max) de X."""
     xMin, xMax = 0, 10 # Valores por defecto
 
@@ -140,8 +345,8 @@ def _dibujarDatosReales2D(xTrain, yTrain, xTest, yTest, fig, colX):
         xTr = _extraerColumna(xTrain, colX)
         xTe = _extraerColumna(xTest, colX)
 
-        fig.add_trace(go.Scatter(x=xTr, y=yTrain, mode='markers', name='Entrenamiento', marker=dict(color='blue', opacity=0.5)))
-        fig.add_trace(go.Scatter(x=xTe, y=yTest, mode='markers', name='Test', marker=dict(color='orange', opacity=0.5)))
+        _agregarDispersion(fig, go.Scatter, [xTr, yTrain], maxPuntos, mode='markers', name='Entrenamiento', marker=dict(color='blue', opacity=0.5))
+        _agregarDispersion(fig, go.Scatter, [xTe, yTest], maxPuntos, mode='markers', name='Test', marker=dict(color='orange', opacity=0.5))
         
         if len(xTr) > 0:
             xMin, xMax = min(xTr.min(), xTe.min()), max(xTr.max(), xTe.max())
@@ -151,16 +356,12 @@ def _dibujarDatosReales2D(xTrain, yTrain, xTest, yTest, fig, colX):
 
 
 def _dibujarLineaModelo(modelo, fig, colX, xMin, xMax):
-    """Genera la línea de regresión evaluando el modelo."""
+    """Genera la línea de regresión evaluando el modelo (rejilla adaptativa y cacheada)."""
     # Calcular margen visual
     padding = (xMax - xMin) * 0.1 if xMax != xMin else 1
-    xRange = np.linspace(xMin - padding, xMax + padding, 100)
-    
-    # Crear DataFrame explícito para respetar nombres de columnas del modelo
-    dfRange = pd.DataFrame({colX: xRange})
     
     try:
-        yRange = modelo.predict(dfRange)
+        xRange, yRange = evaluarLinea(modelo, colX, xMin - padding, xMax + padding)
         fig.add_trace(go.Scatter(x=xRange, y=yRange, mode='lines', name='Modelo', line=dict(color='red', width=3)))
     except Exception:
         # Silenciosamente ignoramos si falla la predicción de rango (ej: tipo de dato incompatible)
@@ -169,7 +370,7 @@ def _dibujarLineaModelo(modelo, fig, colX, xMin, xMax):
 
 # --- MÉTODOS HELPER 3D (Privados) ---
 
-def _dibujarDatosReales3D(xTrain, yTrain, xTest, yTest, fig, colX, colY):
+def _dibujarDatosReales3D(xTrain, yTrain, xTest, yTest, fig, colX, colY, maxPuntos=maxPuntos3D):
     """Dibuja scatter 3D de entrenamiento y test si existen. Retorna límites."""
     bounds = (0, 10, 0, 10)
 
@@ -182,8 +383,8 @@ def _dibujarDatosReales3D(xTrain, yTrain, xTest, yTest, fig, colX, colY):
         yTe = _extraerColumna(xTest, colY)
         zTe = yTest
 
-        fig.add_trace(go.Scatter3d(x=xTr, y=yTr, z=zTr, mode='markers', name='Train', marker=dict(size=4, color='blue', opacity=0.5)))
-        fig.add_trace(go.Scatter3d(x=xTe, y=yTe, z=zTe, mode='markers', name='Test', marker=dict(size=4, color='orange', opacity=0.5)))
+        _agregarDispersion(fig, go.Scatter3d, [xTr, yTr, zTr], maxPuntos, mode='markers', name='Train', marker=dict(size=4, color='blue', opacity=0.5))
+        _agregarDispersion(fig, go.Scatter3d, [xTe, yTe, zTe], maxPuntos, mode='markers', name='Test', marker=dict(size=4, color='orange', opacity=0.5))
         
         if len(xTr) > 0:
             bounds = (xTr.min(), xTr.max(), yTr.min(), yTr.max())
@@ -193,31 +394,46 @@ def _dibujarDatosReales3D(xTrain, yTrain, xTest, yTest, fig, colX, colY):
 
 
 def _dibujarSuperficieModelo(modelo, fig, colX, colY, limites):
-    """Genera la malla 3D del modelo."""
-    xMin, xMax, yMin, yMax = limites
-    
-    # Crear malla
-    xLin = np.linspace(xMin, xMax, 20)
-    yLin = np.linspace(yMin, yMax, 20)
-    xMesh, yMesh = np.meshgrid(xLin, yLin)
-    
-    # Aplanar para predecir
-    xyFlat = np.c_[xMesh.ravel(), yMesh.ravel()]
-    dfMesh = pd.DataFrame(xyFlat, columns=[colX, colY])
+    """Genera la malla 3D del modelo (rejilla adaptativa y cacheada)."""
+    # Solo graficamos superficie si la salida es numérica (para evitar error en clasificación de texto)
+    if skBase.is_classifier(modelo):
+        return
     
     try:
-        zFlat = modelo.predict(dfMesh)
-        
-        # Solo graficamos superficie si la salida es numérica (para evitar error en clasificación de texto)
-        if  not is_classifier(modelo):
-            zMesh = zFlat.reshape(xMesh.shape)
-            fig.add_trace(go.Surface(z=zMesh, x=xLin, y=yLin, colorscale='Reds', opacity=0.5, name='Modelo', showscale=False))
+        xLin, yLin, zMesh = evaluarSuperficie(modelo, colX, colY, limites)
+        fig.add_trace(go.Surface(z=zMesh, x=xLin, y=yLin, colorscale='Reds', opacity=0.5, name='Modelo', showscale=False))
     except Exception:
         pass
 
 
 # --- UTILIDADES ---
 
+def puntosParaPlaceholder(placeholder):
+    """Presupuesto de puntos por traza según el tamaño en pantalla del placeholder."""
+    return puntosParaVista(placeholder.width(), placeholder.height())
+
+
+
+def _agregarDispersion(fig, tipoTraza, columnas, maxPuntos, colorPorX=False, **propiedades):
+    """
+    Añade un diagrama de dispersión con nivel de detalle: solo se envía una
+    submuestra (ver Submuestreo) y, si se ha reducido, los datos completos se
+    guardan en `fig._fuentesLod` para que el visor refine al hacer zoom.
+    """
+    columnas = [np.asarray(c) for c in columnas]
+    indices = submuestrear(columnas, maxPuntos)
+    ejes = dict(zip(("x", "y", "z"), (c[indices] for c in columnas)))
+    if colorPorX:
+        propiedades["marker"] = dict(propiedades.get("marker", {}), color=ejes["x"])
+    fig.add_trace(tipoTraza(**ejes, **propiedades))
+
+    if len(indices) < len(columnas[0]):
+        fuentes = getattr(fig, "_fuentesLod", {})
+        fuentes[len(fig.data) - 1] = dict(columnas=columnas, indices=indices, maxPuntos=maxPuntos, colorPorX=colorPorX)
+        fig._fuentesLod = fuentes
+
+
+
 def _extraerColumna(data, nombre_col):
     """Extrae una columna de DataFrame o Series de forma segura."""
     if hasattr(data, 'columns'):
@@ -257,16 +473,9 @@ def plotCorrelacion(parent, modelo, xTest, yTest, columnaSalidaGraficada, dicCol
         limpiarLayout(placeholderCorrelacion)
         return
 
-    fig = go.Figure()
-
     try:
-        # Determinamos si es Clasificación (Texto/Categoría) o Regresión (Números)
-        esClasificador =  is_classifier(modelo)
-        if not esClasificador:
-            _configurarGraficaCorrelacion(modelo, xTest, yTest, columnaSalidaGraficada, fig)
-        else:
-            _configurarMatrizConfusion(modelo, dicColumnaSalida, xTest, yTest, fig)
-
+        fig = construirFiguraCorrelacion(modelo, xTest, yTest, columnaSalidaGraficada, dicColumnaSalida,
+                                         puntosParaPlaceholder(placeholderCorrelacion))
         _mostrarPlotlyEnQt(fig, placeholderCorrelacion)
         
     except Exception as e:
@@ -274,9 +483,27 @@ def plotCorrelacion(parent, modelo, xTest, yTest, columnaSalidaGraficada, dicCol
 
 
 
+def construirFiguraCorrelacion(modelo, xTest, yTest, columnaSalidaGraficada, dicColumnaSalida, maxPuntos=maxPuntosPorDefecto):
+    """
+    Construye la figura de estadísticas sin tocar la interfaz (apta para hilos de fondo).
+    Lanza la excepción original si no se puede generar.
+    """
+    fig = go.Figure()
+
+    # Determinamos si es Clasificación (Texto/Categoría) o Regresión (Números)
+    esClasificador =  skBase.is_classifier(modelo)
+    if not esClasificador:
+        _configurarGraficaCorrelacion(modelo, xTest, yTest, columnaSalidaGraficada, fig, maxPuntos)
+    else:
+        _configurarMatrizConfusion(modelo, dicColumnaSalida, xTest, yTest, fig)
+
+    return fig
+
+
+
 def _configurarMatrizConfusion(modelo, dicColumnaSalida, xTest, yTest, fig):
     """Genera Matriz de Confusión usando nombres reales si existen en el diccionario."""
-    yPred = modelo.predict(xTest)
+    yPred = predecirAgrupado(modelo, xTest)
     
     # Obtenemos las etiquetas numéricas presentes (0, 1)
     lblsNum = sorted(list(set(yTest) | set(yPred)))
@@ -288,7 +515,7 @@ def _configurarMatrizConfusion(modelo, dicColumnaSalida, xTest, yTest, fig):
     else:
         lblsText = [str(l) for l in lblsNum]
 
-    cm = confusion_matrix(yTest, yPred, labels=lblsNum)
+    cm = skMetricas.confusion_matrix(yTest, yPred, labels=lblsNum)
     
     # Usamos 'lblsText' para los ejes X e Y del Heatmap
     fig.add_trace(go.Heatmap(
@@ -313,7 +540,11 @@ def limpiarGrafica(placeholderGrafica, placeholderCorrelacion):
 
 
 def limpiarLayout(widgetPlaceholder):
-    """Función auxiliar segura para borrar layouts con WebEngines"""
+    """Función auxiliar segura para borrar layouts con WebEngines (los visores persistentes solo se vacían)"""
+    visor = getattr(widgetPlaceholder, "visorPlotly", None)
+    if visor is not None:
+        visor.limpiar()
+        return
     if widgetPlaceholder.layout() is not None:
         oldLayout = widgetPlaceholder.layout()
         while oldLayout.count():
@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+
+from . import GestionDatos as gd
+from .PuntuadorLineal import obtenerPuntuador
+from .ImportacionDatos import leerPorBloques, obtenerExtension, tamBloquePorDefecto
+
+# Predicción por lotes: aplica un modelo guardado a un archivo completo.
+# El archivo se lee por bloques y las predicciones se escriben según se calculan,
+# así que la memoria no depende del tamaño del archivo sino de `tamBloque`
+# y del número de bloques en vuelo (dos por núcleo).
+
+
+def _predecirBloque(modelo, bloque, columnasEntrada, columnaPrediccion, inversoSalida, preprocesado=None):
+    """Predice un bloque y devuelve el bloque con la columna de predicción añadida."""
+    entradas = bloque[columnasEntrada]
+    if preprocesado is not None:
+        # Imputación ajustada al entrenar: la salida conserva los NaN originales
+        entradas = preprocesado.transformar(entradas)
+    puntuador = obtenerPuntuador(modelo)
+    if puntuador is not None:
+        # Modelos lineales: producto matricial directo, sin las validaciones de sklearn
+        valores = puntuador.predecir(entradas.to_numpy(dtype=float))
+    else:
+        valores = modelo.predict(entradas)
+    prediccion = pd.Series(valores, index=bloque.index)
+    if inversoSalida:
+        # Salida binaria de texto transformada a 0/1: se devuelven las etiquetas originales
+        prediccion = prediccion.map(inversoSalida).fillna(prediccion)
+    bloque[columnaPrediccion] = prediccion
+    return bloque
+
+
+def _escritorCsv(rutaSalida):
+    """Escritor incremental de CSV (cabecera solo en el primer bloque)."""
+    f = open(rutaSalida, 'w', newline='', encoding='utf-8')
+    primero = [True]
+
+    def escribir(bloque):
+        bloque.to_csv(f, header=primero[0], index=False)
+        primero[0] = False
+    return escribir, f.close
+
+
+def _escritorSqlite(rutaSalida, tabla="predicciones"):
+    """Escritor incremental a una tabla SQLite (se reemplaza si ya existía)."""
+    con = sqlite3.connect(rutaSalida)
+    con.execute(f'DROP TABLE IF EXISTS "{tabla}"')
+
+    def escribir(bloque):
+        bloque.to_sql(tabla, con, if_exists='append', index=False)
+
+    def cerrar():
+        con.commit()
+        con.close()
+    return escribir, cerrar
+
+
+#Entradas: dict | str, str, str, int, int, callable | None, bool -> Salidas: int
+def predecirArchivo(modelo, rutaEntrada, rutaSalida, tamBloque=tamBloquePorDefecto, nJobs=-1,
+                    callbackProgreso=None, incluirEntradas=True):
+    """
+    Predice todas las filas de un archivo CSV/SQLite con un modelo guardado.
+
+    Los bloques se predicen en paralelo (hilos: el modelo se comparte sin copiarlo
+    y predict de sklearn/numpy libera el GIL) y se escriben en el mismo orden en
+    que se leyeron.
+
+    Args:
+        modelo (dict | str): Diccionario del modelo (como el de `crearDiccionarioModelo`)
+            o ruta al archivo .pkl guardado con `crearModeloDisco`. Si tiene un
+            preprocesado ajustado, se aplica a cada bloque antes de predecir.
+        rutaEntrada (str): Archivo con las columnas de entrada del modelo.
+        rutaSalida (str): Archivo de salida (.csv, o .sqlite/.db para una tabla "predicciones").
+        tamBloque (int): Filas por bloque.
+        nJobs (int): Hilos de predicción (-1 = todos los núcleos).
+        callbackProgreso (callable | None): Función `f(fraccion, filasEscritas)` llamada tras cada bloque.
+        incluirEntradas (bool): Si es False, la salida solo contiene la columna de predicción.
+
+    Returns:
+        int: Número de filas escritas.
+    """
+    datosModelo = gd.cargarModeloDisco(modelo) if isinstance(modelo, str) else modelo
+    estimador = datosModelo.get("modelo")
+    columnasEntrada = list(datosModelo.get("columnasEntrada") or [])
+    if estimador is None or not columnasEntrada:
+        raise ValueError("El archivo no contiene un modelo válido.")
+
+    columnaPrediccion = f"prediccion_{datosModelo.get('columnaSalida') or 'salida'}"
+    dicSalida = datosModelo.get("dicColumnaSalida")
+    preprocesado = datosModelo.get("preprocesado")
+    inversoSalida = {v: k for k, v in dicSalida.items()} if dicSalida else None
+
+    if os.path.abspath(rutaEntrada) == os.path.abspath(rutaSalida):
+        raise ValueError("El archivo de salida no puede ser el mismo que el de entrada.")
+
+    progreso = [0.0]
+
+    def bloquesValidados():
+        for bloque, fraccion in leerPorBloques(rutaEntrada, tamBloque):
+            faltan = [c for c in columnasEntrada if c not in bloque.columns]
+            if faltan:
+                raise ValueError(f"Faltan columnas de entrada del modelo en el archivo: {', '.join(faltan)}")
+            if not incluirEntradas:
+                bloque = bloque[columnasEntrada]
+            progreso[0] = fraccion
+            yield bloque
+
+    if obtenerExtension(rutaSalida) in ('.sqlite', '.db'):
+        escribir, cerrar = _escritorSqlite(rutaSalida)
+    else:
+        escribir, cerrar = _escritorCsv(rutaSalida)
+
+    filasEscritas = 0
+    nucleos = effective_n_jobs(nJobs)
+    try:
+        # return_as="generator" + pre_dispatch acotan los bloques en memoria y mantienen el orden
+        paralelo = Parallel(n_jobs=nucleos, prefer="threads", return_as="generator",
+                            pre_dispatch=f"{2 * nucleos}")
+        for resultado in paralelo(
+            delayed(_predecirBloque)(estimador, bloque, columnasEntrada, columnaPrediccion, inversoSalida,
+                                     preprocesado)
+            for bloque in bloquesValidados()
+        ):
+            if not incluirEntradas:
+                resultado = resultado[[columnaPrediccion]]
+            escribir(resultado)
+            filasEscritas += len(resultado)
+            if callbackProgreso:
+                callbackProgreso(progreso[0], filasEscritas)
+    finally:
+        cerrar()
+
+    return filasEscritas
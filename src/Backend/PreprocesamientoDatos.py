@@ -11,30 +11,31 @@ def aplicarPreprocesadoCalcular(columnasEntrada, columnaSalida, df, opcion, cons
 
         columnasSeleccionadas = columnasEntrada + [columnaSalida]
 
-        dfProcesado = df.copy(deep=True)
+        # Solo se copian las columnas seleccionadas (una vez); el resto del DataFrame no se toca
         tamDf = len(df)
         try:
             match opcion:
                 case "Eliminar filas con NaN":
-                    nanAntes = dfProcesado[columnasSeleccionadas].isna().sum().sum()
-                    # Eliminar filas que tengan NaN en las columnas seleccionadas
-                    dfProcesado.dropna(subset=columnasSeleccionadas,
-                                        inplace=True, ignore_index=True)
+                    # Máscara de filas completas calculada sobre el original: se copian solo las que quedan
+                    nanPorColumna = [df[col].isna().to_numpy() for col in columnasSeleccionadas]
+                    nanAntes = int(sum(nan.sum() for nan in nanPorColumna))
+                    filasCompletas = ~np.logical_or.reduce(nanPorColumna) if nanPorColumna else np.ones(tamDf, dtype=bool)
+                    dfProcesado = copiarColumnas(df, columnasSeleccionadas, filasCompletas)
                     
                     mensaje = f"Filas eliminadas: {tamDf - len(dfProcesado)}\nNaN eliminados: {nanAntes}"
 
                 case "Rellenar con la media (Numpy)":
-                    dfProcesado = rellenarNanColumnasNumericas(dfProcesado, columnasEntrada, columnaSalida, metodo='media')
+                    dfProcesado = rellenarNanColumnasNumericas(df, columnasEntrada, columnaSalida, metodo='media')
                     mensaje = "NaN rellenados con la media en columnas seleccionadas"
 
                 case "Rellenar con la mediana":
-                    dfProcesado = rellenarNanColumnasNumericas(dfProcesado, columnasEntrada, columnaSalida, metodo='mediana')
+                    dfProcesado = rellenarNanColumnasNumericas(df, columnasEntrada, columnaSalida, metodo='mediana')
                     mensaje = "NaN rellenados con la mediana en columnas seleccionadas"
         
 
                 case "Rellenar con un valor constante":
                         dfProcesado = rellenarNanColumnasNumericas(
-                            dfProcesado,
+                            df,
                             columnasEntrada, 
                             columnaSalida,
                             metodo='constante',
@@ -45,41 +46,164 @@ def aplicarPreprocesadoCalcular(columnasEntrada, columnaSalida, df, opcion, cons
         except Exception as e:
             raise Exception
 
-        return dfProcesado[columnasSeleccionadas],  mensaje, columnasSeleccionadas
+        return dfProcesado,  mensaje, columnasSeleccionadas
 
 
 
+def _tramosPorTipo(df, columnas):
+        """Agrupa las columnas consecutivas que comparten dtype: [(dtype, [columnas]), ...]."""
+        tramos = []
+        for col in columnas:
+            tipo = df[col].dtype
+            if tramos and tramos[-1][0] == tipo:
+                tramos[-1][1].append(col)
+            else:
+                tramos.append((tipo, [col]))
+        return tramos
+
+
+def esFloatNumpy(tipo):
+        return isinstance(tipo, np.dtype) and tipo.kind == 'f'
+
+
+def copiarColumnas(df, columnas, filas=None, tratarBloque=None):
+        """
+        Copia solo `columnas` (y solo las `filas` de la máscara booleana, si se da,
+        con un índice nuevo 0..n-1 como dropna(ignore_index=True)).
+
+        Cada tramo de columnas float consecutivas se copia directamente en un único
+        array 2D en orden Fortran; `tratarBloque(bloque, tramo)`, si se da, lo
+        modifica in situ antes de envolverlo en el DataFrame resultante.
+        """
+        indice = df.index if filas is None else pd.RangeIndex(int(np.count_nonzero(filas)))
+        partes = []
+        for tipo, tramo in _tramosPorTipo(df, columnas):
+            if esFloatNumpy(tipo):
+                bloque = np.empty((len(indice), len(tramo)), dtype=tipo, order='F')
+                for j, col in enumerate(tramo):
+                    if filas is None:
+                        bloque[:, j] = df[col].to_numpy()
+                    else:
+                        np.compress(filas, df[col].to_numpy(), out=bloque[:, j])
+                if tratarBloque is not None:
+                    tratarBloque(bloque, tramo)
+                partes.append(pd.DataFrame(bloque, index=indice, columns=tramo, copy=False))
+            else:
+                parte = df[tramo] if filas is None else df.loc[filas, tramo]
+                parte.index = indice
+                partes.append(parte)
+        if not partes:
+            return pd.DataFrame(index=indice)
+        return partes[0] if len(partes) == 1 else pd.concat(partes, axis=1, copy=False)
+
+
+# Tamaño máximo de la copia ordenada que usa _medianaSinNan
+_maxBytesOrdenacion = 64 * 1024 * 1024
+
+
+def _medianaSinNan(bloque):
+        """
+        Mediana exacta de cada columna ignorando NaN, ordenando varias columnas a la
+        vez. Se procesa por grupos de columnas para que la copia ordenada no pase de
+        _maxBytesOrdenacion (ordenar el bloque entero duplicaría su memoria).
+        """
+        porGrupo = max(1, _maxBytesOrdenacion // max(bloque.shape[0] * bloque.itemsize, 1))
+        if bloque.shape[1] > porGrupo:
+            return np.concatenate([_medianaSinNan(bloque[:, i:i + porGrupo])
+                                   for i in range(0, bloque.shape[1], porGrupo)])
+        ordenado = np.sort(bloque, axis=0)  # los NaN quedan al final de cada columna
+        cuenta = (~np.isnan(bloque)).sum(axis=0)
+        bajo = np.take_along_axis(ordenado, np.maximum((cuenta - 1) // 2, 0)[None, :], axis=0)[0]
+        alto = np.take_along_axis(ordenado, (cuenta // 2)[None, :], axis=0)[0]
+        return np.where(cuenta > 0, (bajo.astype(np.float64) + alto) / 2, np.nan)
+
+
+def valoresRelleno(bloque, metodo, valorConstante=None, nan=None):
+        """
+        Valor de relleno de cada columna de un bloque 2D float (NaN en las columnas
+        sin ningún valor), o None si el método no aplica.
+        """
+        if nan is None:
+            nan = np.isnan(bloque)
+        if metodo == 'media':
+            validos = ~nan
+            with np.errstate(invalid='ignore', divide='ignore'):
+                # Columnas sin ningún valor: la media es NaN y se quedan como están
+                return np.add.reduce(bloque, axis=0, where=validos, dtype=np.float64) / validos.sum(axis=0)
+        if metodo == 'mediana':
+            return _medianaSinNan(bloque)
+        if metodo == 'constante' and valorConstante is not None:
+            return np.full(bloque.shape[1], valorConstante, dtype=np.float64)
+        return None
+
+
+def rellenarBloque(bloque, metodo, valorConstante=None):
+        """Rellena in situ los NaN de un bloque 2D float, calculando los valores de todas sus columnas a la vez."""
+        nan = np.isnan(bloque)
+        conNan = nan.any(axis=0)
+        if not conNan.any():
+            return
+        if metodo == 'mediana':
+            # Solo se ordenan las columnas que hay que rellenar
+            valores = np.full(bloque.shape[1], np.nan)
+            valores[conNan] = _medianaSinNan(bloque[:, conNan])
+        else:
+            valores = valoresRelleno(bloque, metodo, valorConstante, nan)
+            if valores is None:
+                return
+        np.copyto(bloque, valores, where=nan, casting='same_kind')
+
+
+def valorRellenoSerie(serie, metodo, valorConstante=None):
+        """Valor de relleno de una serie (media, mediana o la constante), o None si no hay ninguno."""
+        valor = {'media': serie.mean, 'mediana': serie.median}.get(metodo, lambda: valorConstante)()
+        return None if valor is None or pd.isna(valor) else valor
+
+
+def rellenarSerieNullable(serie, valor):
+        """
+        Rellena los nulos de una serie de un tipo de pandas que los admite (Int64,
+        Float64...) con `valor`. Devuelve una serie nueva, o la misma si no hay nada
+        que rellenar. Un Int64 pasa a Float64 si el valor es decimal.
+        """
+        if valor is None or pd.isna(valor) or not serie.hasnans:
+            return serie
+        if pd.api.types.is_integer_dtype(serie.dtype) and not float(valor).is_integer():
+            serie = serie.astype("Float64")  # Int64 no admite la media decimal
+        return serie.fillna(valor)
+
+
 def rellenarNanColumnasNumericas(df, columnasEntrada, columnaSalida, metodo,  valorConstante=None):
         """
         Rellena valores NaN en las columnas de entrada y salida seleccionadas.
 
+        Solo se copian las columnas seleccionadas, y una sola vez: las medias o
+        medianas de todas las columnas float se calculan sobre bloques 2D y los NaN
+        se rellenan in situ en la copia. `df` no se modifica.
+
         Args:
             df: DataFrame a procesar
             metodo: 'media', 'mediana' o 'constante'
             valorConstante: valor a usar si metodo='constante'
 
         Returns:
-            DataFrame con valores NaN rellenados en las columnas seleccionadas
+            DataFrame nuevo con solo las columnas seleccionadas y sus NaN rellenados
         """
         if isinstance(columnasEntrada, str):
             columnasEntrada = [columnasEntrada]
-  
 
         # Combinar columnas de entrada y salida
-        columnasAProcesar = columnasEntrada + [columnaSalida]
+        columnasAProcesar = [col for col in columnasEntrada + [columnaSalida] if col in df.columns]
+
+        dfProcesado = copiarColumnas(df, columnasAProcesar,
+                                     tratarBloque=lambda bloque, _: rellenarBloque(bloque, metodo, valorConstante))
 
+        # Tipos numéricos de pandas que admiten nulos (Int64, Float64...): no van en los bloques
         for col in columnasAProcesar:
-            # Verificar que la columna existe y es numérica
-            if col in df.columns and pd.api.types.is_numeric_dtype(df[col]):
-                if df[col].isna().any():
-                    if metodo == 'media':
-                        valor = np.nanmean(df[col])
-                        df[col] = df[col].fillna(valor)
-                    elif metodo == 'mediana':
-                        valor = np.nanmedian(df[col].to_numpy())
-                        df[col] = df[col].fillna(valor)
-                    elif metodo == 'constante' and valorConstante is not None:
-                        df[col] = df[col].fillna(valorConstante)
-
-        return df
+            tipo = dfProcesado[col].dtype
+            if isinstance(tipo, np.dtype) or not pd.api.types.is_numeric_dtype(tipo) or not dfProcesado[col].hasnans:
+                continue
+            serie = dfProcesado[col]
+            dfProcesado[col] = rellenarSerieNullable(serie, valorRellenoSerie(serie, metodo, valorConstante))
 
+        return dfProcesado
@@ -1,16 +1,27 @@
 import pandas as pd
 import numpy as np
+import time
+from joblib import Parallel, delayed
 from pandas.api.types import is_numeric_dtype, is_string_dtype, is_object_dtype
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression, LogisticRegression
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.pipeline import make_pipeline
-from sklearn.svm import SVR
-from sklearn.tree import DecisionTreeRegressor
-from sklearn.neighbors import KNeighborsRegressor
-from sklearn.metrics import r2_score, mean_squared_error, accuracy_score
-from sklearn.tree import DecisionTreeRegressor, DecisionTreeClassifier
-from sklearn.neighbors import KNeighborsRegressor, KNeighborsClassifier
+from .CargaDiferida import importarDiferido
+
+# scikit-learn tarda más de un segundo en importarse: se carga en el primer uso
+# (o antes, si la interfaz lo precarga en segundo plano)
+skSeleccion = importarDiferido("sklearn.model_selection")
+skLineal = importarDiferido("sklearn.linear_model")
+skPreprocesado = importarDiferido("sklearn.preprocessing")
+skPipeline = importarDiferido("sklearn.pipeline")
+skSvm = importarDiferido("sklearn.svm")
+skMetricas = importarDiferido("sklearn.metrics")
+skArbol = importarDiferido("sklearn.tree")
+skVecinos = importarDiferido("sklearn.neighbors")
+
+# Módulos que conviene precargar antes de entrenar
+modulosSklearn = ["sklearn.model_selection", "sklearn.linear_model", "sklearn.preprocessing", "sklearn.pipeline",
+                  "sklearn.svm", "sklearn.metrics", "sklearn.tree", "sklearn.neighbors"]
+
+# Semilla de los repartos aleatorios (datasplit y pliegues), para que las métricas sean reproducibles
+semillaPorDefecto = 42
 
 ###################################     MÉTODOS PRIVADOS DE VALIDACIÓN Y LÓGICA     ####################################
 
@@ -37,114 +48,77 @@ def _validarDatosClasificacion(y):
     if n_unicos > 20: 
         raise ValueError(f"Incompatibilidad: La columna objetivo tiene {n_unicos} valores numéricos distintos. Parece continua. Usa un modelo de Regresión.")
 
+def _validarDosClases(y):
+    """La Regresión Logística Binaria necesita exactamente 2 clases."""
+    n_clases = y.nunique()
+    if n_clases != 2:
+        raise ValueError(f"Error: La 'Regresión Logística Binaria' requiere exactamente 2 clases. "
+                         f"Tu columna de salida tiene {n_clases} categorías. "
+                         f"Usa la 'Regresión Logística' estándar (multiclase).")
+
+def _validarModeloDatos(nombreModelo, x, y):
+    """Lanza ValueError si el modelo no es compatible con los datos (las mismas comprobaciones que su ejecutar*)."""
+    _validarDatosNumericos(x, "Entrada (X)")
+    if configuracionModelos[nombreModelo]["tipo"] == "regresion":
+        _validarDatosRegresion(y)
+    else:
+        _validarDatosClasificacion(y)
+    if nombreModelo == "Regresión Logística Binaria":
+        _validarDosClases(y)
+
 def _calcularMetricasRegresion(yTrue, yPred):
     """Calcula R2 y ECM."""
-    r2 = r2_score(yTrue, yPred)
-    ecm = mean_squared_error(yTrue, yPred)
+    r2 = skMetricas.r2_score(yTrue, yPred)
+    ecm = skMetricas.mean_squared_error(yTrue, yPred)
     return r2, ecm
 
 def _calcularAccuracy(yTrue, yPred):
     """
     Calcula la precisión (accuracy) para modelos de clasificación.
     """
-    return accuracy_score(yTrue, yPred)
-
-# --- FUNCIONES DE EJECUCIÓN DE MODELOS (Ahora devuelven el objeto modelo) ---
+    return skMetricas.accuracy_score(yTrue, yPred)
 
-def ejecutarRegresionLineal(xTrain, yTrain, xTest, yTest):
-    _validarDatosNumericos(xTrain, "Entrada (X)")
-    _validarDatosRegresion(yTrain)
-    
-    modelo = LinearRegression()
+def _ajustarMedirTiempos(modelo, xTrain, yTrain, xTest, tiempos):
+    """
+    Ajusta el modelo y predice train y test.
+    Si se pasa el diccionario `tiempos`, guarda en él los segundos de ajuste
+    ('ajuste') y de predicción sobre test ('prediccion').
+    """
+    inicio = time.perf_counter()
     modelo.fit(xTrain, yTrain)
-    
-    yTrainPred = modelo.predict(xTrain)
-    yTestPred = modelo.predict(xTest)
-    r2Train, ecmTrain = _calcularMetricasRegresion(yTrain, yTrainPred)
-    r2Test, ecmTest = _calcularMetricasRegresion(yTest, yTestPred)
-    
-    msg = "No compatible (Regresion)"
-    
-    # Devolvemos modelo al principio
-    return modelo, yTrainPred, yTestPred, r2Train, r2Test, ecmTrain, ecmTest, msg,msg
-
-def ejecutarRegresionPolinomica(xTrain, yTrain, xTest, yTest):
-    _validarDatosNumericos(xTrain, "Entrada (X)")
-    _validarDatosRegresion(yTrain)
+    tiempoAjuste = time.perf_counter() - inicio
 
-    modelo = make_pipeline(PolynomialFeatures(degree=2), LinearRegression())
-    modelo.fit(xTrain, yTrain)
-    
-    yTrainPred = modelo.predict(xTrain)
+    inicio = time.perf_counter()
     yTestPred = modelo.predict(xTest)
-    r2Train, ecmTrain = _calcularMetricasRegresion(yTrain, yTrainPred)
-    r2Test, ecmTest = _calcularMetricasRegresion(yTest, yTestPred)
-    
-    msg = "No compatible (Regresion)"
-
-    
-    return modelo, yTrainPred, yTestPred, r2Train, r2Test, ecmTrain, ecmTest,msg,msg
-
-def ejecutarSVR(xTrain, yTrain, xTest, yTest):
-    _validarDatosNumericos(xTrain, "Entrada (X)")
-    _validarDatosRegresion(yTrain)
+    tiempoPrediccion = time.perf_counter() - inicio
 
-    modelo = SVR(kernel='rbf')
-    modelo.fit(xTrain, yTrain)
-    
     yTrainPred = modelo.predict(xTrain)
-    yTestPred = modelo.predict(xTest)
-    r2Train, ecmTrain = _calcularMetricasRegresion(yTrain, yTrainPred)
-    r2Test, ecmTest = _calcularMetricasRegresion(yTest, yTestPred)
-    
-    msg = "No compatible (Regresion)"
 
-    
-    return modelo, yTrainPred, yTestPred, r2Train, r2Test, ecmTrain, ecmTest,msg,msg
+    if tiempos is not None:
+        tiempos["ajuste"] = tiempoAjuste
+        tiempos["prediccion"] = tiempoPrediccion
+    return yTrainPred, yTestPred
 
-def ejecutarArbolDecision(xTrain, yTrain, xTest, yTest):
+def _ejecutarRegresion(modelo, xTrain, yTrain, xTest, yTest, tiempos=None):
+    """Valida, ajusta y evalúa un modelo de regresión. Devuelve la tupla estándar de los ejecutores."""
     _validarDatosNumericos(xTrain, "Entrada (X)")
     _validarDatosRegresion(yTrain)
 
-    modelo = DecisionTreeRegressor(max_depth=5)
-    modelo.fit(xTrain, yTrain)
-    
-    yTrainPred = modelo.predict(xTrain)
-    yTestPred = modelo.predict(xTest)
+    yTrainPred, yTestPred = _ajustarMedirTiempos(modelo, xTrain, yTrain, xTest, tiempos)
     r2Train, ecmTrain = _calcularMetricasRegresion(yTrain, yTrainPred)
     r2Test, ecmTest = _calcularMetricasRegresion(yTest, yTestPred)
     
     msg = "No compatible (Regresion)"
-
-    
-    return modelo, yTrainPred, yTestPred, r2Train, r2Test, ecmTrain, ecmTest,msg,msg
-
-def ejecutarKNN(xTrain, yTrain, xTest, yTest):
-    _validarDatosNumericos(xTrain, "Entrada (X)")
-    _validarDatosRegresion(yTrain)
-
-    modelo = KNeighborsRegressor(n_neighbors=5)
-    modelo.fit(xTrain, yTrain)
-    
-    yTrainPred = modelo.predict(xTrain)
-    yTestPred = modelo.predict(xTest)
-    r2Train, ecmTrain = _calcularMetricasRegresion(yTrain, yTrainPred)
-    r2Test, ecmTest = _calcularMetricasRegresion(yTest, yTestPred)
     
-    msg = "No compatible (Regresion)"
-
-    
-    return modelo, yTrainPred, yTestPred, r2Train, r2Test, ecmTrain, ecmTest,msg,msg
+    # Devolvemos modelo al principio
+    return modelo, yTrainPred, yTestPred, r2Train, r2Test, ecmTrain, ecmTest, msg,msg
 
-def ejecutarRegresionLogistica(xTrain, yTrain, xTest, yTest):
+def _ejecutarClasificacion(modelo, xTrain, yTrain, xTest, yTest, tiempos=None):
+    """Valida, ajusta y evalúa un modelo de clasificación. Devuelve la tupla estándar de los ejecutores."""
     _validarDatosNumericos(xTrain, "Entrada (X)")
     _validarDatosClasificacion(yTrain)
 
-    modelo = LogisticRegression(max_iter=1000)
-    modelo.fit(xTrain, yTrain)
-    
-    yTrainPred = modelo.predict(xTrain)
-    yTestPred = modelo.predict(xTest)
+    yTrainPred, yTestPred = _ajustarMedirTiempos(modelo, xTrain, yTrain, xTest, tiempos)
     
     accTrain = _calcularAccuracy(yTrain, yTrainPred)
     accTest = _calcularAccuracy(yTest, yTestPred)
@@ -153,97 +127,108 @@ def ejecutarRegresionLogistica(xTrain, yTrain, xTest, yTest):
     
     return modelo, yTrainPred, yTestPred, msg, msg, msg, msg, accTrain, accTest
 
-def ejecutarArbolClasificacion(xTrain, yTrain, xTest, yTest):
-    """Árbol de Decisión para Clasificación (Categorías)"""
-    _validarDatosNumericos(xTrain, "Entrada (X)")
-    _validarDatosClasificacion(yTrain)
+# --- FUNCIONES DE EJECUCIÓN DE MODELOS (Ahora devuelven el objeto modelo) ---
+# Todas aceptan opcionalmente un estimador ya configurado (`modelo`) y un
+# diccionario `tiempos` donde se anotan los tiempos de ajuste y predicción.
 
-    modelo = DecisionTreeClassifier(max_depth=5)
-    modelo.fit(xTrain, yTrain)
-    
-    yTrainPred = modelo.predict(xTrain)
-    yTestPred = modelo.predict(xTest)
-    
-    accTrain = _calcularAccuracy(yTrain, yTrainPred)
-    accTest = _calcularAccuracy(yTest, yTestPred)
-    
-    msg = "No compatible (Clasificación)"
-    
-    return modelo, yTrainPred, yTestPred, msg, msg, msg, msg, accTrain, accTest
+def ejecutarRegresionLineal(xTrain, yTrain, xTest, yTest, modelo=None, tiempos=None):
+    modelo = modelo if modelo is not None else crearEstimador("Regresión Lineal")
+    return _ejecutarRegresion(modelo, xTrain, yTrain, xTest, yTest, tiempos)
 
-def ejecutarKNNClasificacion(xTrain, yTrain, xTest, yTest):
-    """KNN para Clasificación (Categorías)"""
-    _validarDatosNumericos(xTrain, "Entrada (X)")
-    _validarDatosClasificacion(yTrain)
+def ejecutarRegresionPolinomica(xTrain, yTrain, xTest, yTest, modelo=None, tiempos=None):
+    modelo = modelo if modelo is not None else crearEstimador("Regresión Polinómica")
+    return _ejecutarRegresion(modelo, xTrain, yTrain, xTest, yTest, tiempos)
 
-    modelo = KNeighborsClassifier(n_neighbors=5)
-    modelo.fit(xTrain, yTrain)
-    
-    yTrainPred = modelo.predict(xTrain)
-    yTestPred = modelo.predict(xTest)
-    
-    accTrain = _calcularAccuracy(yTrain, yTrainPred)
-    accTest = _calcularAccuracy(yTest, yTestPred)
-    
-    msg = "No compatible (Clasificación)"
-    
-    return modelo, yTrainPred, yTestPred, msg, msg, msg, msg, accTrain, accTest
+def ejecutarSVR(xTrain, yTrain, xTest, yTest, modelo=None, tiempos=None):
+    modelo = modelo if modelo is not None else crearEstimador("SVR")
+    return _ejecutarRegresion(modelo, xTrain, yTrain, xTest, yTest, tiempos)
+
+def ejecutarArbolDecision(xTrain, yTrain, xTest, yTest, modelo=None, tiempos=None):
+    modelo = modelo if modelo is not None else crearEstimador("Árbol de Decisión")
+    return _ejecutarRegresion(modelo, xTrain, yTrain, xTest, yTest, tiempos)
+
+def ejecutarKNN(xTrain, yTrain, xTest, yTest, modelo=None, tiempos=None):
+    modelo = modelo if modelo is not None else crearEstimador("KNN")
+    return _ejecutarRegresion(modelo, xTrain, yTrain, xTest, yTest, tiempos)
+
+def ejecutarRegresionLogistica(xTrain, yTrain, xTest, yTest, modelo=None, tiempos=None):
+    modelo = modelo if modelo is not None else crearEstimador("Regresión Logística")
+    return _ejecutarClasificacion(modelo, xTrain, yTrain, xTest, yTest, tiempos)
 
-def ejecutarLogisticaBinaria(xTrain, yTrain, xTest, yTest):
+def ejecutarArbolClasificacion(xTrain, yTrain, xTest, yTest, modelo=None, tiempos=None):
+    """Árbol de Decisión para Clasificación (Categorías)"""
+    modelo = modelo if modelo is not None else crearEstimador("Árbol de Decisión (Clasif)")
+    return _ejecutarClasificacion(modelo, xTrain, yTrain, xTest, yTest, tiempos)
+
+def ejecutarKNNClasificacion(xTrain, yTrain, xTest, yTest, modelo=None, tiempos=None):
+    """KNN para Clasificación (Categorías)"""
+    modelo = modelo if modelo is not None else crearEstimador("KNN (Clasificación)")
+    return _ejecutarClasificacion(modelo, xTrain, yTrain, xTest, yTest, tiempos)
+
+def ejecutarLogisticaBinaria(xTrain, yTrain, xTest, yTest, modelo=None, tiempos=None):
     """
     Regresión Logística restringida estrictamente a 2 clases (Binaria).
     Lanza error si hay más de 2 categorías.
     """
-    _validarDatosNumericos(xTrain, "Entrada (X)")
-    _validarDatosClasificacion(yTrain)
-
     # Validación Específica: Asegurar que es binario
-    n_clases = yTrain.nunique()
-    if n_clases != 2:
-        raise ValueError(f"Error: La 'Regresión Logística Binaria' requiere exactamente 2 clases. "
-                         f"Tu columna de salida tiene {n_clases} categorías. "
-                         f"Usa la 'Regresión Logística' estándar (multiclase).")
+    _validarDosClases(yTrain)
 
     # Solver 'liblinear' suele ser mejor para problemas binarios
-    modelo = LogisticRegression(max_iter=1000, solver='liblinear').fit(xTrain, yTrain)
-    
-    yTrainPred = modelo.predict(xTrain)
-    yTestPred = modelo.predict(xTest)
-    
-    accTrain = _calcularAccuracy(yTrain, yTrainPred)
-    accTest = _calcularAccuracy(yTest, yTestPred)
-    
-    msg = "No compatible (Clasificación)"
-    
-    return modelo, yTrainPred, yTestPred, msg, msg, msg, msg, accTrain, accTest
+    modelo = modelo if modelo is not None else crearEstimador("Regresión Logística Binaria")
+    return _ejecutarClasificacion(modelo, xTrain, yTrain, xTest, yTest, tiempos)
     
 
 # --- DICCIONARIO CONFIGURACIÓN ---
+# "estimador" construye el estimador con los hiperparámetros por defecto;
+# "tipo" indica qué métricas produce ("regresion" -> R²/ECM, "clasificacion" -> Accuracy).
 configuracionModelos = {
-    "Regresión Lineal":      {"funcion": ejecutarRegresionLineal,     "esGraficable": True},
-    "Regresión Polinómica":  {"funcion": ejecutarRegresionPolinomica, "esGraficable": True},
-    "SVR":                   {"funcion": ejecutarSVR,                 "esGraficable": True},
-    "Árbol de Decisión":     {"funcion": ejecutarArbolDecision,       "esGraficable": True},
-    "KNN":                   {"funcion": ejecutarKNN,                 "esGraficable": True},
-    "Regresión Logística":   {"funcion": ejecutarRegresionLogistica,  "esGraficable": True},
-    "Regresión Logística Binaria":{"funcion": ejecutarLogisticaBinaria,    "esGraficable": True},
-    "Árbol de Decisión (Clasif)":{"funcion": ejecutarArbolClasificacion,   "esGraficable": True},
-    "KNN (Clasificación)":       {"funcion": ejecutarKNNClasificacion,     "esGraficable": True}
+    "Regresión Lineal":      {"funcion": ejecutarRegresionLineal,     "esGraficable": True, "tipo": "regresion",
+                              "estimador": lambda: skLineal.LinearRegression()},
+    "Regresión Polinómica":  {"funcion": ejecutarRegresionPolinomica, "esGraficable": True, "tipo": "regresion",
+                              "estimador": lambda: skPipeline.make_pipeline(skPreprocesado.PolynomialFeatures(degree=2), skLineal.LinearRegression())},
+    "SVR":                   {"funcion": ejecutarSVR,                 "esGraficable": True, "tipo": "regresion",
+                              "estimador": lambda: skSvm.SVR(kernel='rbf')},
+    "Árbol de Decisión":     {"funcion": ejecutarArbolDecision,       "esGraficable": True, "tipo": "regresion",
+                              "estimador": lambda: skArbol.DecisionTreeRegressor(max_depth=5)},
+    "KNN":                   {"funcion": ejecutarKNN,                 "esGraficable": True, "tipo": "regresion",
+                              "estimador": lambda: skVecinos.KNeighborsRegressor(n_neighbors=5)},
+    "Regresión Logística":   {"funcion": ejecutarRegresionLogistica,  "esGraficable": True, "tipo": "clasificacion",
+                              "estimador": lambda: skLineal.LogisticRegression(max_iter=1000)},
+    "Regresión Logística Binaria":{"funcion": ejecutarLogisticaBinaria,    "esGraficable": True, "tipo": "clasificacion",
+                              "estimador": lambda: skLineal.LogisticRegression(max_iter=1000, solver='liblinear')},
+    "Árbol de Decisión (Clasif)":{"funcion": ejecutarArbolClasificacion,   "esGraficable": True, "tipo": "clasificacion",
+                              "estimador": lambda: skArbol.DecisionTreeClassifier(max_depth=5)},
+    "KNN (Clasificación)":       {"funcion": ejecutarKNNClasificacion,     "esGraficable": True, "tipo": "clasificacion",
+                              "estimador": lambda: skVecinos.KNeighborsClassifier(n_neighbors=5)}
 }
 
 
+def crearEstimador(nombreModelo, **parametros):
+    """
+    Crea un estimador sin ajustar de la configuración, con sus hiperparámetros
+    por defecto sobrescritos por `parametros` (nombres de sklearn, p.ej. max_depth=8).
+    """
+    config = configuracionModelos.get(nombreModelo)
+    if not config:
+        raise ValueError(f"El modelo '{nombreModelo}' no se encuentra en la configuración.")
+    estimador = config["estimador"]()
+    if parametros:
+        estimador.set_params(**parametros)
+    return estimador
+
+
 ###################################     MÉTODOS DE DATASPLIT     ####################################
 
 #Entradas: pd.DatFrame, List[str], str, float -> Salidas: Tuple[pd.DataFrame, pd.DataFrame]
-def _ejecutarDatasplit(dfProcesado, columnasEntrada, columnaSalida, tamañoTest):
-    """Realiza el datasplit en dataFrameTrain y dataFrameTest"""
+def _ejecutarDatasplit(dfProcesado, columnasEntrada, columnaSalida, tamañoTest, semilla=semillaPorDefecto):
+    """Realiza el datasplit en dataFrameTrain y dataFrameTest (reproducible con la misma semilla)"""
     try:
         # Verificar que no hay nulos en las columnas seleccionadas
         columnas_importantes = columnasEntrada + [columnaSalida]
         if dfProcesado[columnas_importantes].isnull().values.any() == True:
             raise TypeError("Para continuar al datasplit no puede tener nulos en las columnas de entrada o salida")
             
-        dataFrameTrain, dataFrameTest = train_test_split(dfProcesado, test_size= tamañoTest)
+        dataFrameTrain, dataFrameTest = skSeleccion.train_test_split(dfProcesado, test_size= tamañoTest, random_state=semilla)
 
     except Exception as e:
         raise Exception
@@ -271,11 +256,13 @@ def _mostrarResultadosSplit(dataFrameTrain, dataFrameTest, tamDfProc):
 
 ##################################      MÉTODOS DE MODELADO     #####################################
 
-#Entradas: pd.DataFrame, pd.DataFrame, List[str], str, str -> Salidas: Tuple[pd.DataFrame, pd.Series, pd.DataFrame, pd.Series, object, np.ndarray, np.ndarray, float, float, float, float, bool]
-def crearAjustarModelo(dataFrameTrain, dataFrameTest, columnasEntradaGraficada, columnaSalidaGraficada, nombreModelo):
+#Entradas: pd.DataFrame, pd.DataFrame, List[str], str, str, object | None -> Salidas: Tuple[pd.DataFrame, pd.Series, pd.DataFrame, pd.Series, object, np.ndarray, np.ndarray, float, float, float, float, bool]
+def crearAjustarModelo(dataFrameTrain, dataFrameTest, columnasEntradaGraficada, columnaSalidaGraficada, nombreModelo, estimador=None):
     """
     Método para ajustar modelo seleccionado, validar datos y obtener métricas.
     Devuelve datos, MODELO, predicciones, métricas y flag de graficación.
+    Si se pasa `estimador` (p.ej. el mejor de una búsqueda de hiperparámetros)
+    se ajusta ese en lugar del estimador por defecto del modelo.
     """
     try:
         if dataFrameTrain is None or dataFrameTest is None:
@@ -300,7 +287,7 @@ def crearAjustarModelo(dataFrameTrain, dataFrameTest, columnasEntradaGraficada,
 
         # 3. Ejecutar Modelo 
         # IMPORTANTE: Ahora desempaquetamos el 'modelo' también
-        modelo, yTrainPred, yTestPred, r2Train, r2Test, ecmTrain, ecmTest,accTrain,accTest = funcionModelo(xTrain, yTrain, xTest, yTest)
+        modelo, yTrainPred, yTestPred, r2Train, r2Test, ecmTrain, ecmTest,accTrain,accTest = funcionModelo(xTrain, yTrain, xTest, yTest, modelo=estimador)
 
     except ValueError as ve:
         # Capturamos errores de validación y los relanzamos
@@ -310,4 +297,216 @@ def crearAjustarModelo(dataFrameTrain, dataFrameTest, columnasEntradaGraficada,
         raise Exception(f"Error inesperado en el modelado: {e}")
     
     # Devolvemos 'modelo' después de los datos originales
-    return xTrain, yTrain, xTest, yTest, modelo, yTrainPred, yTestPred, r2Train, r2Test, ecmTrain, ecmTest,accTrain,accTest, esGraficable
\ No newline at end of file
+    return xTrain, yTrain, xTest, yTest, modelo, yTrainPred, yTestPred, r2Train, r2Test, ecmTrain, ecmTest,accTrain,accTest, esGraficable
+
+
+###################################     VALIDACIÓN CRUZADA     ####################################
+
+#Entradas: pd.Series, int, int, bool, int -> Salidas: List[Tuple[np.ndarray, np.ndarray]]
+def generarParticionesCV(y, nPliegues=5, nRepeticiones=1, estratificado=False, semilla=semillaPorDefecto):
+    """
+    Precalcula los índices (posicionales) de train y test de una validación
+    cruzada k-fold repetida. Se calculan una sola vez y se reutilizan para
+    todos los modelos, así todos se evalúan sobre los mismos pliegues.
+
+    Args:
+        estratificado (bool): Mantener la proporción de clases en cada pliegue (clasificación).
+    """
+    if nPliegues < 2:
+        raise ValueError("La validación cruzada necesita al menos 2 pliegues.")
+    if estratificado:
+        divisor = skSeleccion.RepeatedStratifiedKFold(n_splits=nPliegues, n_repeats=nRepeticiones, random_state=semilla)
+    else:
+        divisor = skSeleccion.RepeatedKFold(n_splits=nPliegues, n_repeats=nRepeticiones, random_state=semilla)
+    return list(divisor.split(np.zeros(len(y)), y))
+
+
+def _evaluarPliegue(nombreModelo, x, y, idxTrain, idxTest, parametros=None):
+    """
+    Ajusta un modelo en un pliegue y devuelve sus métricas de test (NaN si no aplican).
+    `parametros` sobrescribe los hiperparámetros por defecto del modelo.
+    """
+    funcion = configuracionModelos[nombreModelo]["funcion"]
+    modelo = crearEstimador(nombreModelo, **parametros) if parametros else None
+    tiempos = {}
+    _, _, _, _, r2Test, _, ecmTest, _, accTest = funcion(x.iloc[idxTrain], y.iloc[idxTrain],
+                                                         x.iloc[idxTest], y.iloc[idxTest],
+                                                         modelo=modelo, tiempos=tiempos)
+
+    def num(v): return v if isinstance(v, float) else np.nan
+    return {"R²": num(r2Test), "ECM": num(ecmTest), "Accuracy": num(accTest),
+            "Tiempo ajuste (s)": tiempos["ajuste"]}
+
+
+def _evaluarPliegueSiCompatible(nombreModelo, x, y, idxTrain, idxTest, parametros=None):
+    """Como _evaluarPliegue, pero devuelve None si el modelo falla en ese pliegue (p.ej. le falta una clase)."""
+    try:
+        return _evaluarPliegue(nombreModelo, x, y, idxTrain, idxTest, parametros)
+    except ValueError:
+        return None
+
+
+#Entradas: pd.DataFrame, List[str], str, str | List[str], int, int, int, int -> Salidas: pd.DataFrame
+def validacionCruzada(dfProcesado, columnasEntrada, columnaSalida, nombresModelos, nPliegues=5, nRepeticiones=1,
+                      semilla=semillaPorDefecto, nJobs=-1, parametrosModelos=None):
+    """
+    Validación cruzada k-fold repetida de uno o varios modelos.
+
+    Los clasificadores usan pliegues estratificados y los regresores pliegues
+    normales; cada tipo de partición se calcula una vez y la comparten todos los
+    modelos de ese tipo. Todos los pares (modelo, pliegue) se reparten entre los
+    núcleos en una única tanda de joblib.
+
+    Los modelos incompatibles con la salida (p.ej. clasificadores con una salida
+    continua) se omiten, igual que en entrenarTodosLosModelos, y un pliegue que
+    falla no interrumpe los demás: "Pliegues" cuenta los que se han evaluado.
+    Solo se lanza el error si no queda ningún modelo que evaluar.
+
+    Args:
+        parametrosModelos (dict | None): Hiperparámetros por modelo ({nombre: {parametro: valor}})
+            que sustituyen a los de por defecto.
+
+    Returns:
+        pd.DataFrame: Una fila por modelo con la media y la desviación típica de
+        cada métrica de test ("R² media", "R² desv", ...) y el número de pliegues.
+    """
+    if isinstance(nombresModelos, str):
+        nombresModelos = [nombresModelos]
+    parametrosModelos = parametrosModelos or {}
+
+    columnasImportantes = list(columnasEntrada) + [columnaSalida]
+    if dfProcesado[columnasImportantes].isnull().values.any():
+        raise TypeError("Para la validación cruzada no puede haber nulos en las columnas de entrada o salida")
+
+    x = dfProcesado[columnasEntrada]
+    y = dfProcesado[columnaSalida]
+
+    particiones = {}
+    tareas = []
+    errores = []
+    for nombre in nombresModelos:
+        estratificado = configuracionModelos[nombre]["tipo"] == "clasificacion"
+        try:
+            _validarModeloDatos(nombre, x, y)
+            if estratificado not in particiones:
+                particiones[estratificado] = generarParticionesCV(y, nPliegues, nRepeticiones, estratificado, semilla)
+        except ValueError as e:
+            # Incompatible con la salida (o sin clases suficientes para estratificar): se omite
+            errores.append(e)
+            continue
+        tareas += [(nombre, idxTrain, idxTest) for idxTrain, idxTest in particiones[estratificado]]
+    if not tareas:
+        raise errores[0]
+
+    metricas = Parallel(n_jobs=nJobs)(
+        delayed(_evaluarPliegueSiCompatible)(nombre, x, y, idxTrain, idxTest, parametrosModelos.get(nombre))
+        for nombre, idxTrain, idxTest in tareas
+    )
+
+    evaluados = [(nombre, fila) for (nombre, _, _), fila in zip(tareas, metricas) if fila is not None]
+    if not evaluados:
+        raise ValueError("Ningún modelo se ha podido evaluar en los pliegues de la validación cruzada.")
+    porPliegue = pd.DataFrame([fila for _, fila in evaluados])
+    porPliegue.insert(0, "Modelo", [nombre for nombre, _ in evaluados])
+    agrupado = porPliegue.groupby("Modelo", sort=False)
+
+    resumen = pd.DataFrame({"Modelo": list(agrupado.groups)})
+    for metrica in ["R²", "ECM", "Accuracy", "Tiempo ajuste (s)"]:
+        resumen[f"{metrica} media"] = agrupado[metrica].mean().to_numpy()
+        resumen[f"{metrica} desv"] = agrupado[metrica].std(ddof=0).to_numpy()
+    resumen["Pliegues"] = agrupado.size().to_numpy()
+    return resumen
+
+
+###################################     TABLA COMPARATIVA DE MODELOS     ####################################
+
+def _evaluarModeloTabla(nombreModelo, xTrain, yTrain, xTest, yTest):
+    """
+    Entrena un modelo de la configuración y devuelve su fila de la tabla comparativa,
+    o None si el modelo no es compatible con los datos. Si el modelo falla por
+    otro motivo, su fila lleva el error en "Estado" y las métricas vacías, así
+    un modelo no cancela la comparativa de los demás.
+    """
+    config = configuracionModelos[nombreModelo]
+    esRegresion = config["tipo"] == "regresion"
+    tiempos = {}
+    try:
+        _, _, _, r2Train, r2Test, ecmTrain, ecmTest, accTrain, accTest = config["funcion"](xTrain, yTrain, xTest, yTest, tiempos=tiempos)
+    except ValueError:
+        # Incompatibilidad de datos (p.ej. regresión con salida de texto): se omite
+        return None
+    except Exception as e:
+        return {"Modelo": nombreModelo, "Tipo": "Regresión" if esRegresion else "Clasificación",
+                "Estado": f"Error: {type(e).__name__}: {e}", "Puntuación": np.nan}
+
+    def num(v): return v if isinstance(v, float) else np.nan
+
+    return {
+        "Modelo": nombreModelo,
+        "Tipo": "Regresión" if esRegresion else "Clasificación",
+        "Estado": "OK",
+        "Puntuación": num(r2Test) if esRegresion else num(accTest),
+        "R² Train": num(r2Train),
+        "R² Test": num(r2Test),
+        "ECM Train": num(ecmTrain),
+        "ECM Test": num(ecmTest),
+        "Accuracy Train": num(accTrain),
+        "Accuracy Test": num(accTest),
+        "Tiempo ajuste (s)": tiempos["ajuste"],
+        "Tiempo predicción (s)": tiempos["prediccion"],
+    }
+
+
+#Entradas: pd.DataFrame, pd.DataFrame, List[str], str, List[str] | None, int -> Salidas: pd.DataFrame
+def entrenarTodosLosModelos(dataFrameTrain, dataFrameTest, columnasEntrada, columnaSalida, nombresModelos=None, nJobs=-1):
+    """
+    Entrena en paralelo (un proceso por núcleo) todos los modelos indicados sobre
+    el mismo split y devuelve una tabla comparativa ordenada de mejor a peor
+    dentro de cada tipo de modelo.
+
+    La columna "Puntuación" es el R² Test en regresión y el Accuracy Test en
+    clasificación; como no son comparables entre sí, la tabla se ordena por
+    "Tipo" y, dentro de cada tipo, por "Puntuación". Los modelos incompatibles
+    con los datos se omiten y los que fallan quedan al final de su tipo con el
+    error en "Estado".
+
+    Args:
+        nombresModelos (list[str] | None): Modelos a comparar (por defecto, todos).
+        nJobs (int): Procesos a usar (-1 = todos los núcleos).
+    """
+    if dataFrameTrain is None or dataFrameTest is None:
+        raise TypeError("No hay datos de entrenamiento o test disponibles")
+
+    nombresModelos = list(nombresModelos) if nombresModelos is not None else list(configuracionModelos)
+    xTrain = dataFrameTrain[columnasEntrada]
+    yTrain = dataFrameTrain[columnaSalida]
+    xTest = dataFrameTest[columnasEntrada]
+    yTest = dataFrameTest[columnaSalida]
+
+    filas = Parallel(n_jobs=nJobs)(
+        delayed(_evaluarModeloTabla)(nombre, xTrain, yTrain, xTest, yTest) for nombre in nombresModelos
+    )
+    filas = [fila for fila in filas if fila is not None]
+    if not filas:
+        raise ValueError("Ningún modelo es compatible con los datos seleccionados.")
+
+    tabla = pd.DataFrame(filas)
+    return tabla.sort_values(["Tipo", "Puntuación"], ascending=[True, False], na_position="last", ignore_index=True)
+
+
+#Entradas: pd.DataFrame, pd.DataFrame, List[str], str, int, int, int, int -> Salidas: pd.DataFrame
+def anadirValidacionCruzada(tabla, dfProcesado, columnasEntrada, columnaSalida, nPliegues=5, nRepeticiones=1,
+                            semilla=semillaPorDefecto, nJobs=-1):
+    """
+    Añade a la tabla comparativa de entrenarTodosLosModelos la media y la
+    desviación de la validación cruzada de cada modelo ("CV media", "CV desv"),
+    de la misma métrica que "Puntuación" (R² en regresión, Accuracy en clasificación).
+    """
+    resumen = validacionCruzada(dfProcesado, columnasEntrada, columnaSalida, list(tabla["Modelo"]),
+                                nPliegues, nRepeticiones, semilla, nJobs).set_index("Modelo")
+    esRegresion = (tabla["Tipo"] == "Regresión").to_numpy()
+    for estadistico in ["media", "desv"]:
+        r2 = resumen[f"R² {estadistico}"].reindex(tabla["Modelo"]).to_numpy()
+        accuracy = resumen[f"Accuracy {estadistico}"].reindex(tabla["Modelo"]).to_numpy()
+        tabla[f"CV {estadistico}"] = np.where(esRegresion, r2, accuracy)
+    return tabla
@@ -0,0 +1,101 @@
+import weakref
+import numpy as np
+
+# Predicción rápida para modelos lineales (LinearRegression, LogisticRegression).
+# Su predict es un producto escalar, pero pasar por un DataFrame de una fila y
+# por las validaciones de sklearn cuesta decenas de microsegundos. El puntuador
+# copia coef_/intercept_ (lo mismo que lee generarTextoFormula) a arrays de
+# numpy contiguos y predice directamente sobre arrays o buffers, fila a fila o
+# por lotes, sin construir DataFrames.
+
+# Puntuadores ya creados, por modelo (desaparecen con el modelo)
+_puntuadores = weakref.WeakKeyDictionary()
+
+
+class PuntuadorLineal:
+    """
+    Puntuador numpy de un modelo lineal ajustado.
+
+    Las columnas de entrada deben venir en el orden con el que se entrenó el
+    modelo (`columnas`). Para clasificación, `clases` son las etiquetas del
+    modelo (classes_) y la predicción sigue las mismas reglas que sklearn.
+    """
+    def __init__(self, coeficientes, intercepto, clases=None, columnas=None):
+        self.coeficientes = np.ascontiguousarray(np.atleast_2d(coeficientes), dtype=np.float64)
+        self.intercepto = np.ascontiguousarray(np.ravel(intercepto), dtype=np.float64)
+        self.clases = None if clases is None else np.asarray(clases)
+        self.columnas = None if columnas is None else list(columnas)
+        self.nCaracteristicas = self.coeficientes.shape[1]
+        # Transpuesta contigua: x @ coeficientesT es la multiplicación más rápida por lotes
+        self._coeficientesT = np.ascontiguousarray(self.coeficientes.T)
+
+    @classmethod
+    def desdeModelo(cls, modelo):
+        """Crea el puntuador de un LinearRegression/LogisticRegression ajustado; None si no es uno de ellos."""
+        nombre = type(modelo).__name__
+        if nombre not in ("LinearRegression", "LogisticRegression") or not hasattr(modelo, "coef_"):
+            return None
+        if nombre == "LinearRegression" and np.ndim(modelo.coef_) > 1 and np.shape(modelo.coef_)[0] > 1:
+            return None  # varias salidas: no se usa en la aplicación
+        clases = modelo.classes_ if nombre == "LogisticRegression" else None
+        return cls(modelo.coef_, modelo.intercept_, clases, getattr(modelo, "feature_names_in_", None))
+
+    def _aMatriz(self, x):
+        if isinstance(x, (bytes, bytearray, memoryview)):
+            x = np.frombuffer(x, dtype=np.float64)
+        x = np.asarray(x, dtype=np.float64)
+        if x.ndim == 1:
+            x = x.reshape(-1, self.nCaracteristicas)
+        if x.shape[1] != self.nCaracteristicas:
+            raise ValueError(f"Se esperaban {self.nCaracteristicas} columnas de entrada y hay {x.shape[1]}.")
+        return x
+
+    def puntuacion(self, x, validar=True):
+        """Salida lineal x·coef + intercepto (decision_function en clasificación)."""
+        x = self._aMatriz(x)
+        if validar and not np.isfinite(x).all():
+            # Igual que sklearn: no se predice con NaN o infinitos
+            raise ValueError("La entrada contiene NaN o infinitos.")
+        return x @ self._coeficientesT + self.intercepto
+
+    def predecir(self, x, validar=True):
+        """
+        Predice una fila (secuencia de nCaracteristicas valores) o un lote
+        (matriz n × nCaracteristicas, o buffer de float64).
+        """
+        puntuacion = self.puntuacion(x, validar)
+        if self.clases is None:
+            return puntuacion[:, 0]
+        if puntuacion.shape[1] == 1:
+            return self.clases[(puntuacion[:, 0] > 0).astype(np.intp)]
+        return self.clases[puntuacion.argmax(axis=1)]
+
+    def predecirProbabilidad(self, x, validar=True):
+        """Probabilidad de cada clase (como predict_proba de la regresión logística)."""
+        if self.clases is None:
+            raise ValueError("Solo los modelos de clasificación tienen probabilidades.")
+        puntuacion = self.puntuacion(x, validar)
+        if puntuacion.shape[1] == 1:
+            positiva = 1.0 / (1.0 + np.exp(-puntuacion[:, 0]))
+            return np.column_stack((1.0 - positiva, positiva))
+        exponencial = np.exp(puntuacion - puntuacion.max(axis=1, keepdims=True))
+        return exponencial / exponencial.sum(axis=1, keepdims=True)
+
+
+#Entradas: estimador -> Salidas: PuntuadorLineal | None
+def obtenerPuntuador(modelo):
+    """
+    Puntuador rápido del modelo, creado la primera vez y reutilizado después;
+    None si el modelo no es lineal (hay que usar su predict).
+    """
+    if modelo is None:
+        return None
+    try:
+        return _puntuadores[modelo]
+    except KeyError:
+        pass
+    except TypeError:
+        return PuntuadorLineal.desdeModelo(modelo)  # objeto sin weakref: no se cachea
+    puntuador = PuntuadorLineal.desdeModelo(modelo)
+    _puntuadores[modelo] = puntuador
+    return puntuador
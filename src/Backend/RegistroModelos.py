@@ -0,0 +1,212 @@
+import glob
+import json
+import os
+import sqlite3
+import time
+import pandas as pd
+
+from . import ArtefactoModelo
+from . import GestionDatos as gd
+
+# Registro local de modelos guardados: un índice SQLite con los metadatos de
+# cada artefacto (columnas, salida, métricas, descripción, tamaño, fecha). Los
+# datos salen de la cabecera JSON del artefacto, así que registrar, buscar y
+# listar miles de modelos no deserializa ningún estimador; solo se carga el
+# que se elige.
+
+rutaRegistroPorDefecto = os.path.join(os.path.expanduser("~"), ".proyectoIS", "registro.sqlite")
+
+# Métricas por las que se puede ordenar, y si "mejor" es mayor (True) o menor (False)
+metricasRegistro = {"r2Test": True, "r2Train": True, "ecmTest": False, "ecmTrain": False}
+
+# Columnas del DataFrame que devuelve buscarModelos, en orden
+columnasRegistro = ["ruta", "columnaSalida", "columnasEntrada", "tipoEstimador", "r2Train", "r2Test",
+                    "ecmTrain", "ecmTest", "descripcion", "formula", "bytes", "guardado"]
+
+_esquema = """
+CREATE TABLE IF NOT EXISTS modelos (
+    ruta TEXT PRIMARY KEY,
+    columnaSalida TEXT,
+    columnasEntrada TEXT,
+    tipoEstimador TEXT,
+    r2Train REAL, r2Test REAL, ecmTrain REAL, ecmTest REAL,
+    descripcion TEXT,
+    formula TEXT,
+    bytes INTEGER,
+    guardado TEXT,
+    mtime REAL
+);
+CREATE INDEX IF NOT EXISTS idxSalidaR2 ON modelos (columnaSalida, r2Test);
+CREATE INDEX IF NOT EXISTS idxSalidaEcm ON modelos (columnaSalida, ecmTest);
+CREATE INDEX IF NOT EXISTS idxGuardado ON modelos (guardado);
+"""
+
+
+def _conectar(rutaRegistro):
+    os.makedirs(os.path.dirname(os.path.abspath(rutaRegistro)), exist_ok=True)
+    con = sqlite3.connect(rutaRegistro)
+    con.executescript(_esquema)
+    return con
+
+
+def _aReal(valor):
+    """Métrica como float, o None si no es numérica (p.ej. "N/A")."""
+    try:
+        return float(valor) if valor is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _filaDesdeMetadatos(ruta, metadatos):
+    metricas = metadatos.get("metricas") or {}
+    estado = os.stat(ruta)
+    guardado = metadatos.get("guardado") or time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(estado.st_mtime))
+    return (os.path.abspath(ruta), metadatos.get("columnaSalida"),
+            json.dumps(list(metadatos.get("columnasEntrada") or []), ensure_ascii=False),
+            metadatos.get("tipoEstimador"),
+            _aReal(metricas.get("r2Train")), _aReal(metricas.get("r2Test")),
+            _aReal(metricas.get("ecmTrain")), _aReal(metricas.get("ecmTest")),
+            metadatos.get("descripcion"), metadatos.get("formula"),
+            estado.st_size, guardado, estado.st_mtime)
+
+
+def _insertar(con, filas):
+    con.executemany(f"INSERT OR REPLACE INTO modelos ({', '.join(columnasRegistro)}, mtime) "
+                    f"VALUES ({', '.join('?' * (len(columnasRegistro) + 1))})", filas)
+
+
+#Entradas: str, dict | None, str -> Salidas: None
+def registrarModelo(ruta, metadatos=None, rutaRegistro=rutaRegistroPorDefecto):
+    """
+    Añade (o actualiza) un modelo guardado en el registro.
+
+    Args:
+        ruta (str): Archivo del modelo.
+        metadatos (dict | None): Metadatos ya conocidos (p.ej. el diccionario que
+            se acaba de guardar); si es None se leen de la cabecera del archivo.
+        rutaRegistro (str): Base de datos del registro.
+    """
+    if metadatos is None:
+        metadatos = gd.leerCabeceraModelo(ruta)
+    elif "tipoEstimador" not in metadatos and "modelo" in metadatos:
+        metadatos = dict(metadatos, tipoEstimador=type(metadatos["modelo"]).__name__)
+    con = _conectar(rutaRegistro)
+    try:
+        with con:
+            _insertar(con, [_filaDesdeMetadatos(ruta, metadatos)])
+    finally:
+        con.close()
+
+
+#Entradas: str, bool, str -> Salidas: (int, list[str])
+def indexarCarpeta(carpeta, incluirAntiguos=False, rutaRegistro=rutaRegistroPorDefecto):
+    """
+    Registra todos los .pkl de una carpeta (y subcarpetas). Los que no han
+    cambiado desde la última vez (misma fecha de modificación) no se releen.
+
+    Args:
+        incluirAntiguos (bool): Registrar también los .pkl del formato antiguo,
+            que no tienen cabecera y hay que cargar enteros (solo la primera vez).
+
+    Returns:
+        tuple: (modelos registrados o actualizados, archivos omitidos o ilegibles).
+    """
+    con = _conectar(rutaRegistro)
+    try:
+        conocidos = dict(con.execute("SELECT ruta, mtime FROM modelos"))
+        filas, omitidos = [], []
+        for ruta in sorted(glob.glob(os.path.join(carpeta, "**", "*.pkl"), recursive=True)):
+            ruta = os.path.abspath(ruta)
+            if conocidos.get(ruta) == os.path.getmtime(ruta):
+                continue
+            try:
+                metadatos = ArtefactoModelo.leerMetadatos(ruta)
+                if metadatos is None:
+                    if not incluirAntiguos:
+                        omitidos.append(ruta)
+                        continue
+                    metadatos = gd.leerCabeceraModelo(ruta)
+                filas.append(_filaDesdeMetadatos(ruta, metadatos))
+            except Exception:
+                omitidos.append(ruta)
+        with con:
+            _insertar(con, filas)
+        return len(filas), omitidos
+    finally:
+        con.close()
+
+
+#Entradas: str | None, str | None, str, bool, int | None, str -> Salidas: pd.DataFrame
+def buscarModelos(columnaSalida=None, texto=None, ordenarPor="r2Test", mejoresPrimero=True, limite=None,
+                  rutaRegistro=rutaRegistroPorDefecto):
+    """
+    Consulta el registro.
+
+    Args:
+        columnaSalida (str | None): Solo modelos con esta columna de salida.
+        texto (str | None): Filtra por descripción, tipo de estimador, columnas o ruta.
+        ordenarPor (str): Métrica de `metricasRegistro` o "guardado".
+        mejoresPrimero (bool): Mejor métrica (o más reciente) primero; los NULL siempre al final.
+        limite (int | None): Máximo de filas.
+
+    Returns:
+        pd.DataFrame: Una fila por modelo con las columnas de `columnasRegistro`
+        (`columnasEntrada` como lista).
+    """
+    if ordenarPor not in metricasRegistro and ordenarPor != "guardado":
+        raise ValueError(f"No se puede ordenar por '{ordenarPor}'.")
+    descendente = metricasRegistro.get(ordenarPor, True) == mejoresPrimero
+
+    condiciones, parametros = [], []
+    if columnaSalida is not None:
+        condiciones.append("columnaSalida = ?")
+        parametros.append(columnaSalida)
+    if texto:
+        condiciones.append("(descripcion LIKE ? OR tipoEstimador LIKE ? OR columnasEntrada LIKE ? OR ruta LIKE ?)")
+        parametros.extend([f"%{texto}%"] * 4)
+    consulta = f"SELECT {', '.join(columnasRegistro)} FROM modelos"
+    if condiciones:
+        consulta += " WHERE " + " AND ".join(condiciones)
+    consulta += f" ORDER BY {ordenarPor} IS NULL, {ordenarPor} {'DESC' if descendente else 'ASC'}"
+    if limite is not None:
+        consulta += f" LIMIT {int(limite)}"
+
+    con = _conectar(rutaRegistro)
+    try:
+        tabla = pd.read_sql_query(consulta, con, params=parametros)
+    finally:
+        con.close()
+    tabla["columnasEntrada"] = [json.loads(c) if c else [] for c in tabla["columnasEntrada"]]
+    # Con el resultado vacío o todo NULL, read_sql deja las métricas como object
+    return tabla.astype({metrica: float for metrica in metricasRegistro})
+
+
+#Entradas: str, str, str -> Salidas: dict | None
+def mejorModelo(columnaSalida, metrica="r2Test", rutaRegistro=rutaRegistroPorDefecto):
+    """Fila del registro con la mejor `metrica` para `columnaSalida` (None si no hay ninguno)."""
+    tabla = buscarModelos(columnaSalida, ordenarPor=metrica, limite=1, rutaRegistro=rutaRegistro)
+    if tabla.empty or pd.isna(tabla.at[0, metrica]):
+        return None
+    return tabla.iloc[0].to_dict()
+
+
+def columnasSalidaRegistradas(rutaRegistro=rutaRegistroPorDefecto):
+    """Columnas de salida distintas que hay en el registro, ordenadas."""
+    con = _conectar(rutaRegistro)
+    try:
+        return [fila[0] for fila in con.execute(
+            "SELECT DISTINCT columnaSalida FROM modelos WHERE columnaSalida IS NOT NULL ORDER BY columnaSalida")]
+    finally:
+        con.close()
+
+
+def eliminarInexistentes(rutaRegistro=rutaRegistroPorDefecto):
+    """Quita del registro los modelos cuyo archivo ya no existe. Devuelve cuántos se quitaron."""
+    con = _conectar(rutaRegistro)
+    try:
+        desaparecidos = [(ruta,) for (ruta,) in con.execute("SELECT ruta FROM modelos") if not os.path.exists(ruta)]
+        with con:
+            con.executemany("DELETE FROM modelos WHERE ruta = ?", desaparecidos)
+        return len(desaparecidos)
+    finally:
+        con.close()
@@ -0,0 +1,331 @@
+import asyncio
+import collections
+import json
+import os
+import threading
+import time
+import numpy as np
+
+from . import GestionDatos as gd
+from .DespachadorPrediccion import DespachadorPrediccion, maxLotePorDefecto, esperaMaxMsPorDefecto
+from .PuntuadorLineal import obtenerPuntuador
+
+# Microservicio HTTP de predicción (solo biblioteca estándar: asyncio).
+# Carga uno o varios modelos guardados con crearModeloDisco, los mantiene en
+# memoria y agrupa las peticiones concurrentes de cada modelo en lotes con un
+# DespachadorPrediccion: la primera petición que llega abre una ventana de
+# `esperaMaxMs` milisegundos (o hasta `maxLote` filas) y todas las filas de esa
+# ventana se predicen con una sola llamada vectorizada.
+#
+# Rutas:
+#   GET  /salud                   -> {"estado": "ok"}
+#   GET  /modelos                 -> metadatos de los modelos cargados
+#   GET  /metricas                -> contadores de latencia y rendimiento
+#   POST /predecir/<modelo>       -> cuerpo {"filas": [[...], ...]} o {"filas": [{"col": v, ...}, ...]}
+#                                    respuesta {"predicciones": [...]}
+
+# Latencias recientes que se guardan para calcular los percentiles
+_muestrasLatencia = 10_000
+_maxBytesCuerpo = 64 * 1024 * 1024
+
+_textosEstado = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                 413: "Payload Too Large", 431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+
+class ErrorPeticion(Exception):
+    """Error atribuible a la petición del cliente (se responde con `estado`)."""
+    def __init__(self, mensaje, estado=400):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class ModeloServido:
+    """Un modelo cargado: columnas, etiquetas de salida y validación de las filas recibidas."""
+    def __init__(self, nombre, datosModelo):
+        self.nombre = nombre
+        self.estimador = datosModelo.get("modelo")
+        self.columnasEntrada = list(datosModelo.get("columnasEntrada") or [])
+        if self.estimador is None or not self.columnasEntrada:
+            raise ValueError(f"'{nombre}' no contiene un modelo válido.")
+        self.columnaSalida = datosModelo.get("columnaSalida")
+        dicSalida = datosModelo.get("dicColumnaSalida")
+        self.inversoSalida = {v: k for k, v in dicSalida.items()} if dicSalida else None
+        self.descripcion = datosModelo.get("descripcion", "")
+        self.puntuador = obtenerPuntuador(self.estimador)
+        self.preprocesado = datosModelo.get("preprocesado")
+
+    def matrizDesdeFilas(self, filas):
+        """
+        Convierte las filas de la petición (listas u objetos JSON) en una matriz
+        float. Si el modelo tiene preprocesado, los null se imputan con los
+        valores ajustados al entrenar.
+        """
+        if not isinstance(filas, list) or not filas:
+            raise ErrorPeticion("'filas' debe ser una lista no vacía.")
+        try:
+            if isinstance(filas[0], dict):
+                matriz = np.array([[fila[c] for c in self.columnasEntrada] for fila in filas], dtype=float)
+            else:
+                matriz = np.array(filas, dtype=float)
+        except KeyError as e:
+            raise ErrorPeticion(f"Falta la columna {e} en alguna fila.")
+        except (TypeError, ValueError):
+            raise ErrorPeticion("Las filas deben contener solo valores numéricos.")
+        if matriz.ndim != 2 or matriz.shape[1] != len(self.columnasEntrada):
+            raise ErrorPeticion(f"Cada fila debe tener {len(self.columnasEntrada)} valores: {', '.join(self.columnasEntrada)}.")
+        if self.preprocesado is not None:
+            self.preprocesado.transformarMatriz(matriz, self.columnasEntrada)
+        # Los null que el preprocesado no rellena (o si no hay) son un error de la petición, no del modelo
+        invalidas = ~np.isfinite(matriz).all(axis=0)
+        if invalidas.any():
+            columnas = [c for c, invalida in zip(self.columnasEntrada, invalidas) if invalida]
+            raise ErrorPeticion(f"Valores nulos o no finitos en la columna: {', '.join(columnas)}.")
+        return matriz
+
+    def valoresJson(self, prediccion):
+        """Predicciones como lista JSON, con las etiquetas originales si la salida se codificó."""
+        valores = np.asarray(prediccion).tolist()
+        if self.inversoSalida:
+            valores = [self.inversoSalida.get(v, v) for v in valores]
+        return valores
+
+    def descripcionJson(self):
+        return {"nombre": self.nombre, "columnasEntrada": self.columnasEntrada, "columnaSalida": self.columnaSalida,
+                "tipoEstimador": type(self.estimador).__name__, "descripcion": self.descripcion,
+                "rapido": self.puntuador is not None,
+                "preprocesado": self.preprocesado.aDiccionario() if self.preprocesado is not None else None}
+
+
+class ContadoresServidor:
+    """Contadores de latencia y rendimiento (solo se tocan desde el bucle de asyncio)."""
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.peticiones = 0
+        self.errores = 0
+        self.filas = 0
+        self.latencias = collections.deque(maxlen=_muestrasLatencia)
+
+    def registrarPeticion(self, segundos, filas=0, error=False):
+        self.peticiones += 1
+        self.filas += filas
+        self.errores += error
+        self.latencias.append(segundos)
+
+    def resumen(self, despachador):
+        transcurrido = time.perf_counter() - self.inicio
+        latenciasMs = np.array(self.latencias) * 1000
+        percentiles = (dict(zip(["p50", "p95", "p99"], np.percentile(latenciasMs, [50, 95, 99]).round(3).tolist()))
+                       if len(latenciasMs) else {"p50": None, "p95": None, "p99": None})
+        return {
+            "segundosActivo": round(transcurrido, 3),
+            "peticiones": self.peticiones,
+            "errores": self.errores,
+            "filasPredichas": self.filas,
+            "lotes": despachador.lotes,
+            "filasPorLote": despachador.estadisticas()["filasPorLote"],
+            "peticionesPorSegundo": round(self.peticiones / transcurrido, 2) if transcurrido else None,
+            "filasPorSegundo": round(self.filas / transcurrido, 2) if transcurrido else None,
+            "latenciaMediaMs": round(float(latenciasMs.mean()), 3) if len(latenciasMs) else None,
+            "latenciaMs": percentiles,
+        }
+
+
+class ServidorPrediccion:
+    """
+    Servidor HTTP asyncio que sirve predicciones de modelos guardados.
+
+    Args:
+        modelos (dict | list): {nombre: ruta o diccionario del modelo}, o lista de
+            rutas (el nombre es el del archivo sin extensión).
+        host (str): Interfaz de escucha (por defecto solo la máquina local).
+        puerto (int): Puerto (0 = uno libre, ver `puerto` tras iniciar).
+        maxLote (int): Máximo de filas por llamada a predict.
+        esperaMaxMs (float): Tiempo máximo que una petición espera a que se llene su lote.
+    """
+    def __init__(self, modelos, host="127.0.0.1", puerto=8080, maxLote=maxLotePorDefecto,
+                 esperaMaxMs=esperaMaxMsPorDefecto):
+        if not isinstance(modelos, dict):
+            modelos = {os.path.splitext(os.path.basename(r))[0]: r for r in modelos}
+        self.modelos = {}
+        for nombre, modelo in modelos.items():
+            datos = gd.cargarModeloDisco(modelo) if isinstance(modelo, str) else modelo
+            self.modelos[nombre] = ModeloServido(nombre, datos)
+        self.host, self.puerto = host, puerto
+        self.maxLote, self.esperaMaxMs = maxLote, esperaMaxMs
+        self.despachador = DespachadorPrediccion(maxLote, esperaMaxMs)
+        self.contadores = ContadoresServidor()
+        self._servidor = None
+        self._bucle = None
+        self._hilo = None
+
+    # --- Predicción ---
+
+    async def predecir(self, nombreModelo, filas):
+        """Predice las filas con el modelo indicado, compartiendo lote con otras peticiones."""
+        modelo = self.modelos.get(nombreModelo)
+        if modelo is None:
+            raise ErrorPeticion(f"No hay ningún modelo llamado '{nombreModelo}'.", 404)
+        matriz = modelo.matrizDesdeFilas(filas)
+        # El hilo del despachador hace predict sin bloquear el bucle de asyncio
+        prediccion = await asyncio.wrap_future(self.despachador.enviar(modelo.estimador, matriz, modelo.columnasEntrada))
+        return modelo.valoresJson(prediccion)
+
+    # --- HTTP ---
+
+    async def _atender(self, peticion):
+        """Devuelve (estado, cuerpo JSON, filas predichas) para una petición ya leída."""
+        metodo, ruta, cuerpo = peticion
+        partes = [p for p in ruta.split("?")[0].split("/") if p]
+        if partes == ["salud"]:
+            return 200, {"estado": "ok"}, 0
+        if partes == ["modelos"]:
+            return 200, {"modelos": [m.descripcionJson() for m in self.modelos.values()]}, 0
+        if partes == ["metricas"]:
+            return 200, self.contadores.resumen(self.despachador), 0
+        if len(partes) == 2 and partes[0] == "predecir":
+            if metodo != "POST":
+                raise ErrorPeticion("Usa POST para predecir.", 405)
+            try:
+                datos = json.loads(cuerpo or b"{}")
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                raise ErrorPeticion(f"JSON no válido: {e}")
+            filas = datos.get("filas") if isinstance(datos, dict) else None
+            if filas is None and isinstance(datos, dict) and "fila" in datos:
+                filas = [datos["fila"]]
+            predicciones = await self.predecir(partes[1], filas)
+            return 200, {"modelo": partes[1], "predicciones": predicciones}, len(predicciones)
+        raise ErrorPeticion(f"Ruta desconocida: {ruta}", 404)
+
+    @staticmethod
+    async def _leerLinea(lector):
+        try:
+            return await lector.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            # La línea supera el límite del StreamReader (64 KiB)
+            raise ErrorPeticion("Línea de petición o cabecera demasiado larga.", 431)
+
+    async def _leerPeticion(self, lector):
+        """Lee una petición HTTP/1.1. Devuelve (método, ruta, cuerpo, mantenerConexión) o None si se cerró."""
+        linea = await self._leerLinea(lector)
+        if not linea:
+            return None
+        try:
+            metodo, ruta, version = linea.decode("latin-1").split()
+        except ValueError:
+            raise ErrorPeticion("Línea de petición mal formada.")
+        cabeceras = {}
+        while True:
+            linea = await self._leerLinea(lector)
+            if linea in (b"\r\n", b"\n", b""):
+                break
+            clave, _, valor = linea.decode("latin-1").partition(":")
+            cabeceras[clave.strip().lower()] = valor.strip()
+        try:
+            longitud = int(cabeceras.get("content-length", 0) or 0)
+        except ValueError:
+            longitud = -1
+        if longitud < 0:
+            raise ErrorPeticion("Content-Length no válido.", 400)
+        if longitud > _maxBytesCuerpo:
+            raise ErrorPeticion("Cuerpo demasiado grande.", 413)
+        cuerpo = await lector.readexactly(longitud) if longitud else b""
+        conexion = cabeceras.get("connection", "").lower()
+        mantener = conexion != "close" if version == "HTTP/1.1" else conexion == "keep-alive"
+        return metodo.upper(), ruta, cuerpo, mantener
+
+    @staticmethod
+    def _respuesta(estado, contenido, mantener):
+        cuerpo = json.dumps(contenido, ensure_ascii=False).encode("utf-8")
+        cabecera = (f"HTTP/1.1 {estado} {_textosEstado.get(estado, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(cuerpo)}\r\n"
+                    f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n")
+        return cabecera.encode("latin-1") + cuerpo
+
+    async def _conexion(self, lector, escritor):
+        """Atiende todas las peticiones de una conexión (keep-alive)."""
+        try:
+            while True:
+                try:
+                    leida = await self._leerPeticion(lector)
+                except ErrorPeticion as e:
+                    escritor.write(self._respuesta(e.estado, {"error": str(e)}, False))
+                    break
+                if leida is None:
+                    break
+                metodo, ruta, cuerpo, mantener = leida
+                inicio = time.perf_counter()
+                filas, error = 0, False
+                try:
+                    estado, contenido, filas = await self._atender((metodo, ruta, cuerpo))
+                except ErrorPeticion as e:
+                    estado, contenido, error = e.estado, {"error": str(e)}, True
+                except Exception as e:
+                    estado, contenido, error = 500, {"error": str(e)}, True
+                escritor.write(self._respuesta(estado, contenido, mantener))
+                await escritor.drain()
+                self.contadores.registrarPeticion(time.perf_counter() - inicio, filas, error)
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    # --- Ciclo de vida ---
+
+    async def iniciar(self):
+        """Abre el puerto. Devuelve el puerto real."""
+        self._servidor = await asyncio.start_server(self._conexion, self.host, self.puerto)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        return self.puerto
+
+    async def detener(self):
+        """Cierra el puerto."""
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+
+    def servirParaSiempre(self):
+        """Bloquea sirviendo peticiones hasta Ctrl+C (uso desde la línea de comandos)."""
+        async def principal():
+            await self.iniciar()
+            print(f"Sirviendo {', '.join(self.modelos)} en http://{self.host}:{self.puerto}", flush=True)
+            try:
+                await self._servidor.serve_forever()
+            finally:
+                await self.detener()
+        asyncio.run(principal())
+
+    def iniciarEnSegundoPlano(self):
+        """Arranca el servidor en un hilo daemon con su propio bucle. Devuelve el puerto."""
+        listo = threading.Event()
+        errores = []
+
+        def ejecutar():
+            self._bucle = asyncio.new_event_loop()
+            try:
+                self._bucle.run_until_complete(self.iniciar())
+            except Exception as e:
+                errores.append(e)
+                listo.set()
+                return
+            listo.set()
+            self._bucle.run_forever()
+            self._bucle.run_until_complete(self.detener())
+            self._bucle.close()
+
+        self._hilo = threading.Thread(target=ejecutar, name="servidorPrediccion", daemon=True)
+        self._hilo.start()
+        listo.wait()
+        if errores:
+            raise errores[0]
+        return self.puerto
+
+    def detenerSegundoPlano(self):
+        """Detiene el servidor lanzado con iniciarEnSegundoPlano."""
+        if self._bucle is not None and self._hilo is not None:
+            self._bucle.call_soon_threadsafe(self._bucle.stop)
+            self._hilo.join(timeout=5)
+            self._hilo = None
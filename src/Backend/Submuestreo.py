@@ -0,0 +1,162 @@
+import numpy as np
+
+# Nivel de detalle (LOD) para diagramas de dispersión grandes.
+# En lugar de enviar al navegador todos los puntos, se envía una submuestra
+# estratificada por celdas de una rejilla: cada celda conserva una fracción de
+# sus puntos proporcional a su densidad (con al menos uno, para que las zonas
+# poco pobladas no desaparezcan), y además se conservan siempre los extremos de
+# cada eje y los valores atípicos. Al hacer zoom se vuelve a submuestrear solo
+# el rango visible, con lo que aparece más detalle.
+
+# Puntos máximos por traza si no se conoce el tamaño de la vista
+maxPuntosPorDefecto = 20_000
+# Plotly dibuja los Scatter3d con WebGL pero es mucho más lento rotándolos
+maxPuntos3D = 8_000
+# Puntuación z robusta (basada en la MAD) a partir de la cual un punto es atípico
+umbralAtipicos = 3.5
+# Fracción del presupuesto que pueden ocupar los atípicos
+fraccionMaxAtipicos = 0.2
+
+
+#Entradas: int, int -> Salidas: int
+def puntosParaVista(anchoPx, altoPx, puntosPorPixel=0.05, minimo=2_000, maximo=50_000):
+    """
+    Presupuesto de puntos para una vista de anchoPx × altoPx píxeles, redondeado
+    a una potencia de dos para que un cambio pequeño de tamaño no cambie la
+    submuestra (y obligue a reenviar las trazas).
+    """
+    puntos = min(maximo, max(minimo, anchoPx * altoPx * puntosPorPixel))
+    return int(min(maximo, 2 ** round(np.log2(puntos))))
+
+
+def _aFlotante(columna):
+    """Convierte una columna a array float; None si no es numérica."""
+    try:
+        return np.asarray(columna, dtype=float)
+    except (TypeError, ValueError):
+        return None
+
+
+def _mascaraAtipicos(columnas, umbral):
+    """Marca los puntos con puntuación z robusta mayor que `umbral` en alguna columna."""
+    mascara = np.zeros(len(columnas[0]), dtype=bool)
+    for valores in columnas:
+        mediana = np.median(valores)
+        mad = np.median(np.abs(valores - mediana))
+        if mad == 0:
+            continue
+        mascara |= 0.6745 * np.abs(valores - mediana) / mad > umbral
+    return mascara
+
+
+def _indicesExtremos(columnas):
+    """Índices del mínimo y el máximo de cada columna."""
+    extremos = []
+    for valores in columnas:
+        extremos.extend((int(np.argmin(valores)), int(np.argmax(valores))))
+    return np.unique(extremos)
+
+
+def _celdas(columnas, nCeldasEje):
+    """Índice de celda de la rejilla para cada punto."""
+    celda = np.zeros(len(columnas[0]), dtype=np.int64)
+    for valores in columnas:
+        minimo, maximo = valores.min(), valores.max()
+        ancho = (maximo - minimo) or 1.0
+        indice = np.minimum(((valores - minimo) / ancho * nCeldasEje).astype(np.int64), nCeldasEje - 1)
+        celda = celda * nCeldasEje + indice
+    return celda
+
+
+def _muestraEstratificada(celda, nCeldas, presupuesto, rng):
+    """
+    Elige unos `presupuesto` puntos (nunca más) repartidos por celdas en
+    proporción a su densidad, con al menos uno por celda ocupada. Devuelve índices locales.
+    """
+    n = len(celda)
+    if presupuesto <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    conteos = np.bincount(celda, minlength=nCeldas)
+    ocupadas = conteos > 0
+
+    # Cuota proporcional (mínimo uno por celda ocupada) y reparto del sobrante
+    # por restos mayores, sin superar nunca los puntos de la celda
+    ideal = conteos * max(presupuesto - ocupadas.sum(), 0) / n
+    cuotas = np.where(ocupadas, 1 + np.floor(ideal), 0).astype(np.int64)
+    cuotas = np.minimum(cuotas, conteos)
+    sobrante = presupuesto - cuotas.sum()
+    if sobrante > 0:
+        resto = np.where(cuotas < conteos, ideal - np.floor(ideal), -1.0)
+        mayores = np.argsort(resto)[::-1][:sobrante]
+        cuotas[mayores[resto[mayores] >= 0]] += 1
+
+    # Cada punto entra con probabilidad cuota/conteos de su celda (sin ordenar
+    # el millón de puntos); un representante por celda garantiza el mínimo de uno
+    probabilidad = np.divide(cuotas, conteos, out=np.zeros(nCeldas), where=ocupadas)
+    elegidos = rng.random(n) < probabilidad[celda]
+    representantes = np.full(nCeldas, -1, dtype=np.int64)
+    representantes[celda] = np.arange(n)
+    elegidos[representantes[ocupadas]] = True
+    elegidos = np.flatnonzero(elegidos)
+
+    if len(elegidos) > presupuesto:
+        elegidos = rng.choice(elegidos, presupuesto, replace=False)
+    return elegidos
+
+
+#Entradas: list[array], int, list[tuple | None] | None, int -> Salidas: np.ndarray
+def submuestrear(columnas, maxPuntos=maxPuntosPorDefecto, rango=None, semilla=0):
+    """
+    Submuestra de nivel de detalle para un diagrama de dispersión.
+
+    Args:
+        columnas (list[array]): Coordenadas de los puntos (x, y[, z]), todas de la misma longitud.
+        maxPuntos (int): Número máximo de índices devueltos.
+        rango (list[tuple | None] | None): (mínimo, máximo) visible de cada columna, o None
+            para no filtrar esa columna. Los puntos fuera del rango se descartan.
+        semilla (int): Semilla del muestreo (la misma entrada da siempre la misma submuestra).
+
+    Returns:
+        np.ndarray: Índices posicionales (ordenados) de los puntos a dibujar.
+    """
+    n = len(columnas[0])
+    valores = [_aFlotante(c) for c in columnas]
+    if any(v is None for v in valores):
+        # Columnas no numéricas: no hay rejilla posible, muestra uniforme
+        if n <= maxPuntos:
+            return np.arange(n)
+        return np.sort(np.random.default_rng(semilla).choice(n, maxPuntos, replace=False))
+
+    visibles = np.ones(n, dtype=bool)
+    for v in valores:
+        visibles &= np.isfinite(v)
+    if rango is not None:
+        for v, limites in zip(valores, rango):
+            if limites is not None:
+                visibles &= (v >= limites[0]) & (v <= limites[1])
+    indices = np.flatnonzero(visibles)
+    if len(indices) <= maxPuntos:
+        return indices
+    valores = [v[indices] for v in valores]
+
+    rng = np.random.default_rng(semilla)
+    forzados = _indicesExtremos(valores)
+    atipicos = np.flatnonzero(_mascaraAtipicos(valores, umbralAtipicos))
+    maxAtipicos = int(maxPuntos * fraccionMaxAtipicos)
+    if len(atipicos) > maxAtipicos:
+        # Demasiados "atípicos" para el presupuesto: se conservan los más alejados
+        distancia = np.zeros(len(atipicos))
+        for v in valores:
+            mediana = np.median(v)
+            distancia = np.maximum(distancia, np.abs(v[atipicos] - mediana) / (np.std(v) or 1.0))
+        atipicos = atipicos[np.argsort(distancia)[::-1][:maxAtipicos]]
+    forzados = np.union1d(forzados, atipicos)
+
+    esResto = np.ones(len(indices), dtype=bool)
+    esResto[forzados] = False
+    resto = np.flatnonzero(esResto)
+    nCeldasEje = max(1, int((maxPuntos / 4) ** (1 / len(valores))))
+    celda = _celdas([v[resto] for v in valores], nCeldasEje)
+    muestra = resto[_muestraEstratificada(celda, nCeldasEje ** len(valores), maxPuntos - len(forzados), rng)]
+
+    return indices[np.sort(np.concatenate((forzados, muestra)))]
@@ -0,0 +1,141 @@
+import threading
+import numpy as np
+import pandas as pd
+
+# Evaluación de la línea (2D) y la superficie (3D) del modelo para las gráficas.
+# La rejilla empieza gruesa y se refina solo donde la respuesta del modelo se
+# curva o salta (árboles, KNN...): se buscan los nodos con segunda diferencia
+# grande y se añaden los puntos medios de sus intervalos. El resultado se guarda
+# por (modelo, columnas, límites, resolución), así que repintar la gráfica tras
+# una predicción manual no vuelve a llamar a predict sobre la rejilla.
+
+# Tolerancia relativa (sobre el rango de la salida) de la segunda diferencia
+toleranciaCurvatura = 0.01
+# Nunca se parte un intervalo más estrecho que (máximo - mínimo) / divisionMinima
+divisionMinima = 4096
+
+_cacheSuperficies = {}
+_maxEntradasCache = 16
+_candado = threading.Lock()
+
+
+def invalidarCacheSuperficie():
+    """Olvida todas las líneas y superficies calculadas (al ajustar o cargar otro modelo)."""
+    with _candado:
+        _cacheSuperficies.clear()
+
+
+def _consultarCache(clave, modelo):
+    with _candado:
+        entrada = _cacheSuperficies.get(clave)
+    # La clave usa id(modelo); se comprueba la identidad por si el id se ha reutilizado
+    if entrada is not None and entrada[0] is modelo:
+        return entrada[1]
+    return None
+
+
+def _guardarCache(clave, modelo, resultado):
+    with _candado:
+        _cacheSuperficies[clave] = (modelo, resultado)
+        while len(_cacheSuperficies) > _maxEntradasCache:
+            del _cacheSuperficies[next(iter(_cacheSuperficies))]
+
+
+def _predecir(modelo, columnas, valores):
+    """predict sobre un DataFrame con los nombres de columna del modelo."""
+    return np.asarray(modelo.predict(pd.DataFrame(valores, columns=columnas)))
+
+
+def _intervalosCurvos(valores, eje, tolerancia):
+    """
+    Índices i de los intervalos [i, i+1] a partir a lo largo de `eje`: los que
+    tocan un nodo cuya segunda diferencia supera la tolerancia en alguna fila.
+    """
+    segunda = np.abs(np.diff(valores, n=2, axis=eje))
+    if valores.ndim > 1:
+        segunda = segunda.max(axis=1 - eje)
+    curvos = np.flatnonzero(segunda > tolerancia)
+    # El nodo curvo i+1 afecta a los intervalos [i, i+1] y [i+1, i+2]
+    return np.unique(np.concatenate((curvos, curvos + 1)))
+
+
+def _partir(nodos, intervalos, anchoMinimo, maxNodos):
+    """Añade los puntos medios de los intervalos indicados (sin superar maxNodos)."""
+    intervalos = intervalos[np.diff(nodos)[intervalos] > anchoMinimo]
+    intervalos = intervalos[:max(maxNodos - len(nodos), 0)]
+    medios = (nodos[intervalos] + nodos[intervalos + 1]) / 2
+    return np.sort(np.concatenate((nodos, medios)))
+
+
+#Entradas: estimador, str, float, float, int, int -> Salidas: (np.ndarray, np.ndarray)
+def evaluarLinea(modelo, colX, xMin, xMax, puntosIniciales=64, maxPuntos=1024):
+    """
+    Línea del modelo en [xMin, xMax] con resolución adaptativa.
+
+    Returns:
+        tuple: (x, y) ordenados por x. Lanza la excepción de predict si el modelo falla.
+    """
+    clave = ("linea", id(modelo), colX, float(xMin), float(xMax), puntosIniciales, maxPuntos)
+    resultado = _consultarCache(clave, modelo)
+    if resultado is not None:
+        return resultado
+
+    x = np.linspace(xMin, xMax, puntosIniciales)
+    y = _predecir(modelo, [colX], x)
+    anchoMinimo = (xMax - xMin) / divisionMinima
+    # Con etiquetas no numéricas no hay curvatura que medir: se queda la rejilla uniforme
+    while np.issubdtype(y.dtype, np.number) and len(x) < maxPuntos:
+        tolerancia = toleranciaCurvatura * ((np.ptp(y) if np.isfinite(y).all() else 0) or 1.0)
+        xNuevo = _partir(x, _intervalosCurvos(y, 0, tolerancia), anchoMinimo, maxPuntos)
+        if len(xNuevo) == len(x):
+            break
+        nuevos = ~np.isin(xNuevo, x)
+        yNuevo = np.empty(len(xNuevo), dtype=y.dtype)
+        yNuevo[~nuevos] = y
+        yNuevo[nuevos] = _predecir(modelo, [colX], xNuevo[nuevos])
+        x, y = xNuevo, yNuevo
+
+    _guardarCache(clave, modelo, (x, y))
+    return x, y
+
+
+#Entradas: estimador, str, str, tuple, int, int -> Salidas: (np.ndarray, np.ndarray, np.ndarray)
+def evaluarSuperficie(modelo, colX, colY, limites, puntosIniciales=20, maxPuntosEje=96):
+    """
+    Superficie del modelo sobre la rejilla rectangular `limites` = (xMin, xMax, yMin, yMax).
+
+    Cada eje se refina por separado (la rejilla sigue siendo rectangular, como
+    necesita go.Surface) y en cada pasada solo se predicen los puntos nuevos.
+
+    Returns:
+        tuple: (xLin, yLin, z) con z de forma (len(yLin), len(xLin)).
+    """
+    xMin, xMax, yMin, yMax = (float(v) for v in limites)
+    clave = ("superficie", id(modelo), colX, colY, xMin, xMax, yMin, yMax, puntosIniciales, maxPuntosEje)
+    resultado = _consultarCache(clave, modelo)
+    if resultado is not None:
+        return resultado
+
+    xLin = np.linspace(xMin, xMax, puntosIniciales)
+    yLin = np.linspace(yMin, yMax, puntosIniciales)
+    xMesh, yMesh = np.meshgrid(xLin, yLin)
+    z = _predecir(modelo, [colX, colY], np.c_[xMesh.ravel(), yMesh.ravel()]).astype(float).reshape(xMesh.shape)
+
+    while True:
+        tolerancia = toleranciaCurvatura * ((np.ptp(z) if np.isfinite(z).all() else 0) or 1.0)
+        xNuevo = _partir(xLin, _intervalosCurvos(z, 1, tolerancia), (xMax - xMin) / divisionMinima, maxPuntosEje)
+        yNuevo = _partir(yLin, _intervalosCurvos(z, 0, tolerancia), (yMax - yMin) / divisionMinima, maxPuntosEje)
+        if len(xNuevo) == len(xLin) and len(yNuevo) == len(yLin):
+            break
+        # Se colocan los valores ya calculados y se predicen solo los huecos
+        zNuevo = np.empty((len(yNuevo), len(xNuevo)))
+        huecos = np.ones(zNuevo.shape, dtype=bool)
+        posiciones = np.ix_(np.searchsorted(yNuevo, yLin), np.searchsorted(xNuevo, xLin))
+        zNuevo[posiciones] = z
+        huecos[posiciones] = False
+        xMesh, yMesh = np.meshgrid(xNuevo, yNuevo)
+        zNuevo[huecos] = _predecir(modelo, [colX, colY], np.c_[xMesh[huecos], yMesh[huecos]])
+        xLin, yLin, z = xNuevo, yNuevo, zNuevo
+
+    _guardarCache(clave, modelo, (xLin, yLin, z))
+    return xLin, yLin, z
@@ -0,0 +1,268 @@
+import math
+import numpy as np
+import pandas as pd
+
+from .CuantilesAproximados import EstimadorCuantiles, maxExactoPorDefecto
+from .PreprocesamientoDatos import copiarColumnas, esFloatNumpy, rellenarSerieNullable, valoresRelleno
+
+# Transformadores de preprocesado ajustados.
+#
+# Cada paso se ajusta una vez sobre los datos de entrenamiento (las medias,
+# medianas o constantes de imputación; el mapeo de la salida binaria) y guarda
+# lo aprendido, así que los datos nuevos se transforman en una sola pasada
+# vectorizada sin volver a recorrer el conjunto de entrenamiento. El pipeline se
+# guarda con el modelo: `aDiccionario` lo convierte en un dict JSON que va en la
+# cabecera del artefacto (ArtefactoModelo) y `desdeDiccionario` lo reconstruye.
+
+
+def _numero(valor):
+    """float nativo para JSON (None en lugar de NaN)."""
+    valor = float(valor)
+    return None if math.isnan(valor) else valor
+
+
+class ImputadorNan:
+    """
+    Rellena los NaN de columnas numéricas con valores aprendidos al ajustar.
+
+    Args:
+        columnas (list[str]): Columnas a imputar.
+        metodo (str): 'media', 'mediana' o 'constante'.
+        valorConstante (float | None): Valor si metodo='constante'.
+        valores (dict | None): {columna: valor} ya ajustados (al cargar).
+    """
+    tipo = "imputadorNan"
+
+    def __init__(self, columnas, metodo, valorConstante=None, valores=None):
+        self.columnas = [columnas] if isinstance(columnas, str) else list(columnas)
+        self.metodo = metodo
+        self.valorConstante = valorConstante
+        self.valores = dict(valores) if valores else {}
+
+    def _columnasNumericas(self, df):
+        return [c for c in self.columnas
+                if c in df.columns and pd.api.types.is_numeric_dtype(df[c].dtype)
+                and not pd.api.types.is_bool_dtype(df[c].dtype)]
+
+    @staticmethod
+    def _bloqueFloat(df, columnas):
+        bloque = np.empty((len(df), len(columnas)), dtype=np.float64, order="F")
+        for j, col in enumerate(columnas):
+            bloque[:, j] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        return bloque
+
+    #Entradas: pd.DataFrame -> Salidas: ImputadorNan
+    def ajustar(self, df):
+        """Calcula el valor de relleno de cada columna numérica de `df` (todas a la vez)."""
+        columnas = self._columnasNumericas(df)
+        valores = valoresRelleno(self._bloqueFloat(df, columnas), self.metodo, self.valorConstante)
+        if valores is None:
+            raise ValueError(f"Método de imputación desconocido: {self.metodo}")
+        self.valores = {col: _numero(v) for col, v in zip(columnas, valores)}
+        return self
+
+    #Entradas: iterable[pd.DataFrame], int -> Salidas: ImputadorNan
+    def ajustarPorBloques(self, bloques, maxExacto=maxExactoPorDefecto):
+        """
+        Como `ajustar`, pero en una pasada sobre bloques (p.ej. los de
+        ImportacionDatos.leerPorBloques) con memoria acotada: la media se acumula
+        como sumas y recuentos, y la mediana con un EstimadorCuantiles por columna
+        (exacta mientras la columna tenga hasta `maxExacto` valores, KLL si no).
+        """
+        if self.metodo not in ("media", "mediana", "constante"):
+            raise ValueError(f"Método de imputación desconocido: {self.metodo}")
+        columnas = None
+        for bloque in bloques:
+            if columnas is None:
+                columnas = self._columnasNumericas(bloque)
+                sumas, cuentas = np.zeros(len(columnas)), np.zeros(len(columnas))
+                estimadores = [EstimadorCuantiles(maxExacto) for _ in columnas]
+                if self.metodo == "constante":
+                    break  # solo hacía falta saber qué columnas son numéricas
+            datos = self._bloqueFloat(bloque, columnas)
+            if self.metodo == "media":
+                validos = ~np.isnan(datos)
+                sumas += np.add.reduce(datos, axis=0, where=validos)
+                cuentas += validos.sum(axis=0)
+            else:
+                for j, estimador in enumerate(estimadores):
+                    estimador.actualizar(datos[:, j])
+        if columnas is None:
+            self.valores = {}
+        elif self.metodo == "media":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self.valores = {col: _numero(v) for col, v in zip(columnas, sumas / cuentas)}
+        elif self.metodo == "mediana":
+            self.valores = {col: _numero(e.mediana()) for col, e in zip(columnas, estimadores)}
+        else:
+            self.valores = {col: _numero(self.valorConstante) for col in columnas}
+        return self
+
+    def _valoresTramo(self, columnas):
+        return np.array([np.nan if self.valores.get(c) is None else self.valores[c] for c in columnas])
+
+    #Entradas: pd.DataFrame -> Salidas: pd.DataFrame
+    def transformar(self, df):
+        """
+        DataFrame nuevo con los NaN rellenados. Las columnas float se copian en
+        bloques 2D y se rellenan con un único np.copyto por bloque; `df` no se modifica.
+        """
+        columnas = [c for c in self.valores if c in df.columns]
+        if not columnas:
+            return df
+
+        def rellenar(bloque, tramo):
+            np.copyto(bloque, self._valoresTramo(tramo), where=np.isnan(bloque), casting="same_kind")
+
+        resultado = df.copy(deep=False)
+        floats = [c for c in columnas if esFloatNumpy(df[c].dtype)]
+        if floats:
+            rellenas = copiarColumnas(df, floats, tratarBloque=rellenar)
+            for col in floats:
+                resultado[col] = rellenas[col]
+        # Tipos de pandas que admiten nulos (Int64, Float64...): mismas reglas que al entrenar
+        for col in columnas:
+            if col not in floats and not isinstance(df[col].dtype, np.dtype):
+                resultado[col] = rellenarSerieNullable(df[col], self.valores[col])
+        return resultado
+
+    #Entradas: np.ndarray, list[str] -> Salidas: np.ndarray
+    def transformarMatriz(self, matriz, columnas):
+        """Rellena in situ los NaN de una matriz float cuyas columnas son `columnas`."""
+        np.copyto(matriz, self._valoresTramo(columnas), where=np.isnan(matriz), casting="same_kind")
+        return matriz
+
+    def aDiccionario(self):
+        return {"tipo": self.tipo, "columnas": self.columnas, "metodo": self.metodo,
+                "valorConstante": self.valorConstante, "valores": self.valores}
+
+    @classmethod
+    def desdeDiccionario(cls, datos):
+        return cls(datos["columnas"], datos["metodo"], datos.get("valorConstante"), datos.get("valores"))
+
+    def __repr__(self):
+        return f"ImputadorNan({self.metodo!r}, {self.valores})"
+
+
+class CodificadorBinario:
+    """
+    Convierte una columna con dos valores en 0/1 con el mapeo aprendido al ajustar
+    (como transformarColumnaBinariaAuto) y permite deshacerlo en las predicciones.
+
+    Args:
+        columna (str): Columna a codificar (normalmente la de salida).
+        mapeo (dict | None): {valor: 0 | 1} ya ajustado.
+    """
+    tipo = "codificadorBinario"
+
+    def __init__(self, columna, mapeo=None):
+        self.columna = columna
+        self.mapeo = dict(mapeo) if mapeo else {}
+
+    #Entradas: pd.DataFrame -> Salidas: CodificadorBinario
+    def ajustar(self, df):
+        valoresUnicos = df[self.columna].dropna().unique()
+        if len(valoresUnicos) != 2:
+            raise ValueError(f"La columna '{self.columna}' no es binaria. Tiene {len(valoresUnicos)} valores únicos.")
+        try:
+            valoresUnicos = sorted(valoresUnicos)
+        except TypeError:
+            pass
+        self.mapeo = {valoresUnicos[0]: 0, valoresUnicos[1]: 1}
+        return self
+
+    #Entradas: pd.DataFrame -> Salidas: pd.DataFrame
+    def transformar(self, df):
+        """Si `df` tiene la columna, la devuelve codificada (los valores desconocidos quedan NaN)."""
+        if self.columna not in df.columns:
+            return df
+        resultado = df.copy(deep=False)
+        resultado[self.columna] = pd.to_numeric(df[self.columna].map(self.mapeo), errors="coerce")
+        return resultado
+
+    def transformarMatriz(self, matriz, columnas):
+        return matriz  # la columna de salida no está entre las de entrada del modelo
+
+    #Entradas: array-like -> Salidas: pd.Series
+    def invertir(self, valores):
+        """Etiquetas originales de unas predicciones 0/1 (lo que no está en el mapeo se deja igual)."""
+        inverso = {v: k for k, v in self.mapeo.items()}
+        serie = pd.Series(valores)
+        return serie.map(inverso).fillna(serie)
+
+    def aDiccionario(self):
+        # Las claves pueden no ser texto (bool, números): se guardan como pares
+        return {"tipo": self.tipo, "columna": self.columna, "mapeo": [[k, v] for k, v in self.mapeo.items()]}
+
+    @classmethod
+    def desdeDiccionario(cls, datos):
+        return cls(datos["columna"], {k: v for k, v in datos.get("mapeo") or []})
+
+    def __repr__(self):
+        return f"CodificadorBinario({self.columna!r}, {self.mapeo})"
+
+
+_tiposTransformador = {clase.tipo: clase for clase in (ImputadorNan, CodificadorBinario)}
+
+
+class PipelinePreprocesado:
+    """
+    Secuencia de transformadores ajustados que se aplica a los datos nuevos antes de predecir.
+
+    Args:
+        pasos (list): Transformadores (ImputadorNan, CodificadorBinario) en orden.
+    """
+    versionFormato = 1
+
+    def __init__(self, pasos=None):
+        self.pasos = list(pasos) if pasos else []
+
+    def __len__(self):
+        return len(self.pasos)
+
+    def __repr__(self):
+        return f"PipelinePreprocesado({self.pasos})"
+
+    #Entradas: pd.DataFrame -> Salidas: PipelinePreprocesado
+    def ajustar(self, df):
+        """Ajusta cada paso sobre la salida del anterior, como se aplicaron al entrenar."""
+        self.ajustarTransformar(df)
+        return self
+
+    #Entradas: pd.DataFrame -> Salidas: pd.DataFrame
+    def ajustarTransformar(self, df):
+        for paso in self.pasos:
+            df = paso.ajustar(df).transformar(df)
+        return df
+
+    #Entradas: pd.DataFrame -> Salidas: pd.DataFrame
+    def transformar(self, df):
+        for paso in self.pasos:
+            df = paso.transformar(df)
+        return df
+
+    #Entradas: np.ndarray, list[str] -> Salidas: np.ndarray
+    def transformarMatriz(self, matriz, columnas):
+        """Aplica los pasos in situ a una matriz float (las filas de una petición de predicción)."""
+        for paso in self.pasos:
+            matriz = paso.transformarMatriz(matriz, columnas)
+        return matriz
+
+    def aDiccionario(self):
+        return {"version": self.versionFormato, "pasos": [paso.aDiccionario() for paso in self.pasos]}
+
+    #Entradas: dict | None -> Salidas: PipelinePreprocesado | None
+    @classmethod
+    def desdeDiccionario(cls, datos):
+        """Reconstruye el pipeline guardado en un artefacto (None si el modelo no tiene)."""
+        if not datos:
+            return None
+        if isinstance(datos, cls):
+            return datos
+        pasos = []
+        for paso in datos.get("pasos", []):
+            clase = _tiposTransformador.get(paso.get("tipo"))
+            if clase is None:
+                raise ValueError(f"Paso de preprocesado desconocido: {paso.get('tipo')}")
+            pasos.append(clase.desdeDiccionario(paso))
+        return cls(pasos)
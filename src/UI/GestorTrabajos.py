@@ -0,0 +1,246 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from collections import deque
+import multiprocessing
+import threading
+
+
+class TrabajoCancelado(Exception):
+    """Se lanza internamente cuando un trabajo se cancela a mitad de una etapa."""
+
+
+class Trabajo:
+    """
+    Trabajo en segundo plano formado por una secuencia de etapas.
+
+    Cada etapa recibe como primer argumento el resultado de la anterior
+    (salvo la primera, que solo recibe sus propios argumentos). Las etapas
+    marcadas con `enProceso=True` se ejecutan en un proceso aparte, por lo que
+    se pueden abortar en cualquier momento; su función y argumentos deben
+    poder serializarse con pickle (funciones de módulo, DataFrames...).
+    Las demás se ejecutan en el hilo del gestor.
+    """
+    def __init__(self, descripcion):
+        self.descripcion = descripcion
+        self.etapas = []
+        self.cancelado = threading.Event()
+        self._notificar = None
+
+    def agregarEtapa(self, mensaje, funcion, *args, enProceso=False):
+        """
+        Añade una etapa al trabajo.
+
+        Args:
+            mensaje (str): Texto que se muestra mientras se ejecuta la etapa.
+            funcion (callable): Función a ejecutar.
+            *args: Argumentos adicionales de la función.
+            enProceso (bool): Ejecutar la etapa en el proceso trabajador (abortable).
+
+        Returns:
+            Trabajo: El propio trabajo, para poder encadenar llamadas.
+        """
+        self.etapas.append((mensaje, funcion, args, enProceso))
+        return self
+
+    def notificarProgreso(self, fraccion, *_):
+        """
+        Informa del avance (0.0 - 1.0) de la etapa en curso. Pensada para pasarse
+        como callback de progreso a funciones largas que se ejecutan en un hilo;
+        si el trabajo se ha cancelado lanza TrabajoCancelado para interrumpirlas.
+        """
+        if self.cancelado.is_set():
+            raise TrabajoCancelado()
+        if self._notificar is not None:
+            self._notificar(float(fraccion))
+
+
+class _SenalesEjecutor(QObject):
+    """Señales del ejecutor (QRunnable no puede emitir señales por sí mismo)."""
+    etapa = pyqtSignal(int, str)
+    avance = pyqtSignal(float)
+    finalizado = pyqtSignal(str, object)
+
+
+class _EjecutorTrabajo(QRunnable):
+    """Ejecuta las etapas de un trabajo en el hilo del gestor."""
+    def __init__(self, trabajo, gestor):
+        super().__init__()
+        self.trabajo = trabajo
+        self.gestor = gestor
+        self.senales = _SenalesEjecutor()
+
+    def run(self):
+        resultado = None
+        self.trabajo._notificar = self.senales.avance.emit
+        try:
+            for i, (mensaje, funcion, args, enProceso) in enumerate(self.trabajo.etapas):
+                if self.trabajo.cancelado.is_set():
+                    raise TrabajoCancelado()
+                self.senales.etapa.emit(i, mensaje)
+                argumentos = args if i == 0 else (resultado, *args)
+                if enProceso:
+                    resultado = self.gestor._ejecutarEnProceso(self.trabajo, funcion, argumentos)
+                else:
+                    resultado = funcion(*argumentos)
+
+            if self.trabajo.cancelado.is_set():
+                raise TrabajoCancelado()
+            self.senales.finalizado.emit("exito", resultado)
+        except TrabajoCancelado:
+            self.senales.finalizado.emit("cancelado", None)
+        except Exception as e:
+            if self.trabajo.cancelado.is_set():
+                self.senales.finalizado.emit("cancelado", None)
+            else:
+                self.senales.finalizado.emit("fallo", e)
+
+
+class GestorTrabajos(QObject):
+    """
+    Cola de trabajos en segundo plano para no bloquear el bucle de eventos de Qt.
+
+    Los trabajos se ejecutan de uno en uno en orden de llegada; los que llegan
+    mientras otro está en marcha esperan en la cola. Las etapas pesadas (p.ej.
+    el ajuste del modelo) se ejecutan en un proceso trabajador que se mantiene
+    vivo entre trabajos y que se mata al cancelar, de modo que un ajuste largo
+    se puede abortar. Los callbacks se llaman siempre en el hilo de la interfaz.
+
+    Señales:
+        progreso(int, str): Porcentaje aproximado (por etapas) y mensaje de la etapa.
+        colaCambiada(int): Número de trabajos pendientes (sin contar el activo).
+        ocupado(bool): True al empezar a trabajar, False cuando la cola se vacía.
+    """
+    progreso = pyqtSignal(int, str)
+    colaCambiada = pyqtSignal(int)
+    ocupado = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pendientes = deque()
+        self.activo = None
+        self._ejecutor = None
+        self._etapaActual = (0, "")
+        self._pool = None
+        self._lockPool = threading.Lock()
+        # Un hilo propio por gestor: con el pool global (tantos hilos como
+        # núcleos) dos gestores podrían esperarse el uno al otro
+        self._hilos = QThreadPool(self)
+        self._hilos.setMaxThreadCount(1)
+
+    # ---------- API pública ----------
+
+    def encolar(self, trabajo, alTerminar=None, alFallar=None, alCancelar=None):
+        """
+        Añade un trabajo a la cola y lo lanza si no hay otro en marcha.
+
+        Args:
+            trabajo (Trabajo): Trabajo a ejecutar.
+            alTerminar (callable): f(resultado) con el resultado de la última etapa.
+            alFallar (callable): f(excepcion) si alguna etapa lanza un error.
+            alCancelar (callable): f() si el trabajo se cancela.
+        """
+        self.pendientes.append((trabajo, alTerminar, alFallar, alCancelar))
+        self.colaCambiada.emit(len(self.pendientes))
+        if self.activo is None:
+            self._lanzarSiguiente()
+
+    def cancelar(self):
+        """Aborta el trabajo activo y vacía la cola de pendientes."""
+        while self.pendientes:
+            _, _, _, alCancelar = self.pendientes.popleft()
+            if alCancelar:
+                alCancelar()
+        self.colaCambiada.emit(0)
+
+        if self.activo is not None:
+            self.activo[0].cancelado.set()
+            # Matar el proceso trabajador es la única forma de interrumpir un fit de sklearn
+            self._terminarPool()
+
+    def precalentar(self, modulos=()):
+        """
+        Arranca el proceso trabajador e importa en él los módulos indicados sin
+        esperar, para que el primer trabajo no pague el arranque del proceso.
+        """
+        from Backend.CargaDiferida import precargar
+        self._obtenerPool().apply_async(precargar, (list(modulos), False))
+
+    def estaOcupado(self):
+        return self.activo is not None
+
+    def cerrar(self):
+        """Cancela todo y libera el proceso trabajador (llamar al cerrar la ventana)."""
+        self.cancelar()
+        self._terminarPool()
+
+    # ---------- Ejecución ----------
+
+    def _lanzarSiguiente(self):
+        if not self.pendientes:
+            self.activo = None
+            self.ocupado.emit(False)
+            return
+
+        self.activo = self.pendientes.popleft()
+        self.colaCambiada.emit(len(self.pendientes))
+        self.ocupado.emit(True)
+
+        trabajo = self.activo[0]
+        self._ejecutor = _EjecutorTrabajo(trabajo, self)
+        self._ejecutor.setAutoDelete(False)
+        self._ejecutor.senales.etapa.connect(self._alCambiarEtapa)
+        self._ejecutor.senales.avance.connect(self._alAvanzarEtapa)
+        self._ejecutor.senales.finalizado.connect(self._alFinalizar)
+        self._hilos.start(self._ejecutor)
+
+    def _alCambiarEtapa(self, indice, mensaje):
+        trabajo = self.activo[0]
+        self._etapaActual = (indice, mensaje)
+        porcentaje = int(100 * indice / max(len(trabajo.etapas), 1))
+        self.progreso.emit(porcentaje, f"{trabajo.descripcion}: {mensaje}")
+
+    def _alAvanzarEtapa(self, fraccion):
+        if self.activo is None:
+            return
+        trabajo = self.activo[0]
+        indice, mensaje = self._etapaActual
+        porcentaje = int(100 * (indice + fraccion) / max(len(trabajo.etapas), 1))
+        self.progreso.emit(porcentaje, f"{trabajo.descripcion}: {mensaje} ({fraccion:.0%})")
+
+    def _alFinalizar(self, estado, valor):
+        trabajo, alTerminar, alFallar, alCancelar = self.activo
+        self._ejecutor = None
+        try:
+            if estado == "exito":
+                self.progreso.emit(100, f"{trabajo.descripcion}: completado")
+                if alTerminar:
+                    alTerminar(valor)
+            elif estado == "fallo":
+                if alFallar:
+                    alFallar(valor)
+            elif alCancelar:
+                alCancelar()
+        finally:
+            self._lanzarSiguiente()
+
+    def _obtenerPool(self):
+        """Devuelve el proceso trabajador, creándolo (con 'spawn') si no existe."""
+        with self._lockPool:
+            if self._pool is None:
+                # 'spawn' evita heredar el estado de Qt con fork y es lo que usa Windows
+                self._pool = multiprocessing.get_context("spawn").Pool(processes=1)
+            return self._pool
+
+    def _terminarPool(self):
+        with self._lockPool:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool = None
+
+    def _ejecutarEnProceso(self, trabajo, funcion, argumentos):
+        """Ejecuta una etapa en el proceso trabajador esperando de forma cancelable."""
+        resultado = self._obtenerPool().apply_async(funcion, argumentos)
+        while not resultado.ready():
+            if trabajo.cancelado.is_set():
+                raise TrabajoCancelado()
+            resultado.wait(0.1)
+        return resultado.get()
@@ -1,21 +1,47 @@
+import os
 import pandas as pd
 from pandas.api.types import is_numeric_dtype
 from PyQt6.QtWidgets import QMainWindow, QFileDialog, QInputDialog
+from PyQt6.QtCore import QTimer
 from PyQt6 import QtWidgets
 from UI.MainWindowUI import Ui_MainWindow
 import Backend.ImportacionDatos as impd
+import Backend.CacheDatos as cache
 import Backend.GestionDatos as gd
 import pickle as pk
 from UI.UtilidadesInterfaz import PandasModel as mp
 from UI.UtilidadesInterfaz import Mensajes as msj
 from UI.UtilidadesInterfaz import PandasModelConColor
+from UI.UtilidadesInterfaz import ajustarColumnasPorMuestra
 from UI.UtilidadesInterfaz import CheckableComboBox
+from UI.UtilidadesInterfaz import DialogoTablaModelos
+from UI.UtilidadesInterfaz import DialogoRegistroModelos
 from Backend import PreprocesamientoDatos as PrepDat
+from Backend.HistorialPreprocesado import HistorialPreprocesado
+from Backend.PerfilColumnas import perfilarDataFrame, heredarPerfil
+from Backend.TransformadoresPreprocesado import CodificadorBinario, PipelinePreprocesado
 from Backend import ProcesadoDatos as ProcDat
+from Backend import BusquedaHiperparametros as BusqHip
+from Backend import PrediccionLotes
+from Backend import RegistroModelos
+from Backend.DespachadorPrediccion import predecirAgrupado
 from Backend.PlotGraficas import plotCorrelacion, plotGrafica, limpiarGrafica
+from Backend.PlotGraficas import construirFiguraGrafica, construirFiguraCorrelacion, mostrarFigura, puntosParaPlaceholder
+from Backend.PlotGraficas import modulosGraficas, modulosGraficasQt, prepararVisores
+from Backend.SuperficieModelo import invalidarCacheSuperficie
+from Backend.CargaDiferida import precargar
+from UI.GestorTrabajos import GestorTrabajos, Trabajo
 
 #Globales
 mensajeDefectoCmb = "--- Selecciona las columnas de Salida ---"
+# Archivos mayores que este tamaño se cargan por bloques en segundo plano
+umbralCargaPorBloquesMB = 50
+# Presupuesto de memoria para la carga por bloques (se trunca al superarlo)
+limiteMemoriaCargaMB = 4096
+# Espera tras mostrar la ventana antes de cargar QtWebEngine (bloquea el hilo principal un momento)
+retardoPrecargaQtMs = 1500
+# Entrada del combo de modelos que lanza la comparativa de todos los compatibles
+opcionTodosLosModelos = "Comparar todos los modelos compatibles"
 
 
 
@@ -27,8 +53,8 @@ class MainWindowCtrl(QMainWindow):
     preprocesamiento y división de datos.
     
     OPTIMIZACIONES IMPLEMENTADAS:
-    - Uso de PandasModelConColor optimizado con caché precalculado
-    - Acceso directo a arrays NumPy para mejor rendimiento
+    - Uso de PandasModelConColor virtualizado (formatea solo las filas visibles)
+    - Ancho de columnas calculado sobre una muestra de filas
     - Reducción de operaciones repetitivas en renderizado de tablas
     """
     def __init__(self):
@@ -42,6 +68,12 @@ class MainWindowCtrl(QMainWindow):
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
         self.msj = msj
+        # Cola de trabajos en segundo plano (entrenamientos)
+        self.gestorTrabajos = GestorTrabajos(self)
+        # Cola aparte para el perfil de columnas: no retrasa los entrenamientos
+        # ni se aborta con "Cancelar"
+        self.gestorPerfil = GestorTrabajos(self)
+        self.precargaLanzada = False
         # Configuración inicial
         self.resetearTodo()
         self.configurarInterfaz()
@@ -72,7 +104,9 @@ class MainWindowCtrl(QMainWindow):
         """Convierte a todas las variables en None"""
         # DataFrames
         self._df = None
+        self.cargaEnCurso = None
         self.dfProcesado = None
+        self.historialPreprocesado = None
         self.dataFrameTest = None
         self.dataFrameTrain = None
         self.tamDfProc = None
@@ -87,6 +121,7 @@ class MainWindowCtrl(QMainWindow):
 
         #Modelo
         self.modelo=None
+        self.preprocesadoModelo=None
         self.descripcionModelo=None
 
         #Metricas
@@ -129,7 +164,7 @@ class MainWindowCtrl(QMainWindow):
         MODELOS_BINARIOS = ["Regresión Logística Binaria"]
 
         # 2. Detección de estado
-        esBinario = self.dfProcesado[self.columnaSalida].nunique() == 2
+        esBinario = perfilarDataFrame(self.dfProcesado, [self.columnaSalida])[self.columnaSalida].esBinaria
         listaModelos = []
 
         # 3. Lógica de Decisión
@@ -163,6 +198,8 @@ class MainWindowCtrl(QMainWindow):
 
         # 4. Carga final
         self.ui.cmbModelos.addItems(listaModelos)
+        if len(listaModelos) > 1:
+            self.ui.cmbModelos.addItem(opcionTodosLosModelos)
 
     def resetearPaginaPreprocesado(self):
         """Resetea los elementos de la página 1"""
@@ -172,12 +209,16 @@ class MainWindowCtrl(QMainWindow):
         self.ui.cmbSalida.hide()
         self.ui.cmbOpcionesPreprocesado.hide()
         self.ui.botonAplicarPreprocesado.hide()
+        self.btnDeshacerPreprocesado.hide()
+        self.btnRehacerPreprocesado.hide()
         self.ui.sliderProporcionTest.hide()
         self.ui.botonDividirTest.hide()
         self.ui.lblDatosDivision.hide()
         self.ui.lblDivision.hide()
         self.ui.numeroSliderTest.hide()
         self.ui.cmbModelos.hide()
+        self.spinPliegues.hide()
+        self.btnBuscarHiperparametros.hide()
         self.ui.lblTipoModelo.hide()
     
 
@@ -195,6 +236,34 @@ class MainWindowCtrl(QMainWindow):
             layout.replaceWidget(original_combo, self.checkable_combo_entrada)
         original_combo.deleteLater() # Eliminar el original
         self.ui.cmbEntrada = self.checkable_combo_entrada # Asignar el nuevo a la UI
+        #Selector de pliegues de validación cruzada, junto al combo de modelos (0 = sin validación cruzada)
+        self.spinPliegues = QtWidgets.QSpinBox(parent=self.ui.tabPrep)
+        self.spinPliegues.setRange(0, 20)
+        self.spinPliegues.setSpecialValueText("Sin validación cruzada")
+        self.spinPliegues.setPrefix("Pliegues CV: ")
+        self.spinPliegues.setToolTip("Número de pliegues de la validación cruzada (0 para desactivarla)")
+        self.ui.conjuntoDatosGrafica.insertWidget(self.ui.conjuntoDatosGrafica.indexOf(self.ui.cmbModelos) + 1, self.spinPliegues)
+        self.spinPliegues.hide()
+        #Botón para buscar los hiperparámetros del modelo elegido
+        self.btnBuscarHiperparametros = QtWidgets.QPushButton("Optimizar hiperparámetros", parent=self.ui.tabPrep)
+        self.ui.conjuntoDatosGrafica.insertWidget(self.ui.conjuntoDatosGrafica.indexOf(self.spinPliegues) + 1, self.btnBuscarHiperparametros)
+        self.btnBuscarHiperparametros.hide()
+        #Botones para deshacer/rehacer pasos del preprocesado, junto a "Aplicar Preprocesado"
+        self.btnDeshacerPreprocesado = QtWidgets.QPushButton("Deshacer", parent=self.ui.tabPrep)
+        self.btnRehacerPreprocesado = QtWidgets.QPushButton("Rehacer", parent=self.ui.tabPrep)
+        indiceAplicar = self.ui.horizontalBotonPreprocesado.indexOf(self.ui.botonAplicarPreprocesado)
+        self.ui.horizontalBotonPreprocesado.insertWidget(indiceAplicar, self.btnDeshacerPreprocesado)
+        self.ui.horizontalBotonPreprocesado.insertWidget(indiceAplicar + 1, self.btnRehacerPreprocesado)
+        #Botón para predecir un archivo completo con el modelo actual o uno guardado
+        self.btnPredecirArchivo = QtWidgets.QPushButton("Predecir Archivo", parent=self.ui.tabVis)
+        self.ui.horizontalLayout_4.insertWidget(self.ui.horizontalLayout_4.indexOf(self.ui.btnCargarModelo) + 1, self.btnPredecirArchivo)
+        #Botón para explorar el registro de modelos guardados
+        self.btnRegistroModelos = QtWidgets.QPushButton("Modelos Guardados", parent=self.ui.tabVis)
+        self.ui.horizontalLayout_4.insertWidget(self.ui.horizontalLayout_4.indexOf(self.btnPredecirArchivo) + 1, self.btnRegistroModelos)
+        #Boton para cancelar trabajos en segundo plano, junto a la barra de progreso
+        self.btnCancelarTrabajo = QtWidgets.QPushButton("Cancelar", parent=self.ui.tabVis)
+        self.ui.zonaCreadora.addWidget(self.btnCancelarTrabajo)
+        self.btnCancelarTrabajo.hide()
         # Ocultar botones inicialmente
         #el de las columnas
         self.ui.conjuntoTabs.setCurrentIndex(0)
@@ -209,6 +278,8 @@ class MainWindowCtrl(QMainWindow):
         self.ui.cmbOpcionesPreprocesado.hide()
         #el del preprocesado
         self.ui.botonAplicarPreprocesado.hide()
+        self.btnDeshacerPreprocesado.hide()
+        self.btnRehacerPreprocesado.hide()
         #el texto de al lado del slider
         self.ui.lblDivision.hide()
         #El slider
@@ -231,6 +302,8 @@ class MainWindowCtrl(QMainWindow):
         self.ui.labelPrediccion.hide()
         self.ui.spinBoxEntrada.hide()
         self.ui.cmbModelos.hide()
+        self.spinPliegues.hide()
+        self.btnBuscarHiperparametros.hide()
         self.ui.lblTipoModelo.hide()
 
 
@@ -240,10 +313,14 @@ class MainWindowCtrl(QMainWindow):
         self.ui.btnInsertarArchivo.clicked.connect(self.abrirExplorador)
         self.ui.botonDividirTest.clicked.connect(self.pipelineModelo)
         self.ui.botonAplicarPreprocesado.clicked.connect(self.aplicarPreprocesado)
+        self.btnDeshacerPreprocesado.clicked.connect(self.deshacerPreprocesado)
+        self.btnRehacerPreprocesado.clicked.connect(self.rehacerPreprocesado)
         self.ui.sliderProporcionTest.valueChanged.connect(self.actualizarLblValSlider)
         self.ui.numeroSliderTest.valueChanged.connect(self._actualizarPorcentajeSpin)
         #cargar modelo
         self.ui.btnCargarModelo.clicked.connect(self.cargarModelo)
+        self.btnPredecirArchivo.clicked.connect(self.predecirArchivo)
+        self.btnRegistroModelos.clicked.connect(self.explorarRegistroModelos)
         self.ui.btnGuardarModelo.clicked.connect(self.seleccionarRutaModelo)
 
        #actualizar status bar
@@ -252,6 +329,13 @@ class MainWindowCtrl(QMainWindow):
         #Poner valores de predicción
         self.ui.btnAplicarPrediccion.clicked.connect(self.pipelinePrediccion)
 
+        #Trabajos en segundo plano
+        self.btnCancelarTrabajo.clicked.connect(self.cancelarTrabajos)
+        self.btnBuscarHiperparametros.clicked.connect(self.buscarHiperparametrosModelo)
+        self.gestorTrabajos.progreso.connect(self.actualizarProgresoTrabajo)
+        self.gestorTrabajos.ocupado.connect(self.actualizarEstadoTrabajos)
+        self.gestorTrabajos.colaCambiada.connect(self.actualizarColaTrabajos)
+
 
     def abrirExplorador(self):
         """
@@ -277,14 +361,13 @@ class MainWindowCtrl(QMainWindow):
             self.ui.lineEditRutaArchivo.setText(ruta)
             try:
                 self.resetearPaginaPreprocesado()
-                df = impd.cargarDatos(ruta)
-                self.df = df
-                self.cargarTabla(df)
-                self.tamDf = len(df)
-                # Mostrar botón de seleccionar columnas
-                self.ui.btnConfirmar.show()
-                self.ui.cmbEntrada.show()
-                self.ui.cmbSalida.show()
+                self.cancelarCargaEnCurso()
+                esGrande = os.path.getsize(ruta) > umbralCargaPorBloquesMB * 1024 * 1024
+                if esGrande and not cache.estaEnCache(ruta, variante=impd.varianteCache(True)):
+                    self.iniciarCargaPorBloques(ruta)
+                    return
+                df = impd.cargarDatos(ruta, usarCache=True, compacto=True)
+                self.mostrarDatosCargados(df)
             except ValueError as e:
                 msj.crearAdvertencia(self, "Error inesperado",
                     "Se ha producido un error inesperado al cargar el archivo")
@@ -296,10 +379,85 @@ class MainWindowCtrl(QMainWindow):
                 "Se debe seleccionar un archivo válido")
 
 
+    def mostrarDatosCargados(self, df):
+        """Asigna el DataFrame cargado, lo muestra y habilita la selección de columnas."""
+        self.df = df
+        self.cargarTabla(df)
+        self.tamDf = len(df)
+        # Perfil de todas las columnas en segundo plano: las comprobaciones de
+        # nulos y de salida binaria posteriores lo leen de la caché
+        self.gestorPerfil.cancelar()
+        trabajo = Trabajo("Perfil de columnas")
+        trabajo.agregarEtapa("perfilando columnas", perfilarDataFrame, df)
+        self.gestorPerfil.encolar(trabajo)
+        # Mostrar botón de seleccionar columnas
+        self.ui.btnConfirmar.show()
+        self.ui.cmbEntrada.show()
+        self.ui.cmbSalida.show()
+
+        informe = df.attrs.get("informeCompactacion")
+        if informe:
+            self.statusBar().showMessage(
+                f"{len(df)} filas cargadas | Memoria: {informe['memoriaAntesMB']:.1f} MB → "
+                f"{informe['memoriaDespuesMB']:.1f} MB (-{informe['ahorroPorcentaje']:.0f}%)")
+
+
+    def iniciarCargaPorBloques(self, ruta):
+        """
+        Lanza la carga por bloques de un archivo grande.
+        Muestra el primer bloque como previsualización y consulta periódicamente
+        el progreso del hilo de fondo sin bloquear la interfaz.
+        """
+        self.cargaEnCurso = impd.cargarDatos(ruta, porBloques=True, limiteMemoriaMB=limiteMemoriaCargaMB, usarCache=True, compacto=True)
+        self.cargarTablaGenerico(self.cargaEnCurso.previsualizacion)
+        self.statusBar().showMessage("Cargando archivo por bloques... 0%")
+
+        self.temporizadorCarga = QTimer(self)
+        self.temporizadorCarga.timeout.connect(self.comprobarCargaPorBloques)
+        self.temporizadorCarga.start(100)
+
+
+    def comprobarCargaPorBloques(self):
+        """Actualiza el progreso de la carga por bloques y muestra los datos al terminar."""
+        carga = self.cargaEnCurso
+        if carga is None:
+            self.temporizadorCarga.stop()
+            return
+
+        if not carga.terminado():
+            self.statusBar().showMessage(
+                f"Cargando archivo por bloques... {carga.progreso * 100:.0f}% ({carga.filasLeidas} filas)")
+            return
+
+        self.temporizadorCarga.stop()
+        self.cargaEnCurso = None
+        try:
+            df = carga.resultado()
+        except ValueError:
+            msj.crearAdvertencia(self, "Error inesperado",
+                "Se ha producido un error inesperado al cargar el archivo")
+            return
+
+        self.statusBar().showMessage(f"Archivo cargado: {len(df)} filas")
+        self.mostrarDatosCargados(df)
+        if carga.truncado:
+            msj.crearAdvertencia(self, "Carga parcial",
+                f"El archivo supera el límite de memoria ({limiteMemoriaCargaMB} MB).\n"
+                f"Solo se han cargado las primeras {len(df)} filas.")
+
+
+    def cancelarCargaEnCurso(self):
+        """Detiene una carga por bloques anterior si sigue en marcha."""
+        if self.cargaEnCurso is not None:
+            self.cargaEnCurso.cancelar()
+            self.cargaEnCurso = None
+            self.temporizadorCarga.stop()
+
+
     def cargarTablaGenerico(self, df):
         model = mp(df)
         self.ui.tableViewDataFrame.setModel(model)
-        self.ui.tableViewDataFrame.resizeColumnsToContents()
+        ajustarColumnasPorMuestra(self.ui.tableViewDataFrame)
         
 
     def cargarTabla(self, df):
@@ -322,7 +480,7 @@ class MainWindowCtrl(QMainWindow):
         try:
             model = mp(df)
             self.ui.tableViewDataFrame.setModel(model)
-            self.ui.tableViewDataFrame.resizeColumnsToContents()
+            ajustarColumnasPorMuestra(self.ui.tableViewDataFrame)
             self.columnas =[mensajeDefectoCmb]
             self.columnas.extend(gd.cargaColumnas(df,False))
             self.ui.cmbEntrada.clear()
@@ -358,28 +516,39 @@ class MainWindowCtrl(QMainWindow):
             self.marcarColumnasSeleccionadas(self.df)
             self.ui.lblTipoModelo.hide()
             #Comprueba si existe algun nulo entre las columnas seleccionadas
-            if((lambda df, conjuntoAnalisis: any(df[c].isna().any() for c in conjuntoAnalisis))(self.df, conjuntoAnalisis)):
+            if any(perfil.tieneNulos for perfil in perfilarDataFrame(self.df, conjuntoAnalisis).values()):
                 #Ponemos que se vean despues de seleccionar
                 self.ui.botonDividirTest.hide()
                 self.ui.numeroSliderTest.hide()
                 self.ui.sliderProporcionTest.hide()
                 self.ui.lblDivision.hide()
                 self.ui.cmbModelos.hide()
+                self.spinPliegues.hide()
+                self.btnBuscarHiperparametros.hide()
                 self.ui.lblDatosDivision.hide()
                 self.ui.cmbOpcionesPreprocesado.show()
                 self.ui.botonAplicarPreprocesado.show()
+                # Historial nuevo para esta selección (no copia los datos)
+                self.historialPreprocesado = HistorialPreprocesado(self.df)
+                self._actualizarBotonesHistorial()
             else:
                 self.ui.botonDividirTest.show()
                 self.ui.numeroSliderTest.show()
                 self.ui.sliderProporcionTest.show()
                 self.ui.lblDivision.show()
                 self.ui.cmbModelos.show()
+                self.spinPliegues.show()
+                self.btnBuscarHiperparametros.show()
                 self.ui.lblDatosDivision.show()
                 self.ui.cmbOpcionesPreprocesado.hide()
                 self.ui.botonAplicarPreprocesado.hide()
+                self.historialPreprocesado = None
+                self.btnDeshacerPreprocesado.hide()
+                self.btnRehacerPreprocesado.hide()
                 msj.crearInformacion(self,"Informacion", "No se han encontrado nulos en tus columnas seleccionadas, puedes proceder con el data split")
                 
                 self.dfProcesado = self.df[conjuntoAnalisis]
+                heredarPerfil(self.df, self.dfProcesado)
                 self.cargarTablaGenerico(self.dfProcesado)
                 self.marcarColumnasSeleccionadas(self.dfProcesado)
                 self.tamDf = len(self.df)
@@ -397,7 +566,7 @@ class MainWindowCtrl(QMainWindow):
     def marcarColumnasSeleccionadas(self, dfEntr):
         """
         Marca visualmente las columnas seleccionadas en la tabla.
-        OPTIMIZADO: Usa PandasModelConColor con caché precalculado para mejor rendimiento.
+        OPTIMIZADO: Usa PandasModelConColor virtualizado, que solo formatea las filas visibles.
         
         Args:
             dfEntr: DataFrame a mostrar con las columnas marcadas
@@ -421,7 +590,7 @@ class MainWindowCtrl(QMainWindow):
         )
         
         self.ui.tableViewDataFrame.setModel(model)
-        self.ui.tableViewDataFrame.resizeColumnsToContents()
+        ajustarColumnasPorMuestra(self.ui.tableViewDataFrame)
 
         # Mostrar todas las columnas de entrada
         if isinstance(columnas_entrada, list):
@@ -464,18 +633,15 @@ class MainWindowCtrl(QMainWindow):
         if opcion == "Rellenar con un valor constante":
             cte ,_= QInputDialog.getText(self, "Valor constante", "Introduce el valor constante para rellenar NaN:")
         
-        try:  
-            self.dfProcesado, mensaje, columnasSeleccionadas = PrepDat.aplicarPreprocesadoCalcular(
-                                                                            columnasEntrada = self.columnasEntrada,
-                                                                            columnaSalida=self.columnaSalida,
-                                                                            df=self.df,
-                                                                            opcion=opcion,
-                                                                            constante= cte)
+        try:
+            # Cada paso se encadena sobre el anterior; solo se copian las columnas que cambian
+            if self.historialPreprocesado is None or self.historialPreprocesado.base is not self.df:
+                self.historialPreprocesado = HistorialPreprocesado(self.df)
+            mensaje = self.historialPreprocesado.aplicar(opcion, self.columnasEntrada, self.columnaSalida, cte)
+            columnasSeleccionadas = self.columnasEntrada + [self.columnaSalida]
 
             msj.crearInformacion(self, "Preprocesado Aplicado", mensaje)
-            self.cargarTablaGenerico(self.dfProcesado)
-            self.marcarColumnasSeleccionadas(self.dfProcesado)
-            self.tamDfProc = len(self.dfProcesado)
+            quedanNan = self._mostrarEstadoPreprocesado()
         
             # Mostrar estadísticas del procesamiento
             mensaje = f"Procesamiento completado:\n"
@@ -483,20 +649,7 @@ class MainWindowCtrl(QMainWindow):
             mensaje += f"NaN en columnas seleccionadas: {self.df[columnasSeleccionadas].isna().sum().sum()} → {self.dfProcesado[columnasSeleccionadas].isna().sum().sum()}"
             msj.crearInformacion(self, "Éxito", mensaje)
 
-            # Verificar si hay NaN en las columnas de entrada y salida
-            if not self.dfProcesado[columnasSeleccionadas].isnull().values.any():
-                # Mostrar botón de dividir datos
-                self.ui.botonDividirTest.show()
-                self.ui.lblDivision.show()
-                self.ui.numeroSliderTest.show()
-                self.ui.sliderProporcionTest.show()
-                self.ui.lblDatosDivision.show()
-                self.ui.cmbModelos.show()
-                if is_numeric_dtype(self.dfProcesado[self.columnaSalida]):
-                    self.cargarComboModelos(False)
-                else:
-                    self.cargarComboModelos(True)
-            else:
+            if quedanNan:
                 msj.crearAdvertencia(self, "NaN restantes",
                     "Aún quedan valores NaN en las columnas seleccionadas.\n"
                     "Debe aplicar otro método de preprocesado.")
@@ -505,6 +658,56 @@ class MainWindowCtrl(QMainWindow):
             msj.crearAdvertencia(self, "Error", f"Error al procesar: {str(e)}")
 
 
+    def deshacerPreprocesado(self):
+        """Vuelve al estado anterior al último paso de preprocesado."""
+        if self.historialPreprocesado is None:
+            return
+        paso = self.historialPreprocesado.deshacer()
+        if paso is not None:
+            self._mostrarEstadoPreprocesado()
+            self.statusBar().showMessage(f"Deshecho: {paso.opcion}", 5000)
+
+
+    def rehacerPreprocesado(self):
+        """Vuelve a aplicar el último paso deshecho (sin recalcularlo)."""
+        if self.historialPreprocesado is None:
+            return
+        paso = self.historialPreprocesado.rehacer()
+        if paso is not None:
+            self._mostrarEstadoPreprocesado()
+            self.statusBar().showMessage(f"Rehecho: {paso.opcion}", 5000)
+
+
+    def _actualizarBotonesHistorial(self):
+        historial = self.historialPreprocesado
+        self.btnDeshacerPreprocesado.setVisible(historial is not None)
+        self.btnRehacerPreprocesado.setVisible(historial is not None)
+        self.btnDeshacerPreprocesado.setEnabled(historial is not None and historial.puedeDeshacer)
+        self.btnRehacerPreprocesado.setEnabled(historial is not None and historial.puedeRehacer)
+
+
+    def _mostrarEstadoPreprocesado(self):
+        """
+        Muestra el estado actual del historial: dfProcesado, tabla, botones y,
+        si ya no quedan NaN, los controles del datasplit. Devuelve si quedan NaN.
+        """
+        columnasSeleccionadas = self.columnasEntrada + [self.columnaSalida]
+        self.dfProcesado = self.historialPreprocesado.dataFrame(columnasSeleccionadas)
+        self.cargarTablaGenerico(self.dfProcesado)
+        self.marcarColumnasSeleccionadas(self.dfProcesado)
+        self.tamDfProc = len(self.dfProcesado)
+        self._actualizarBotonesHistorial()
+
+        # Una pasada sobre las columnas seleccionadas; cargarComboModelos reutiliza el perfil de la salida
+        quedanNan = any(perfil.tieneNulos for perfil in perfilarDataFrame(self.dfProcesado).values())
+        for widget in (self.ui.botonDividirTest, self.ui.lblDivision, self.ui.numeroSliderTest, self.ui.sliderProporcionTest,
+                       self.ui.lblDatosDivision, self.ui.cmbModelos, self.spinPliegues, self.btnBuscarHiperparametros):
+            widget.setVisible(not quedanNan)
+        if not quedanNan:
+            self.cargarComboModelos(not is_numeric_dtype(self.dfProcesado[self.columnaSalida]))
+        return quedanNan
+
+
     # ==================== MÉTODOS DEL DATASPLIT ====================
     def actualizarLblValSlider(self):   #TESTINFO: NO TESTEAR ESTE
         value = self.ui.sliderProporcionTest.value()
@@ -595,6 +798,7 @@ class MainWindowCtrl(QMainWindow):
                 return
 
             parametros["dicColumnaSalida"] = self.dicColumnaSalida
+            parametros["preprocesado"] = self.preprocesadoModelo
             
             # Crear diccionario del modelo
             dict_modelo = gd.crearDiccionarioModelo(**parametros)
@@ -605,7 +809,12 @@ class MainWindowCtrl(QMainWindow):
                 if error:
                     msj.crearAdvertencia(self, "Error al guardar el modelo", error)
                 else:
-                    msj.crearInformacion(self, "Éxito", "El modelo se ha guardado correctamente.")
+                    errorRegistro = self._registrarModelo(ruta)
+                    if errorRegistro:
+                        msj.crearAdvertencia(self, "Modelo no registrado",
+                            f"El modelo se ha guardado correctamente, pero no se ha podido añadir al registro de modelos: {errorRegistro}")
+                    else:
+                        msj.crearInformacion(self, "Éxito", "El modelo se ha guardado correctamente.")
             except Exception as e:
                 msj.crearAdvertencia(self, "Error no previsto al guardar el modelo", str(e))
         else:
@@ -613,13 +822,24 @@ class MainWindowCtrl(QMainWindow):
 
     def pipelineModelo(self):
         if(self.ui.cmbModelos.currentText() == "---Seleccione un Entrenamiento---"): return
-        
+        if self.ui.cmbModelos.currentText() == opcionTodosLosModelos:
+            self.pipelineTodosLosModelos()
+            return
+        self.entrenarModelo(self.ui.cmbModelos.currentText())
+
+
+    def entrenarModelo(self, nombre_modelo, busqueda=None):
+        """
+        Divide los datos y encola el entrenamiento del modelo.
+        Si se pasa el resultado de una búsqueda de hiperparámetros se entrena con los mejores encontrados.
+        """
         self.procesoDataSplit()
         # CAMBIO REALIZADO AQUÍ: Se eliminó la transición y se usa setCurrentIndex
         self.ui.conjuntoTabs.setCurrentIndex(1)
         
         self.columnasEntradaGraficada = self.columnasEntrada
         self.columnaSalidaGraficada = self.columnaSalida
+        self.preprocesadoModelo = self._ajustarPreprocesadoModelo()
 
         if hasattr(self, 'datosEntrada'): self.datosEntrada.clear()
 
@@ -627,55 +847,269 @@ class MainWindowCtrl(QMainWindow):
         self.statusBar().showMessage(f"Entrada: {entradas_str} | Salida: {self.columnaSalidaGraficada}")
         limpiarGrafica(self.ui.placeholderGrafica, self.ui.placeholderCorrelacion)
 
-        try: 
-            nombre_modelo = self.ui.cmbModelos.currentText() 
+        estimador = BusqHip.crearMejorEstimador(busqueda) if busqueda else None
+        parametros = {nombre_modelo: busqueda["mejoresParametros"]} if busqueda else None
+
+        # El ajuste (y sus métricas) va a un proceso aparte para poder abortarlo;
+        # las figuras se construyen en un hilo y se muestran al volver a la interfaz.
+        # La línea/superficie del modelo anterior ya no se va a volver a pintar.
+        invalidarCacheSuperficie()
+        trabajo = Trabajo(f"Entrenamiento {nombre_modelo}")
+        trabajo.agregarEtapa("ajustando modelo y calculando métricas", ProcDat.crearAjustarModelo,
+                             self.dataFrameTrain, self.dataFrameTest, self.columnasEntradaGraficada,
+                             self.columnaSalidaGraficada, nombre_modelo, estimador, enProceso=True)
+        trabajo.agregarEtapa("construyendo gráficas", self._construirFigurasEntrenamiento,
+                             list(self.columnasEntradaGraficada), self.columnaSalidaGraficada, self.dicColumnaSalida,
+                             puntosParaPlaceholder(self.ui.placeholderGrafica),
+                             puntosParaPlaceholder(self.ui.placeholderCorrelacion))
+        self.gestorTrabajos.encolar(trabajo, alTerminar=self._finalizarEntrenamiento,
+                                    alFallar=self._errorEntrenamiento)
+        self.encolarValidacionCruzada([nombre_modelo], self._mostrarValidacionCruzada, parametros)
+
+
+    def _ajustarPreprocesadoModelo(self):
+        """
+        Preprocesado con el que se entrena (rellenos del historial y codificación
+        de la salida) como pipeline ajustado, para guardarlo con el modelo.
+        """
+        pasos = []
+        if self.historialPreprocesado is not None and self.historialPreprocesado.base is self.df:
+            pasos += self.historialPreprocesado.pipeline().pasos
+        if self.dicColumnaSalida:
+            pasos.append(CodificadorBinario(self.columnaSalida, self.dicColumnaSalida))
+        return PipelinePreprocesado(pasos) if pasos else None
 
-            self.xTrain, self.yTrain, self.xTest, self.yTest, \
-            self.modelo, self.yTrainPred, self.yTestPred, \
-            self.r2Train, self.r2Test, self.ecmTrain, self.ecmTest, \
-            self.accTrain, self.accTest, esGraficable = ProcDat.crearAjustarModelo(
-                self.dataFrameTrain, self.dataFrameTest, self.columnasEntradaGraficada, self.columnaSalidaGraficada, nombre_modelo
-            )       
-            
-            if esGraficable:
-                plotGrafica(self.xTrain, self.yTrain, self.xTest, self.yTest, self.columnasEntradaGraficada, self.columnaSalidaGraficada, self.dicColumnaSalida, self.modelo, self.ui.placeholderGrafica)
-                plotCorrelacion(self, self.modelo, self.xTest, self.yTest, self.columnaSalidaGraficada, self.dicColumnaSalida, self.ui.placeholderCorrelacion)
 
-            self.ui.placeholderCorrelacion.show()
+    def pipelineTodosLosModelos(self):
+        """Entrena en paralelo todos los modelos del combo sobre el mismo split y muestra la comparativa."""
+        self.procesoDataSplit()
+        if self.dataFrameTrain is None: return
+
+        nombresModelos = [self.ui.cmbModelos.itemText(i) for i in range(1, self.ui.cmbModelos.count())
+                          if self.ui.cmbModelos.itemText(i) != opcionTodosLosModelos]
+
+        # Esta etapa va en un hilo y no en el proceso trabajador: joblib reparte los
+        # modelos entre sus propios procesos y no puede hacerlo desde un proceso hijo.
+        trabajo = Trabajo("Comparativa de modelos")
+        trabajo.agregarEtapa(f"entrenando {len(nombresModelos)} modelos en paralelo", ProcDat.entrenarTodosLosModelos,
+                             self.dataFrameTrain, self.dataFrameTest, list(self.columnasEntrada),
+                             self.columnaSalida, nombresModelos)
+        # Con pliegues, la media ± desviación de la validación cruzada se añade a la misma tabla
+        nPliegues = self.spinPliegues.value()
+        if nPliegues >= 2:
+            trabajo.agregarEtapa(f"validación cruzada ({nPliegues} pliegues)", ProcDat.anadirValidacionCruzada,
+                                 self.dfProcesado, list(self.columnasEntrada), self.columnaSalida, nPliegues)
+        self.gestorTrabajos.encolar(trabajo, alTerminar=self._mostrarTablaModelos,
+                                    alFallar=self._errorEntrenamiento)
+
+
+    def encolarValidacionCruzada(self, nombresModelos, alTerminar, parametrosModelos=None):
+        """Encola la validación cruzada de los modelos si el usuario ha pedido pliegues."""
+        nPliegues = self.spinPliegues.value()
+        if nPliegues < 2: return
+
+        # Igual que la comparativa: joblib reparte los pliegues desde un hilo
+        trabajo = Trabajo("Validación cruzada")
+        trabajo.agregarEtapa(f"evaluando {nPliegues} pliegues en paralelo", ProcDat.validacionCruzada,
+                             self.dfProcesado, list(self.columnasEntrada), self.columnaSalida,
+                             nombresModelos, nPliegues, 1, ProcDat.semillaPorDefecto, -1, parametrosModelos)
+        self.gestorTrabajos.encolar(trabajo, alTerminar=alTerminar, alFallar=self._errorEntrenamiento)
+
+
+    def _mostrarValidacionCruzada(self, resumen):
+        """Añade a las métricas del modelo la media ± desviación de la validación cruzada."""
+        fila = resumen.iloc[0]
+        texto = f"\n\nValidación cruzada ({fila['Pliegues']} pliegues):"
+        for metrica in ["R²", "ECM", "Accuracy"]:
+            if not pd.isna(fila[f"{metrica} media"]):
+                texto += f"\n{metrica}: {fila[f'{metrica} media']:.4f} ± {fila[f'{metrica} desv']:.4f}"
+        self.ui.labelR2Test.setText(self.ui.labelR2Test.text() + texto)
+
+
+    def buscarHiperparametrosModelo(self):
+        """Busca en segundo plano los mejores hiperparámetros del modelo elegido y lo entrena con ellos."""
+        nombre_modelo = self.ui.cmbModelos.currentText()
+        if nombre_modelo not in ProcDat.configuracionModelos:
+            msj.crearAdvertencia(self, "Búsqueda de hiperparámetros", "Seleccione primero un modelo concreto.")
+            return
 
-            def fmt(v): return f"{v:.4f}" if isinstance(v, (int, float)) else "N/A"
+        estrategia, ok = QInputDialog.getItem(self, "Búsqueda de hiperparámetros", "Estrategia de búsqueda:",
+                                              BusqHip.estrategiasBusqueda, 2, False)
+        if not ok: return
 
-            textoMetricas = ""
-            if self.r2Train is not None:
-                textoMetricas += f"R² Train: {fmt(self.r2Train)}\nR² Test: {fmt(self.r2Test)}\n"
-                textoMetricas += f"ECM Train: {fmt(self.ecmTrain)}\nECM Test: {fmt(self.ecmTest)}"
-            
-            if self.accTrain is not None:
-                if textoMetricas: textoMetricas += "\n\n"
-                textoMetricas += f"Accuracy Train: {fmt(self.accTrain)}\nAccuracy Test: {fmt(self.accTest)}"
+        self.procesoDataSplit()
+        if self.dataFrameTrain is None: return
+
+        # La búsqueda solo usa el conjunto de entrenamiento; joblib reparte los candidatos desde un hilo
+        nPliegues = max(self.spinPliegues.value(), 3)
+        trabajo = Trabajo(f"Búsqueda de hiperparámetros {nombre_modelo}")
+        trabajo.agregarEtapa(f"evaluando candidatos ({estrategia}, {nPliegues} pliegues)", BusqHip.buscarHiperparametros,
+                             self.dataFrameTrain, list(self.columnasEntrada), self.columnaSalida,
+                             nombre_modelo, estrategia, 20, nPliegues)
+        self.gestorTrabajos.encolar(trabajo, alTerminar=self._finalizarBusquedaHiperparametros,
+                                    alFallar=self._errorEntrenamiento)
+
+
+    def _finalizarBusquedaHiperparametros(self, busqueda):
+        """Informa de los mejores hiperparámetros y entrena el modelo con ellos."""
+        mensaje = (f"Mejores hiperparámetros: {BusqHip.textoParametros(busqueda['mejoresParametros'])}\n"
+                   f"{busqueda['metrica']} medio (validación cruzada): {busqueda['mejorPuntuacion']:.4f}\n"
+                   f"Evaluaciones (candidato y ronda): {len(busqueda['resultados'])} en {busqueda['segundos']:.1f} s")
+        if busqueda["presupuestoAgotado"]:
+            mensaje += "\n\nSe agotó el tiempo de búsqueda: se usa el mejor candidato encontrado."
+        msj.crearInformacion(self, "Búsqueda de hiperparámetros", mensaje)
+        self.entrenarModelo(busqueda["nombreModelo"], busqueda)
+
+
+    def _mostrarTablaModelos(self, tabla):
+        """Muestra la tabla comparativa y, si el usuario elige un modelo, lo entrena normalmente."""
+        dialogo = DialogoTablaModelos(tabla, self)
+        if dialogo.exec() and dialogo.modeloSeleccionado:
+            self.ui.cmbModelos.setCurrentText(dialogo.modeloSeleccionado)
+            self.pipelineModelo()
+
+
+    @staticmethod
+    def _construirFigurasEntrenamiento(resultado, columnasEntrada, columnaSalida, dicColumnaSalida,
+                                       maxPuntosGrafica, maxPuntosCorrelacion):
+        """
+        Etapa de fondo: construye las figuras del modelo recién ajustado (sin tocar widgets).
+        Los presupuestos de puntos se calculan antes, en el hilo de la interfaz.
+        """
+        xTrain, yTrain, xTest, yTest, modelo = resultado[:5]
+        esGraficable = resultado[-1]
+        figGrafica = figCorrelacion = None
+        errorCorrelacion = None
+        if esGraficable:
+            figGrafica = construirFiguraGrafica(xTrain, yTrain, xTest, yTest, columnasEntrada, columnaSalida, dicColumnaSalida, modelo,
+                                                maxPuntos=maxPuntosGrafica)
+            try:
+                figCorrelacion = construirFiguraCorrelacion(modelo, xTest, yTest, columnaSalida, dicColumnaSalida, maxPuntosCorrelacion)
+            except Exception as e:
+                errorCorrelacion = e
+        return resultado, figGrafica, figCorrelacion, errorCorrelacion
 
-            self.ui.labelR2Test.setText(textoMetricas)
 
-            textoFormula = gd.generarTextoFormula(self.modelo, self.columnasEntradaGraficada)
-            self.ui.labelFormula.setText(textoFormula)
+    def _finalizarEntrenamiento(self, salida):
+        """Recoge el resultado del trabajo de entrenamiento y actualiza la interfaz."""
+        resultado, figGrafica, figCorrelacion, errorCorrelacion = salida
 
-            self.ui.propiedadesModelo.show()
-            self.ui.btnGuardarModelo.show()
-            self.ui.textDescribirModelo.clear()
-            self.ui.textDescribirModelo.show()
-            self.ui.btnAplicarPrediccion.show()
-            self.ui.labelEntradaActual.setText(f"Ingrese valor para {self.columnasEntradaGraficada[0]}")
-            self.ui.labelEntradaActual.show()
-            self.ui.spinBoxEntrada.show()
-            self.ui.labelPrediccion.hide()
+        self.xTrain, self.yTrain, self.xTest, self.yTest, \
+        self.modelo, self.yTrainPred, self.yTestPred, \
+        self.r2Train, self.r2Test, self.ecmTrain, self.ecmTest, \
+        self.accTrain, self.accTest, esGraficable = resultado
+
+        if esGraficable:
+            mostrarFigura(figGrafica, self.ui.placeholderGrafica)
+            if errorCorrelacion is not None:
+                msj.crearAdvertencia(self, "Error", f"Error al graficar estadísticas: {errorCorrelacion}")
+            else:
+                mostrarFigura(figCorrelacion, self.ui.placeholderCorrelacion)
+
+        self.ui.placeholderCorrelacion.show()
+
+        def fmt(v): return f"{v:.4f}" if isinstance(v, (int, float)) else "N/A"
+
+        textoMetricas = ""
+        if self.r2Train is not None:
+            textoMetricas += f"R² Train: {fmt(self.r2Train)}\nR² Test: {fmt(self.r2Test)}\n"
+            textoMetricas += f"ECM Train: {fmt(self.ecmTrain)}\nECM Test: {fmt(self.ecmTest)}"
+        
+        if self.accTrain is not None:
+            if textoMetricas: textoMetricas += "\n\n"
+            textoMetricas += f"Accuracy Train: {fmt(self.accTrain)}\nAccuracy Test: {fmt(self.accTest)}"
+
+        self.ui.labelR2Test.setText(textoMetricas)
+
+        textoFormula = gd.generarTextoFormula(self.modelo, self.columnasEntradaGraficada)
+        self.ui.labelFormula.setText(textoFormula)
+
+        self.ui.propiedadesModelo.show()
+        self.ui.btnGuardarModelo.show()
+        self.ui.textDescribirModelo.clear()
+        self.ui.textDescribirModelo.show()
+        self.ui.btnAplicarPrediccion.show()
+        self.ui.labelEntradaActual.setText(f"Ingrese valor para {self.columnasEntradaGraficada[0]}")
+        self.ui.labelEntradaActual.show()
+        self.ui.spinBoxEntrada.show()
+        self.ui.labelPrediccion.hide()
+
+
+    def _errorEntrenamiento(self, error):
+        """Muestra el error de un trabajo de entrenamiento fallido."""
+        if isinstance(error, TypeError): msj.crearAdvertencia(self, "Error Datos", str(error))
+        else: msj.crearAdvertencia(self, "Error", f"Proceso fallido: {error}")
+
+
+    # ==================== TRABAJOS EN SEGUNDO PLANO ====================
+
+    def actualizarProgresoTrabajo(self, porcentaje, mensaje):
+        """Refleja en la barra de progreso y la barra de estado el avance del trabajo activo."""
+        self.ui.barraProgreso.setValue(porcentaje)
+        self.statusBar().showMessage(mensaje)
+
+
+    def actualizarEstadoTrabajos(self, ocupado):
+        """Muestra u oculta la barra de progreso y el botón de cancelar."""
+        self.ui.barraProgreso.setVisible(ocupado)
+        self.btnCancelarTrabajo.setVisible(ocupado)
+        if ocupado:
+            self.ui.barraProgreso.setValue(0)
+
+
+    def actualizarColaTrabajos(self, pendientes):
+        """Indica en el botón de cancelar cuántos trabajos esperan en la cola."""
+        texto = "Cancelar"
+        if pendientes:
+            texto += f" ({pendientes} en cola)"
+        self.btnCancelarTrabajo.setText(texto)
+
+
+    def cancelarTrabajos(self):
+        """Aborta el trabajo en curso y descarta los pendientes."""
+        self.gestorTrabajos.cancelar()
+        self.statusBar().showMessage("Trabajo cancelado")
+
+
+    def showEvent(self, event):
+        """La primera vez que se muestra la ventana se programa la precarga de módulos pesados."""
+        super().showEvent(event)
+        if not self.precargaLanzada:
+            self.precargaLanzada = True
+            # singleShot(0) deja que la ventana se pinte antes de empezar
+            QTimer.singleShot(0, self.precargarModulos)
 
-        except TypeError as m: msj.crearAdvertencia(self, "Error Datos", str(m))
-        except Exception as e: msj.crearAdvertencia(self, "Error", f"Proceso fallido: {e}")
+
+    def precargarModulos(self):
+        """
+        Importa en segundo plano scikit-learn y plotly (y los prepara en el proceso
+        trabajador de entrenamiento), y QtWebEngine y los visores de gráficas en el
+        hilo principal un poco después, para que el primer entrenamiento y la
+        primera gráfica no esperen.
+        """
+        precargar(ProcDat.modulosSklearn + modulosGraficas)
+        self.gestorTrabajos.precalentar(ProcDat.modulosSklearn)
+        QTimer.singleShot(retardoPrecargaQtMs, self._precargarGraficas)
+
+
+    def _precargarGraficas(self):
+        """Carga QtWebEngine y deja listos los visores de gráficas con plotly.js ya cargado."""
+        precargar(modulosGraficasQt, enSegundoPlano=False)
+        prepararVisores(self.ui.placeholderGrafica, self.ui.placeholderCorrelacion)
+
+
+    def closeEvent(self, event):
+        """Al cerrar la ventana se liberan el proceso trabajador y los trabajos pendientes."""
+        self.gestorTrabajos.cerrar()
+        self.gestorPerfil.cerrar()
+        super().closeEvent(event)
 
 
     def cargarModelo(self):
         """
         Carga un modelo .pkl y LIMPIA todos los datos residuales del modelo anterior.
+        Los metadatos se leen de la cabecera y se muestran al momento; el
+        estimador se carga después en segundo plano.
         """
         ruta, _ = QtWidgets.QFileDialog.getOpenFileName(
             self, "Seleccionar modelo", "", "Modelos (*.pkl)"
@@ -683,10 +1117,45 @@ class MainWindowCtrl(QMainWindow):
 
         if not ruta:
             return
+        self._cargarModeloDesdeRuta(ruta)
+
 
+    def _registrarModelo(self, ruta):
+        """
+        Añade el modelo recién guardado al registro. Devuelve el mensaje de error
+        si falla (el modelo ya está guardado igualmente) o None.
+        """
         try:
-            with open(ruta, 'rb') as f:
-                datos = pk.load(f)
+            RegistroModelos.registrarModelo(ruta)
+        except Exception as e:
+            return str(e)
+        return None
+
+
+    def explorarRegistroModelos(self):
+        """Abre el explorador del registro de modelos y carga el que elija el usuario."""
+        try:
+            dialogo = DialogoRegistroModelos(
+                lambda salida, texto: RegistroModelos.buscarModelos(salida, texto),
+                RegistroModelos.columnasSalidaRegistradas,
+                lambda carpeta: RegistroModelos.indexarCarpeta(carpeta, incluirAntiguos=True),
+                self)
+        except Exception as e:
+            msj.crearAdvertencia(self, "Error", f"No se pudo abrir el registro de modelos: {e}")
+            return
+        if dialogo.exec() and dialogo.rutaSeleccionada:
+            if not os.path.exists(dialogo.rutaSeleccionada):
+                RegistroModelos.eliminarInexistentes()
+                msj.crearAdvertencia(self, "Error", "El archivo del modelo ya no existe; se ha quitado del registro.")
+                return
+            self._cargarModeloDesdeRuta(dialogo.rutaSeleccionada)
+
+
+    def _cargarModeloDesdeRuta(self, ruta):
+        """Carga el modelo de `ruta` (ver cargarModelo)."""
+        try:
+            # Con un .pkl antiguo viene ya el estimador (ha habido que cargarlo entero)
+            datos = gd.leerCabeceraModelo(ruta, conModelo=True)
             # Si no ponemos esto a None, plotGrafica creerá que tiene datos válidos
             # e intentará cruzar las columnas de B con los datos de A -> ERROR.
             self.xTrain = None
@@ -694,13 +1163,15 @@ class MainWindowCtrl(QMainWindow):
             self.xTest = None
             self.yTest = None
             self.dicColumnaSalida = None
+            self.preprocesadoModelo = None
             
             # También limpiamos el buffer de entrada para predicciones
             self.datosEntrada.clear() 
             # =================================================================
 
-            # Carga del nuevo modelo (B)
-            self.modelo = datos.get("modelo")
+            # Carga del nuevo modelo (B): el estimador llega en _finalizarCargaModelo
+            self.modelo = None
+            invalidarCacheSuperficie()
             self.columnasEntradaGraficada = datos.get("columnasEntrada")
             self.columnaSalidaGraficada = datos.get("columnaSalida")
             
@@ -745,11 +1216,11 @@ class MainWindowCtrl(QMainWindow):
             self.ui.btnGuardarModelo.show()
             self.ui.textDescribirModelo.show()
             
-            # Configurar inputs de predicción para el nuevo modelo
+            # Los inputs de predicción se muestran cuando el estimador esté cargado
             self.ui.labelEntradaActual.setText(f"Ingrese valor para {columna_input}")
-            self.ui.btnAplicarPrediccion.show()
-            self.ui.labelEntradaActual.show()
-            self.ui.spinBoxEntrada.show()
+            self.ui.btnAplicarPrediccion.hide()
+            self.ui.labelEntradaActual.hide()
+            self.ui.spinBoxEntrada.hide()
             self.ui.labelPrediccion.hide()
             
             self.statusBar().showMessage(f"Entrada: {entradas_str} | Salida: {self.columnaSalidaGraficada}")
@@ -758,9 +1229,15 @@ class MainWindowCtrl(QMainWindow):
             limpiarGrafica(self.ui.placeholderGrafica, self.ui.placeholderCorrelacion) # Borra la gráfica vieja
             self.resetearPaginaPreprocesado()
 
-            msj.crearInformacion(self, "Éxito", f"Modelo cargado correctamente:\n{ruta}")
+            if "modelo" in datos:
+                self._finalizarCargaModelo(datos, ruta)
+                return
+            trabajo = Trabajo("Carga del modelo")
+            trabajo.agregarEtapa("cargando el estimador", gd.cargarModeloDisco, ruta)
+            self.gestorTrabajos.encolar(trabajo, alTerminar=lambda datosModelo: self._finalizarCargaModelo(datosModelo, ruta),
+                                        alFallar=lambda e: msj.crearAdvertencia(self, "Error de lectura", f"No se pudo cargar el estimador: {e}"))
 
-        except (pk.PickleError, EOFError):
+        except (pk.PickleError, EOFError, ValueError):
             msj.crearAdvertencia(self, "Error de lectura", "El archivo no es un modelo válido o está dañado.")
         except FileNotFoundError:
             msj.crearAdvertencia(self, "Error", "No se encontró el archivo especificado.")
@@ -768,12 +1245,53 @@ class MainWindowCtrl(QMainWindow):
             msj.crearAdvertencia(self, "Error inesperado", f"Ocurrió un error al cargar: {e}")
 
 
+    def _finalizarCargaModelo(self, datosModelo, ruta):
+        """Recibe el estimador cargado en segundo plano y habilita la predicción."""
+        self.modelo = datosModelo.get("modelo")
+        self.preprocesadoModelo = datosModelo.get("preprocesado")
+        invalidarCacheSuperficie()
+        self.ui.btnAplicarPrediccion.show()
+        self.ui.labelEntradaActual.show()
+        self.ui.spinBoxEntrada.show()
+        msj.crearInformacion(self, "Éxito", f"Modelo cargado correctamente:\n{ruta}")
+
+
     def actualizarDatosPrediccion(self):
         nuevaEntrada = self.ui.spinBoxEntrada.value()
         self.datosEntrada.append(nuevaEntrada)
         self.ui.spinBoxEntrada.setValue(0)
                 
 
+    def predecirArchivo(self):
+        """
+        Predice todas las filas de un archivo CSV/SQLite y escribe el resultado en otro.
+        Usa el modelo actual o, si no hay ninguno, pide un modelo guardado.
+        """
+        if self.modelo is not None:
+            modelo = {"modelo": self.modelo, "columnasEntrada": list(self.columnasEntradaGraficada),
+                      "columnaSalida": self.columnaSalidaGraficada, "dicColumnaSalida": self.dicColumnaSalida,
+                      "preprocesado": self.preprocesadoModelo}
+        else:
+            modelo, _ = QFileDialog.getOpenFileName(self, "Seleccionar modelo", "", "Modelos (*.pkl)")
+            if not modelo: return
+
+        rutaEntrada, _ = QFileDialog.getOpenFileName(self, "Archivo a predecir", "",
+                                                     "Datos (*.csv *.sqlite *.db);;CSV (*.csv);;SQLite (*.sqlite *.db)")
+        if not rutaEntrada: return
+        rutaSalida, _ = QFileDialog.getSaveFileName(self, "Guardar predicciones", "",
+                                                    "CSV (*.csv);;SQLite (*.sqlite *.db)")
+        if not rutaSalida: return
+
+        trabajo = Trabajo("Predicción por lotes")
+        trabajo.agregarEtapa(f"prediciendo {os.path.basename(rutaEntrada)}", PrediccionLotes.predecirArchivo,
+                             modelo, rutaEntrada, rutaSalida, impd.tamBloquePorDefecto, -1, trabajo.notificarProgreso)
+        self.gestorTrabajos.encolar(
+            trabajo,
+            alTerminar=lambda filas: msj.crearInformacion(self, "Predicción completada",
+                                                          f"Se han escrito {filas} predicciones en:\n{rutaSalida}"),
+            alFallar=lambda e: msj.crearAdvertencia(self, "Error al predecir el archivo", str(e)))
+
+
     def pipelinePrediccion(self):
         """
         Gestor de predicción secuencial.
@@ -797,10 +1315,9 @@ class MainWindowCtrl(QMainWindow):
 
         # --- PREDICCIÓN ---
         try:
-            # Crear DataFrame con nombres (camelCase)
-            entradaDf = pd.DataFrame([self.datosEntrada], columns=self.columnasEntradaGraficada)
-            
-            self.prediccion = self.modelo.predict(entradaDf)
+            # Por el despachador: los modelos lineales se puntúan sin DataFrame y, si las
+            # gráficas están prediciendo con el mismo modelo, se comparte la llamada
+            self.prediccion = predecirAgrupado(self.modelo, [self.datosEntrada], self.columnasEntradaGraficada)
             valorPredicho = self.prediccion[0]
             
             columnaSalida = self.columnaSalidaGraficada
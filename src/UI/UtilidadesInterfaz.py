@@ -2,6 +2,8 @@ from PyQt6.QtWidgets import QMessageBox
 from PyQt6.QtCore import QAbstractTableModel, Qt
 from PyQt6.QtGui import QBrush, QColor, QFont
 from PyQt6 import QtWidgets, QtCore, QtGui
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 
 class Mensajes:
@@ -105,17 +107,190 @@ class PandasModel(QAbstractTableModel):
         return None
 
 
+class PandasModelOrdenable(PandasModel):
+    """
+    PandasModel que se puede ordenar pulsando en la cabecera de una columna.
+    Los números se muestran con 4 decimales y los NaN como "N/A".
+    """
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            valor = self.df.iat[index.row(), index.column()]
+            if isinstance(valor, (float, np.floating)):
+                return "N/A" if np.isnan(valor) else f"{valor:.4f}"
+            return str(valor)
+        return None
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        # Los NaN siempre al final, se ordene como se ordene
+        self.df = self.df.sort_values(self.df.columns[column],
+                                      ascending=order == Qt.SortOrder.AscendingOrder,
+                                      na_position='last', ignore_index=True)
+        self.layoutChanged.emit()
+
+
+class DialogoTablaModelos(QtWidgets.QDialog):
+    """
+    Diálogo con la tabla comparativa de modelos.
+    Si el usuario pulsa "Entrenar seleccionado", `modeloSeleccionado` contiene
+    el nombre del modelo de la fila elegida.
+    """
+    def __init__(self, tabla, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Comparativa de modelos")
+        self.resize(900, 360)
+        self.modeloSeleccionado = None
+
+        self.vista = QtWidgets.QTableView(self)
+        self.vista.setModel(PandasModelOrdenable(tabla))
+        self.vista.setSortingEnabled(True)
+        self.vista.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.DescendingOrder)
+        self.vista.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.vista.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.SingleSelection)
+        self.vista.resizeColumnsToContents()
+        self.vista.selectRow(0)
+        self.vista.doubleClicked.connect(self.accept)
+
+        botones = QtWidgets.QDialogButtonBox(self)
+        botones.addButton("Entrenar seleccionado", QtWidgets.QDialogButtonBox.ButtonRole.AcceptRole)
+        botones.addButton(QtWidgets.QDialogButtonBox.StandardButton.Close)
+        botones.accepted.connect(self.accept)
+        botones.rejected.connect(self.reject)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.vista)
+        layout.addWidget(botones)
+
+    def accept(self):
+        filas = self.vista.selectionModel().selectedRows()
+        if filas:
+            modelo = self.vista.model()
+            self.modeloSeleccionado = modelo.df.at[filas[0].row(), "Modelo"]
+        super().accept()
+
+
+class DialogoRegistroModelos(QtWidgets.QDialog):
+    """
+    Explorador del registro de modelos guardados.
+
+    No conoce el registro directamente: recibe `consultar(columnaSalida, texto)`,
+    que devuelve el DataFrame de RegistroModelos.buscarModelos, `salidas()`, que
+    devuelve las columnas de salida registradas, e `indexarCarpeta(carpeta)`.
+    Si el usuario pulsa "Cargar seleccionado", `rutaSeleccionada` contiene la
+    ruta del modelo elegido.
+    """
+    textoTodas = "Todas las salidas"
+    columnasVisibles = {"columnaSalida": "Salida", "columnasEntrada": "Entradas", "tipoEstimador": "Tipo",
+                        "r2Train": "R² Train", "r2Test": "R² Test", "ecmTrain": "ECM Train", "ecmTest": "ECM Test",
+                        "descripcion": "Descripción", "guardado": "Guardado", "kb": "Tamaño (KB)", "ruta": "Ruta"}
+
+    def __init__(self, consultar, salidas, indexarCarpeta, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Modelos guardados")
+        self.resize(1000, 480)
+        self.rutaSeleccionada = None
+        self._consultar, self._salidas, self._indexarCarpeta = consultar, salidas, indexarCarpeta
+
+        self.cmbSalida = QtWidgets.QComboBox(self)
+        self.txtBuscar = QtWidgets.QLineEdit(self)
+        self.txtBuscar.setPlaceholderText("Buscar en descripción, tipo, columnas o ruta")
+        filtros = QtWidgets.QHBoxLayout()
+        filtros.addWidget(self.cmbSalida)
+        filtros.addWidget(self.txtBuscar, 1)
+
+        self.vista = QtWidgets.QTableView(self)
+        self.vista.setSortingEnabled(True)
+        self.vista.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.vista.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.SingleSelection)
+        self.vista.doubleClicked.connect(self.accept)
+
+        botones = QtWidgets.QDialogButtonBox(self)
+        btnCarpeta = botones.addButton("Añadir carpeta...", QtWidgets.QDialogButtonBox.ButtonRole.ActionRole)
+        botones.addButton("Cargar seleccionado", QtWidgets.QDialogButtonBox.ButtonRole.AcceptRole)
+        botones.addButton(QtWidgets.QDialogButtonBox.StandardButton.Close)
+        btnCarpeta.clicked.connect(self.anadirCarpeta)
+        botones.accepted.connect(self.accept)
+        botones.rejected.connect(self.reject)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addLayout(filtros)
+        layout.addWidget(self.vista)
+        layout.addWidget(botones)
+
+        # Las búsquedas se lanzan al dejar de escribir, no en cada tecla
+        self._temporizador = QtCore.QTimer(self)
+        self._temporizador.setSingleShot(True)
+        self._temporizador.setInterval(250)
+        self._temporizador.timeout.connect(self.actualizar)
+        self.txtBuscar.textChanged.connect(self._temporizador.start)
+        self.cmbSalida.currentIndexChanged.connect(self.actualizar)
+
+        self._rellenarSalidas()
+        self.actualizar()
+
+    def _rellenarSalidas(self):
+        actual = self.cmbSalida.currentText()
+        self.cmbSalida.blockSignals(True)
+        self.cmbSalida.clear()
+        self.cmbSalida.addItem(self.textoTodas)
+        self.cmbSalida.addItems([str(s) for s in self._salidas()])
+        self.cmbSalida.setCurrentText(actual or self.textoTodas)
+        self.cmbSalida.blockSignals(False)
+
+    def actualizar(self):
+        salida = self.cmbSalida.currentText()
+        tabla = self._consultar(None if salida == self.textoTodas else salida, self.txtBuscar.text().strip() or None)
+        tabla = tabla.assign(columnasEntrada=[", ".join(map(str, c)) for c in tabla["columnasEntrada"]],
+                             kb=(pd.to_numeric(tabla["bytes"]) / 1024).round(1))
+        tabla = tabla[list(self.columnasVisibles)].rename(columns=self.columnasVisibles)
+        self.vista.setModel(PandasModelOrdenable(tabla))
+        self.vista.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.DescendingOrder)
+        self.vista.resizeColumnsToContents()
+        if len(tabla):
+            self.vista.selectRow(0)
+
+    def anadirCarpeta(self):
+        carpeta = QtWidgets.QFileDialog.getExistingDirectory(self, "Carpeta con modelos guardados")
+        if not carpeta:
+            return
+        QtWidgets.QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            registrados, omitidos = self._indexarCarpeta(carpeta)
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+        mensaje = f"Modelos añadidos o actualizados: {registrados}"
+        if omitidos:
+            mensaje += f"\nArchivos omitidos (formato antiguo o ilegibles): {len(omitidos)}"
+        Mensajes.crearInformacion(self, "Registro de modelos", mensaje)
+        self._rellenarSalidas()
+        self.actualizar()
+
+    def accept(self):
+        filas = self.vista.selectionModel().selectedRows() if self.vista.selectionModel() else []
+        if filas:
+            self.rutaSeleccionada = self.vista.model().df.at[filas[0].row(), "Ruta"]
+        super().accept()
+
+
 class PandasModelConColor(QAbstractTableModel):
     """
-    Modelo extendido de PandasModel optimizado con caché precalculado.
-    Mejora el rendimiento al evitar cálculos repetitivos durante el renderizado.
+    Modelo extendido de PandasModel virtualizado para DataFrames grandes.
+    Solo formatea las filas que la tabla llega a pedir, por bloques, y guarda
+    los últimos bloques formateados en una caché LRU de tamaño fijo.
     
     OPTIMIZACIONES IMPLEMENTADAS:
-    1. Acceso directo a NumPy array (5-10x más rápido que df.iat)
-    2. Comparación de índices numéricos en lugar de strings (2-3x más rápido)
-    3. Objetos QBrush y QFont reutilizables (evita crear objetos repetidamente)
-    4. Máscara de NaN precalculada (operación vectorizada única)
+    1. Arrays tipados por columna (no se fuerza todo el DataFrame a un array object con df.values)
+    2. Máscara de NaN y textos calculados solo por bloques de filas visibles
+    3. Caché LRU de bloques formateados: memoria acotada aunque haya millones de filas
+    4. Comparación de índices numéricos en lugar de strings (2-3x más rápido)
+    5. Objetos QBrush y QFont reutilizables (evita crear objetos repetidamente)
     """
+    # Filas por bloque formateado y número máximo de bloques en caché
+    tamBloqueFilas = 256
+    maxBloquesCache = 64
+
     def __init__(self, df, columna_verde=None, columna_roja=None, tachar_nan=False):
         super().__init__()
         self.df = df
@@ -150,21 +325,57 @@ class PandasModelConColor(QAbstractTableModel):
         self.font_tachado = QFont()
         self.font_tachado.setStrikeOut(True)
         
-        # 4. Precalcular máscara de NaN si es necesario (operación vectorizada única)
-        self.nan_mask = None
-        if self.tachar_nan:
-            # Crear máscara booleana de NaN (mucho más rápido que pd.isna() repetido)
-            self.nan_mask = pd.isna(df.values)
-        
-        # 5. Convertir DataFrame a numpy array para acceso más rápido
-        # (df.iat es lento comparado con acceso directo a numpy)
-        self.data_array = df.values
+        # 4. Una referencia tipada por columna: arrays numpy para tipos numéricos
+        # (sin copia) y la Series original para el resto (fechas, texto, categorías)
+        self.columnas = []
+        for i in range(len(df.columns)):
+            serie = df.iloc[:, i]
+            if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in "biuf":
+                self.columnas.append(serie.to_numpy())
+            else:
+                self.columnas.append(serie)
+
+        self.num_filas = len(df)
+
+        # 5. Caché LRU de bloques formateados: {nº bloque: (textos por columna, máscara NaN)}
+        self.cache_bloques = OrderedDict()
+
+    def _formatearColumna(self, columna, inicio, fin):
+        """Devuelve los textos de un tramo de columna y su máscara de NaN."""
+        if isinstance(columna, np.ndarray):
+            tramo = columna[inicio:fin]
+            return tramo.astype(str).tolist(), pd.isna(tramo)
+        tramo = columna.iloc[inicio:fin]
+        return [str(v) for v in tramo], tramo.isna().to_numpy()
+
+    def _obtenerBloque(self, row):
+        """Devuelve (y formatea si hace falta) el bloque de filas que contiene `row`."""
+        numBloque = row // self.tamBloqueFilas
+        bloque = self.cache_bloques.get(numBloque)
+        if bloque is not None:
+            self.cache_bloques.move_to_end(numBloque)
+            return bloque
+
+        inicio = numBloque * self.tamBloqueFilas
+        fin = min(inicio + self.tamBloqueFilas, self.num_filas)
+        textos = []
+        mascaras = []
+        for columna in self.columnas:
+            texto, mascara = self._formatearColumna(columna, inicio, fin)
+            textos.append(texto)
+            mascaras.append(mascara)
+
+        bloque = (textos, mascaras)
+        self.cache_bloques[numBloque] = bloque
+        if len(self.cache_bloques) > self.maxBloquesCache:
+            self.cache_bloques.popitem(last=False)
+        return bloque
 
     def rowCount(self, parent=None):
-        return len(self.df)
+        return self.num_filas
 
     def columnCount(self, parent=None):
-        return len(self.df.columns)
+        return len(self.columnas)
 
     def data(self, index, role=Qt.ItemDataRole.DisplayRole):
         if not index.isValid():
@@ -173,11 +384,10 @@ class PandasModelConColor(QAbstractTableModel):
         row = index.row()
         col = index.column()
         
-        # ============ OPTIMIZACIÓN: Acceso directo al array numpy ============
+        # ============ OPTIMIZACIÓN: Texto formateado por bloques bajo demanda ============
         if role == Qt.ItemDataRole.DisplayRole:
-            # Usar el array numpy en lugar de df.iat (5-10x más rápido)
-            valor = self.data_array[row, col]
-            return str(valor)
+            textos, _ = self._obtenerBloque(row)
+            return textos[col][row % self.tamBloqueFilas]
         
         # ============ OPTIMIZACIÓN: Usar índices precalculados ============
         elif role == Qt.ItemDataRole.BackgroundRole:
@@ -188,10 +398,12 @@ class PandasModelConColor(QAbstractTableModel):
                 return self.brush_rojo
             return None
         
-        # ============ OPTIMIZACIÓN: Usar máscara de NaN precalculada ============
+        # ============ OPTIMIZACIÓN: Máscara de NaN calculada solo para el bloque ============
         elif role == Qt.ItemDataRole.FontRole:
-            if self.nan_mask is not None and self.nan_mask[row, col]:
-                return self.font_tachado
+            if self.tachar_nan:
+                _, mascaras = self._obtenerBloque(row)
+                if mascaras[col][row % self.tamBloqueFilas]:
+                    return self.font_tachado
             return None
         
         return None
@@ -205,6 +417,20 @@ class PandasModelConColor(QAbstractTableModel):
         return None
 
 
+def ajustarColumnasPorMuestra(tabla, filasMuestra=200):
+    """
+    Ajusta el ancho de las columnas de una tabla midiendo solo una muestra de filas.
+    resizeColumnsToContents() por defecto formatea hasta 1000 filas por columna;
+    limitando la precisión del encabezado solo se formatean `filasMuestra`.
+
+    Args:
+        tabla (QTableView): Tabla cuyas columnas se quieren ajustar.
+        filasMuestra (int): Número de filas que Qt mide para cada columna.
+    """
+    tabla.horizontalHeader().setResizeContentsPrecision(filasMuestra)
+    tabla.resizeColumnsToContents()
+
+
 class CheckableComboBox(QtWidgets.QComboBox):
     """
     ComboBox personalizado que permite seleccionar múltiples opciones mediante checkboxes.
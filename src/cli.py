@@ -0,0 +1,222 @@
+"""
+Punto de entrada sin interfaz gráfica (para servidores y tareas programadas).
+
+Usa solo la capa Backend y nunca importa PyQt6. Los módulos pesados (pandas,
+scikit-learn) se importan dentro de cada subcomando, así que `--help` o un
+error de argumentos responden al instante.
+
+Ejemplos:
+    python src/cli.py modelos
+    python src/cli.py entrenar datos.csv --entrada x1 x2 --salida y --modelo "Regresión Lineal" --guardar modelo.pkl
+    python src/cli.py entrenar enorme.csv --entrada x1 x2 --salida y --modelo "Regresión Lineal" --por-bloques
+    python src/cli.py predecir modelo.pkl nuevos.csv predicciones.csv
+    python src/cli.py servir modelo.pkl otro.pkl --puerto 8080
+
+Códigos de salida: 0 correcto, 1 error en el proceso, 2 argumentos inválidos.
+"""
+import argparse
+import sys
+
+# Opciones de preprocesado de la línea de comandos -> opciones de PreprocesamientoDatos
+opcionesPreprocesado = {
+    "eliminar": "Eliminar filas con NaN",
+    "media": "Rellenar con la media (Numpy)",
+    "mediana": "Rellenar con la mediana",
+    "constante": "Rellenar con un valor constante",
+}
+
+
+def _imprimirMetricas(titulo, metricas):
+    print(titulo)
+    for nombre, valor in metricas:
+        if isinstance(valor, float):
+            print(f"  {nombre}: {valor:.4f}")
+
+
+#Subcomandos
+
+def comandoModelos(args):
+    """Lista los modelos disponibles y su tipo."""
+    from Backend import ProcesadoDatos as ProcDat
+    for nombre, config in ProcDat.configuracionModelos.items():
+        print(f"{nombre}\t{config['tipo']}")
+    return 0
+
+
+def comandoEntrenar(args):
+    """Carga → preprocesa → divide → ajusta → (valida) → guarda."""
+    if args.semilla is None:
+        from Backend.ProcesadoDatos import semillaPorDefecto
+        args.semilla = semillaPorDefecto
+    if args.por_bloques:
+        if args.pliegues:
+            raise ValueError("--pliegues no está disponible con --por-bloques.")
+        return _comandoEntrenarPorBloques(args)
+    import pandas as pd
+    from Backend import ImportacionDatos as impd
+    from Backend import PreprocesamientoDatos as PrepDat
+    from Backend import ProcesadoDatos as ProcDat
+
+    df = impd.cargarDatos(args.datos, usarCache=args.cache)
+    faltan = [c for c in args.entrada + [args.salida] if c not in df.columns]
+    if faltan:
+        raise ValueError(f"Columnas inexistentes en el archivo: {', '.join(faltan)}")
+
+    preprocesado = None
+    if args.preprocesado in ("media", "mediana", "constante"):
+        # Los mismos valores de relleno se guardan con el modelo para los datos nuevos
+        from Backend.TransformadoresPreprocesado import ImputadorNan, PipelinePreprocesado
+        imputador = ImputadorNan(args.entrada + [args.salida], args.preprocesado, args.constante)
+        preprocesado = PipelinePreprocesado([imputador.ajustar(df)])
+    if args.preprocesado:
+        df, mensaje, _ = PrepDat.aplicarPreprocesadoCalcular(args.entrada, args.salida, df,
+                                                             opcionesPreprocesado[args.preprocesado], args.constante)
+        print(mensaje)
+
+    dfTrain, dfTest = ProcDat._ejecutarDatasplit(df, args.entrada, args.salida, args.test, args.semilla)
+    print(f"Train: {len(dfTrain)} filas | Test: {len(dfTest)} filas")
+
+    (_, _, _, _, modelo, _, _, r2Train, r2Test, ecmTrain, ecmTest,
+     accTrain, accTest, _) = ProcDat.crearAjustarModelo(dfTrain, dfTest, args.entrada, args.salida, args.modelo)
+    _imprimirMetricas(f"Modelo: {args.modelo}", [("R² Train", r2Train), ("R² Test", r2Test),
+                                                 ("ECM Train", ecmTrain), ("ECM Test", ecmTest),
+                                                 ("Accuracy Train", accTrain), ("Accuracy Test", accTest)])
+
+    if args.pliegues:
+        resumen = ProcDat.validacionCruzada(df, args.entrada, args.salida, args.modelo, args.pliegues,
+                                            semilla=args.semilla, nJobs=args.hilos).iloc[0]
+        print(f"Validación cruzada ({args.pliegues} pliegues):")
+        for metrica in ["R²", "ECM", "Accuracy"]:
+            if not pd.isna(resumen[f"{metrica} media"]):
+                print(f"  {metrica}: {resumen[f'{metrica} media']:.4f} ± {resumen[f'{metrica} desv']:.4f}")
+
+    _guardarModelo(args, modelo, r2Train, r2Test, ecmTrain, ecmTest, preprocesado)
+    return 0
+
+
+def _comandoEntrenarPorBloques(args):
+    """Entrenamiento fuera de memoria: el archivo se recorre por bloques sin cargarlo entero."""
+    from Backend.EntrenamientoIncremental import entrenarPorBloques
+
+    def progreso(fraccion, pasada):
+        print(f"\r{fraccion:6.1%} (pasada {pasada + 1})", end="", file=sys.stderr, flush=True)
+
+    r = entrenarPorBloques(args.datos, args.entrada, args.salida, args.modelo, args.test, args.semilla,
+                           args.bloque, args.preprocesado, args.constante, args.epocas,
+                           callbackProgreso=progreso if args.progreso else None)
+    if args.progreso:
+        print(file=sys.stderr)
+    print(f"Train: {r['filasTrain']} filas | Test: {r['filasTest']} filas")
+    _imprimirMetricas(f"Modelo: {args.modelo} (por bloques)",
+                      [("R² Train", r["r2Train"]), ("R² Test", r["r2Test"]),
+                       ("ECM Train", r["ecmTrain"]), ("ECM Test", r["ecmTest"]),
+                       ("Accuracy Train", r["accTrain"]), ("Accuracy Test", r["accTest"])])
+    _guardarModelo(args, r["modelo"], r["r2Train"], r["r2Test"], r["ecmTrain"], r["ecmTest"], r["preprocesado"])
+    return 0
+
+
+def _guardarModelo(args, modelo, r2Train, r2Test, ecmTrain, ecmTest, preprocesado):
+    if not args.guardar:
+        return
+    from Backend import GestionDatos as gd
+    dictModelo = gd.crearDiccionarioModelo(modelo, args.entrada, args.salida, r2Train, r2Test,
+                                           ecmTrain, ecmTest, args.descripcion, None, preprocesado)
+    error = gd.crearModeloDisco(dictModelo, args.guardar)
+    if error:
+        raise OSError(error)
+    print(f"Modelo guardado en {args.guardar}")
+    if args.registrar:
+        from Backend import RegistroModelos
+        RegistroModelos.registrarModelo(args.guardar)
+        print("Modelo añadido al registro")
+
+
+def comandoPredecir(args):
+    """Predice un archivo completo por bloques con un modelo guardado."""
+    from Backend.PrediccionLotes import predecirArchivo
+
+    def progreso(fraccion, filas):
+        if args.progreso:
+            print(f"\r{fraccion:6.1%}  {filas} filas", end="", file=sys.stderr, flush=True)
+
+    filas = predecirArchivo(args.modelo, args.entrada, args.salida, args.bloque, args.hilos,
+                            progreso, not args.solo_prediccion)
+    if args.progreso:
+        print(file=sys.stderr)
+    print(f"{filas} predicciones escritas en {args.salida}")
+    return 0
+
+
+def comandoServir(args):
+    """Sirve predicciones por HTTP con los modelos indicados cargados en memoria."""
+    from Backend.ServidorPrediccion import ServidorPrediccion
+    servidor = ServidorPrediccion(args.modelos, args.host, args.puerto, args.lote, args.espera_ms)
+    servidor.servirParaSiempre()
+    return 0
+
+
+#Argumentos
+
+def crearParser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="THE PIPELINE sin interfaz gráfica.")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    p = subparsers.add_parser("modelos", help="Lista los modelos disponibles.")
+    p.set_defaults(funcion=comandoModelos)
+
+    p = subparsers.add_parser("entrenar", help="Entrena un modelo y opcionalmente lo guarda.")
+    p.add_argument("datos", help="Archivo de datos (.csv, .xlsx, .xls, .sqlite, .db).")
+    p.add_argument("--entrada", nargs="+", required=True, help="Columnas de entrada.")
+    p.add_argument("--salida", required=True, help="Columna de salida.")
+    p.add_argument("--modelo", required=True, help="Nombre del modelo (ver el subcomando 'modelos').")
+    p.add_argument("--test", type=float, default=0.2, help="Proporción de test (por defecto 0.2).")
+    # Sin valor por defecto aquí: se toma de ProcesadoDatos al entrenar (sin importarlo en --help)
+    p.add_argument("--semilla", type=int, help="Semilla del datasplit (por defecto, la de la aplicación).")
+    p.add_argument("--preprocesado", choices=list(opcionesPreprocesado), help="Tratamiento de los NaN.")
+    p.add_argument("--constante", type=float, default=0.0, help="Valor para --preprocesado constante.")
+    p.add_argument("--pliegues", type=int, default=0, help="Pliegues de validación cruzada (0 = sin CV).")
+    p.add_argument("--hilos", type=int, default=-1, help="Núcleos a usar (-1 = todos).")
+    p.add_argument("--cache", action="store_true", help="Usar la caché de datasets en disco.")
+    p.add_argument("--guardar", help="Ruta .pkl donde guardar el modelo.")
+    p.add_argument("--descripcion", default="", help="Descripción guardada con el modelo.")
+    p.add_argument("--registrar", action="store_true", help="Añadir el modelo guardado al registro de modelos.")
+    p.add_argument("--por-bloques", action="store_true",
+                   help="Entrenar recorriendo el archivo por bloques, sin cargarlo en memoria.")
+    p.add_argument("--bloque", type=int, default=100_000, help="Filas por bloque con --por-bloques.")
+    p.add_argument("--epocas", type=int, default=5, help="Pasadas de SGD con --por-bloques (regresión logística).")
+    p.add_argument("--progreso", action="store_true", help="Mostrar el progreso por stderr (con --por-bloques).")
+    p.set_defaults(funcion=comandoEntrenar)
+
+    p = subparsers.add_parser("predecir", help="Predice un archivo completo con un modelo guardado.")
+    p.add_argument("modelo", help="Modelo .pkl guardado.")
+    p.add_argument("entrada", help="Archivo a predecir (.csv, .sqlite, .db).")
+    p.add_argument("salida", help="Archivo de salida (.csv, o .sqlite/.db).")
+    p.add_argument("--bloque", type=int, default=100_000, help="Filas por bloque.")
+    p.add_argument("--hilos", type=int, default=-1, help="Hilos de predicción (-1 = todos).")
+    p.add_argument("--solo-prediccion", action="store_true", help="Escribir solo la columna de predicción.")
+    p.add_argument("--progreso", action="store_true", help="Mostrar el progreso por stderr.")
+    p.set_defaults(funcion=comandoPredecir)
+
+    p = subparsers.add_parser("servir", help="Sirve predicciones por HTTP (POST /predecir/<modelo>).")
+    p.add_argument("modelos", nargs="+", help="Modelos .pkl guardados (el nombre de la ruta es el del archivo).")
+    p.add_argument("--host", default="127.0.0.1", help="Interfaz de escucha (por defecto solo local).")
+    p.add_argument("--puerto", type=int, default=8080, help="Puerto (por defecto 8080).")
+    p.add_argument("--lote", type=int, default=1024, help="Máximo de filas por llamada a predict.")
+    p.add_argument("--espera-ms", type=float, default=2.0, help="Espera máxima para llenar un lote, en ms.")
+    p.set_defaults(funcion=comandoServir)
+    return parser
+
+
+def main(argv=None):
+    args = crearParser().parse_args(argv)
+    try:
+        return args.funcion(args)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,15 @@
 from UI.MainWindowCtrl import MainWindowCtrl
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import Qt
+import multiprocessing
 import sys
 
 if __name__ == "__main__":
+    # Necesario para el proceso trabajador de entrenamiento en el ejecutable compilado
+    multiprocessing.freeze_support()
+    # QtWebEngine se importa después de crear la aplicación (carga diferida): Qt exige
+    # entonces compartir los contextos OpenGL desde antes de crear la QApplication
+    QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
     controlador = MainWindowCtrl()
     controlador.show()
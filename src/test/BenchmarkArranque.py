@@ -0,0 +1,99 @@
+"""
+Benchmark del arranque en frío de la interfaz.
+
+Mide, en procesos nuevos, el tiempo desde que arranca el intérprete hasta el
+primer pintado de la ventana principal (time-to-first-paint), y cuánto tarda
+después la precarga en segundo plano de scikit-learn y plotly.
+
+Uso (desde la raíz del proyecto):
+    python src/test/BenchmarkArranque.py [repeticiones]
+
+En servidores sin pantalla: QT_QPA_PLATFORM=offscreen python src/test/BenchmarkArranque.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+rutaSrc = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Código que se ejecuta en cada proceso hijo: crea la ventana como main.py y
+# anota el instante del primer evento Paint.
+_codigoHijo = r"""
+import json, sys, time
+inicioHijo = time.time()
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QObject, QEvent, QTimer, Qt
+QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+app = QApplication(sys.argv)
+tImport = time.time()
+from UI.MainWindowCtrl import MainWindowCtrl
+tImportFin = time.time()
+from Backend import CargaDiferida
+
+resultado = {"inicioHijo": inicioHijo, "importCtrl": tImportFin - tImport}
+
+class FiltroPintado(QObject):
+    def eventFilter(self, objeto, evento):
+        if evento.type() == QEvent.Type.Paint and "primerPintado" not in resultado:
+            resultado["primerPintado"] = time.time()
+        return False
+
+ventana = MainWindowCtrl()
+filtro = FiltroPintado()
+ventana.installEventFilter(filtro)
+ventana.show()
+
+def comprobarPrecarga():
+    hilo = [h for h in __import__("threading").enumerate() if h.name == "precarga"]
+    if "primerPintado" in resultado and not hilo:
+        resultado["precargaFin"] = time.time()
+        resultado["tiemposPrecarga"] = CargaDiferida.tiemposPrecarga
+        ventana.gestorTrabajos.cerrar()
+        print("RESULTADO " + json.dumps(resultado))
+        app.quit()
+    else:
+        QTimer.singleShot(20, comprobarPrecarga)
+
+QTimer.singleShot(20, comprobarPrecarga)
+app.exec()
+"""
+
+
+def medirArranque():
+    """Lanza un proceso nuevo y devuelve sus tiempos (segundos desde el lanzamiento)."""
+    inicio = time.time()
+    proceso = subprocess.run([sys.executable, "-c", _codigoHijo], cwd=rutaSrc,
+                             capture_output=True, text=True, timeout=120)
+    linea = next((l for l in proceso.stdout.splitlines() if l.startswith("RESULTADO ")), None)
+    if linea is None:
+        raise RuntimeError(f"El proceso de medida falló:\n{proceso.stderr}")
+    datos = json.loads(linea[len("RESULTADO "):])
+    return {
+        "primerPintado": datos["primerPintado"] - inicio,
+        "importCtrl": datos["importCtrl"],
+        "precargaCompleta": datos["precargaFin"] - inicio,
+        "tiemposPrecarga": datos["tiemposPrecarga"],
+    }
+
+
+def main(repeticiones=5):
+    medidas = [medirArranque() for _ in range(repeticiones)]
+
+    def resumen(clave):
+        valores = [m[clave] for m in medidas]
+        return f"mediana {statistics.median(valores):.3f} s | mín {min(valores):.3f} s | máx {max(valores):.3f} s"
+
+    print(f"Arranque en frío ({repeticiones} repeticiones)")
+    print(f"  Primer pintado de la ventana:   {resumen('primerPintado')}")
+    print(f"  Importar MainWindowCtrl:        {resumen('importCtrl')}")
+    print(f"  Precarga en segundo plano lista: {resumen('precargaCompleta')}")
+    print("  Módulos precargados (última repetición):")
+    for nombre, segundos in medidas[-1]["tiemposPrecarga"].items():
+        print(f"    {nombre:<28} {segundos:.3f} s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
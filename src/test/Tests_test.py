@@ -4,10 +4,29 @@ import numpy as np
 import os
 import pickle as pk
 import sys
+import subprocess
 # Añade la carpeta raíz del proyecto al sistema de rutas
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-from src.Backend.ProcesadoDatos import crearAjustarModelo
-from src.Backend.GestionDatos import crearDiccionarioModelo, crearModeloDisco
+from src.Backend.ProcesadoDatos import crearAjustarModelo, entrenarTodosLosModelos, generarParticionesCV, validacionCruzada
+from src.Backend.ProcesadoDatos import configuracionModelos, anadirValidacionCruzada
+from src.Backend.GestionDatos import crearDiccionarioModelo, crearModeloDisco, cargarModeloDisco, leerCabeceraModelo
+from src.Backend.GestionDatos import cargaColumnasNumericas, transformarColumnaBinariaAuto
+from src.Backend.ImportacionDatos import cargarDatos, compactarTipos
+from src.Backend import CacheDatos
+from src.Backend import BusquedaHiperparametros
+from src.Backend.PrediccionLotes import predecirArchivo
+from src.Backend.Submuestreo import submuestrear
+from src.Backend import SuperficieModelo
+from src.Backend import RegistroModelos, ArtefactoModelo
+from src.Backend.PuntuadorLineal import obtenerPuntuador
+from src.Backend.PreprocesamientoDatos import aplicarPreprocesadoCalcular
+from src.Backend.HistorialPreprocesado import HistorialPreprocesado
+from src.Backend.TransformadoresPreprocesado import PipelinePreprocesado, ImputadorNan
+from src.Backend.CuantilesAproximados import SketchKLL, EstimadorCuantiles
+from src.Backend.PerfilColumnas import perfilarDataFrame
+from src.Backend.EntrenamientoIncremental import entrenarPorBloques
+from src.UI.UtilidadesInterfaz import PandasModelConColor
+from src.UI.GestorTrabajos import GestorTrabajos, Trabajo
 
 # FIXTURES (Datos de Prueba)
 
@@ -37,6 +56,29 @@ def rutaModelo(tmp_path):
     """Ruta temporal para pruebas de guardado."""
     return os.path.join(tmp_path, "modelo_test.pkl")
 
+def esperarQt(app, condicion, segundos=30):
+    """Procesa eventos de Qt hasta que se cumpla `condicion` (o se agote el tiempo)."""
+    import time
+    limite = time.time() + segundos
+    while not condicion() and time.time() < limite:
+        app.processEvents()
+        time.sleep(0.01)
+    return condicion()
+
+
+@pt.fixture
+def appQt():
+    """QApplication para las pruebas de la interfaz (en CI se ejecutan con xvfb)."""
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import Qt
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance()
+    if app is None:
+        QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+        app = QApplication([])
+    return app
+
 
 # TESTS DE MODELADO
 
@@ -182,8 +224,7 @@ def test_GuardarCargarModelo(dfRegresion, rutaModelo):
     assert os.path.exists(rutaModelo)
 
     # 4. Cargar y verificar integridad
-    with open(rutaModelo, 'rb') as f:
-        modeloCargado = pk.load(f)
+    modeloCargado = cargarModeloDisco(rutaModelo)
     
     assert modeloCargado['columnasEntrada'] == colEntrada
     assert modeloCargado['formula'] is not None
@@ -231,4 +272,891 @@ def test_Escenario_Binario_Hibrido(dfClasificacion):
     assert isinstance(r2Train, float), "La Lineal debe devolver R2 (float) incluso con datos 0 y 1"
     assert isinstance(accTrainLin, str), "La Lineal debe decir 'No compatible' al accuracy"
     
-    print("\n¡ÉXITO! El backend soporta tratar datos binarios (0/1) como Clasificación Y como Regresión.")
\ No newline at end of file
+    print("\n¡ÉXITO! El backend soporta tratar datos binarios (0/1) como Clasificación Y como Regresión.")
+
+
+def test_EntrenarTodosLosModelos(dfClasificacion, monkeypatch):
+    """
+    La comparativa debe entrenar todos los modelos sobre el mismo split, con
+    tiempos medidos y ordenada por puntuación dentro de cada tipo (R² y Accuracy
+    no se comparan entre sí). Un modelo que falla no cancela a los demás.
+    """
+    dfTrain = dfClasificacion.iloc[::2]
+    dfTest = dfClasificacion.iloc[1::2]
+
+    tabla = entrenarTodosLosModelos(dfTrain, dfTest, ['Entrada'], 'Salida', nJobs=2)
+
+    assert set(tabla["Modelo"]) == set(modelos_regresion + modelos_clasificacion)
+    # Salida 0/1: los clasificadores van juntos y ordenados entre sí, y los regresores igual
+    tipos = tabla["Tipo"].tolist()
+    assert tipos == sorted(tipos) and set(tipos) == {"Regresión", "Clasificación"}
+    for _, grupo in tabla.groupby("Tipo"):
+        assert grupo["Puntuación"].is_monotonic_decreasing
+    assert (tabla["Estado"] == "OK").all()
+    assert (tabla["Tiempo ajuste (s)"] >= 0).all()
+
+    lineal = tabla.set_index("Modelo").loc["Regresión Lineal"]
+    assert lineal["Tipo"] == "Regresión"
+    assert np.isnan(lineal["Accuracy Test"]) and lineal["Puntuación"] == lineal["R² Test"]
+
+    def falla(*args, **kwargs):
+        raise TypeError("entrada categórica")
+    monkeypatch.setitem(configuracionModelos["KNN"], "funcion", falla)
+    tabla = entrenarTodosLosModelos(dfTrain, dfTest, ['Entrada'], 'Salida', nJobs=1).set_index("Modelo")
+    assert tabla.loc["KNN", "Estado"].startswith("Error: TypeError")
+    assert np.isnan(tabla.loc["KNN", "Puntuación"]) and tabla.loc["SVR", "Estado"] == "OK"
+
+
+def test_ValidacionCruzada(dfClasificacion):
+    """
+    Los pliegues deben ser reproducibles con la misma semilla y cubrir cada fila
+    una vez por repetición; el resumen debe dar media y desviación por modelo.
+    """
+    y = dfClasificacion['Salida']
+    pliegues = generarParticionesCV(y, nPliegues=5, nRepeticiones=2, estratificado=True)
+    assert len(pliegues) == 10
+    assert all(np.array_equal(a[1], b[1]) for a, b in zip(pliegues, generarParticionesCV(y, 5, 2, True)))
+    assert sorted(np.concatenate([test for _, test in pliegues[:5]])) == list(range(len(y)))
+
+    resumen = validacionCruzada(dfClasificacion, ['Entrada'], 'Salida',
+                                ["Regresión Lineal", "Árbol de Decisión (Clasif)"], nPliegues=5, nJobs=2)
+    resumen = resumen.set_index("Modelo")
+
+    assert resumen.loc["Regresión Lineal", "Pliegues"] == 5
+    assert not np.isnan(resumen.loc["Regresión Lineal", "R² media"])
+    assert np.isnan(resumen.loc["Regresión Lineal", "Accuracy media"])
+    assert resumen.loc["Árbol de Decisión (Clasif)", "Accuracy media"] > 0.8
+    assert resumen.loc["Árbol de Decisión (Clasif)", "Accuracy desv"] >= 0
+
+
+def test_ValidacionCruzada_TodosLosModelos(dfRegresion):
+    """
+    Con todos los modelos y una salida continua, los clasificadores se omiten
+    en lugar de hacer fallar la validación, y las columnas de CV se añaden a la
+    tabla comparativa.
+    """
+    resumen = validacionCruzada(dfRegresion, ['Entrada'], 'Salida', list(configuracionModelos), nPliegues=3, nJobs=1)
+    assert set(resumen["Modelo"]) == {n for n, c in configuracionModelos.items() if c["tipo"] == "regresion"}
+    with pt.raises(ValueError):
+        validacionCruzada(dfRegresion, ['Entrada'], 'Salida', ["KNN (Clasificación)"], nPliegues=3, nJobs=1)
+
+    dfTrain, dfTest = dfRegresion.iloc[::2], dfRegresion.iloc[1::2]
+    tabla = anadirValidacionCruzada(entrenarTodosLosModelos(dfTrain, dfTest, ['Entrada'], 'Salida', nJobs=1),
+                                    dfRegresion, ['Entrada'], 'Salida', nPliegues=3, nJobs=1)
+    lineal = tabla.set_index("Modelo").loc["Regresión Lineal"]
+    assert lineal["CV media"] == pt.approx(1.0) and lineal["CV desv"] == pt.approx(0.0, abs=1e-9)
+
+
+@pt.mark.parametrize("estrategia", BusquedaHiperparametros.estrategiasBusqueda)
+def test_BusquedaHiperparametros(estrategia):
+    """
+    La búsqueda debe devolver los mejores parámetros del espacio, y el mejor
+    estimador debe poder entrenarse con el pipeline normal.
+    """
+    x = np.linspace(0, 10, 120)
+    dfTrain = pd.DataFrame({'Entrada': x, 'Salida': np.sin(x)})
+    espacio = {"max_depth": [1, 6], "min_samples_leaf": [1, 50]}
+
+    busqueda = BusquedaHiperparametros.buscarHiperparametros(
+        dfTrain, ['Entrada'], 'Salida', "Árbol de Decisión", estrategia,
+        nCandidatos=4, espacio=espacio, factorReduccion=2, nJobs=2)
+
+    assert busqueda["mejoresParametros"] == {"max_depth": 6, "min_samples_leaf": 1}
+    assert busqueda["metrica"] == "R²" and not busqueda["presupuestoAgotado"]
+
+    estimador = BusquedaHiperparametros.crearMejorEstimador(busqueda)
+    modelo = crearAjustarModelo(dfTrain, dfTrain, ['Entrada'], 'Salida', "Árbol de Decisión", estimador)[4]
+    assert modelo.get_params()["max_depth"] == 6
+
+
+# ==========================================
+# TESTS DE IMPORTACIÓN DE DATOS
+# ==========================================
+
+@pt.fixture
+def rutaCsvGrande(tmp_path):
+    """CSV de 10.000 filas para probar la carga por bloques."""
+    ruta = os.path.join(tmp_path, "grande.csv")
+    x = np.arange(10_000)
+    pd.DataFrame({'Entrada': x, 'Salida': 2 * x + 1}).to_csv(ruta, index=False)
+    return ruta
+
+def test_CargaPorBloques(rutaCsvGrande):
+    """
+    La carga por bloques debe ofrecer el primer bloque al instante y,
+    al terminar, el mismo DataFrame que la carga completa.
+    """
+    carga = cargarDatos(rutaCsvGrande, porBloques=True, tamBloque=1000)
+
+    assert len(carga.previsualizacion) == 1000
+    dfCompleto = carga.resultado(timeout=10)
+    pd.testing.assert_frame_equal(dfCompleto, cargarDatos(rutaCsvGrande))
+    assert carga.progreso == pt.approx(1.0)
+    assert not carga.truncado
+
+def test_CargaPorBloques_LimiteMemoria(rutaCsvGrande):
+    """Si se supera el presupuesto de memoria la carga se detiene y lo indica."""
+    carga = cargarDatos(rutaCsvGrande, porBloques=True, tamBloque=1000, limiteMemoriaMB=0.05)
+
+    dfParcial = carga.resultado(timeout=10)
+    assert carga.truncado
+    assert 0 < len(dfParcial) < 10_000
+
+def test_CacheDatos_IdaYVuelta(tmp_path):
+    """
+    Un dataset guardado en caché debe recuperarse idéntico, con las columnas
+    numéricas mapeadas en memoria, y la política LRU debe respetar el límite.
+    """
+    directorio = os.path.join(tmp_path, "cache")
+    ruta = os.path.join(tmp_path, "datos.csv")
+    df = pd.DataFrame({'Entrada': np.arange(1000, dtype=float),
+                       'Texto': ['a', 'b'] * 500,
+                       'Categoria': pd.Categorical(['x', 'y'] * 500),
+                       'Entero': pd.array([1, None] * 500, dtype="Int64"),
+                       'Cadena': pd.array(['p', None] * 500, dtype="string"),
+                       'Logico': pd.array([True, None] * 500, dtype="boolean")})
+    df.to_csv(ruta, index=False)
+
+    assert CacheDatos.cargarDesdeCache(ruta, directorio) is None
+    assert CacheDatos.guardarEnCache(ruta, df, directorio) is not None
+
+    dfCache = CacheDatos.cargarDesdeCache(ruta, directorio)
+    pd.testing.assert_frame_equal(dfCache, df, check_dtype=False)
+    assert str(dfCache['Categoria'].dtype) == 'category'
+    # Los tipos extendidos vuelven con su tipo, no como object
+    assert (dfCache[['Entero', 'Cadena', 'Logico']].dtypes == df[['Entero', 'Cadena', 'Logico']].dtypes).all()
+    assert pd.api.types.is_numeric_dtype(dfCache['Entero'])
+
+    # La carga compactada se guarda aparte y conserva sus attrs (el informe de compactación)
+    assert CacheDatos.cargarDesdeCache(ruta, directorio, variante="compacto") is None
+    dfCompacto, informe = compactarTipos(df.copy())
+    dfCompacto.attrs["informeCompactacion"] = informe
+    CacheDatos.guardarEnCache(ruta, dfCompacto, directorio, variante="compacto")
+    assert CacheDatos.cargarDesdeCache(ruta, directorio, variante="compacto").attrs["informeCompactacion"] == informe
+    assert CacheDatos.cargarDesdeCache(ruta, directorio)['Texto'].dtype == object
+
+    # Nombres de columna que no son texto (o repetidos) vuelven tal cual
+    dfNombres = pd.DataFrame(np.arange(30.0).reshape(10, 3), columns=[0, 1.5, 'Entrada'])
+    dfNombres[('a', 1)] = 'x'
+    dfNombres = pd.concat([dfNombres, dfNombres[['Entrada']]], axis=1)
+    CacheDatos.guardarEnCache(ruta, dfNombres, directorio, variante="nombres")
+    pd.testing.assert_frame_equal(CacheDatos.cargarDesdeCache(ruta, directorio, variante="nombres"), dfNombres)
+
+    # Un fallo de la caché no interrumpe la carga, pero se avisa
+    rutaNoDirectorio = os.path.join(tmp_path, "no_es_carpeta")
+    open(rutaNoDirectorio, 'w').close()
+    with pt.warns(RuntimeWarning, match="caché"):
+        assert CacheDatos.guardarEnCache(ruta, df, rutaNoDirectorio) is None
+
+    # Un límite de 0 MB expulsa todas las entradas
+    CacheDatos.aplicarLimiteCache(directorio, limiteMB=0)
+    assert not CacheDatos.estaEnCache(ruta, directorio)
+
+def test_CompactarTipos():
+    """
+    La carga compacta debe reducir memoria sin perder valores: enteros pequeños,
+    decimales exactos en float32, texto numérico y texto repetido como category.
+    """
+    n = 5000
+    df = pd.DataFrame({'Entero': np.arange(n) % 100,
+                       'Decimal': (np.arange(n) % 8) * 0.5,
+                       'DecimalPreciso': np.linspace(0, 1, n),
+                       'TextoNumerico': [str(i) for i in range(n)],
+                       'Sexo': ['M', 'F'] * (n // 2)})
+    original = df.copy()
+
+    dfCompacto, informe = compactarTipos(df)
+
+    assert dfCompacto['Entero'].dtype == np.int8
+    assert dfCompacto['Decimal'].dtype == np.float32
+    assert dfCompacto['DecimalPreciso'].dtype == np.float64, "No debe perderse precisión"
+    assert pd.api.types.is_integer_dtype(dfCompacto['TextoNumerico'])
+    assert str(dfCompacto['Sexo'].dtype) == 'category'
+    assert informe['memoriaDespuesMB'] < informe['memoriaAntesMB']
+    assert (dfCompacto['Entero'] == original['Entero']).all()
+    assert (dfCompacto['Sexo'].astype(str) == original['Sexo']).all()
+
+
+def test_PredecirArchivo(dfRegresion, rutaModelo, rutaCsvGrande, tmp_path):
+    """
+    La predicción por lotes de un modelo guardado debe dar lo mismo que
+    predecir el archivo entero de una vez, escrito en el mismo orden.
+    """
+    _, _, _, _, modelo, _, _, r2Train, r2Test, ecmTrain, ecmTest, _, _, _ = crearAjustarModelo(
+        dfRegresion, dfRegresion, ['Entrada'], 'Salida', "Regresión Lineal")
+    crearModeloDisco(crearDiccionarioModelo(modelo, ['Entrada'], 'Salida', r2Train, r2Test,
+                                            ecmTrain, ecmTest, "", None), rutaModelo)
+
+    rutaSalida = os.path.join(tmp_path, "predicciones.csv")
+    progresos = []
+    filas = predecirArchivo(rutaModelo, rutaCsvGrande, rutaSalida, tamBloque=1000, nJobs=2,
+                            callbackProgreso=lambda fraccion, escritas: progresos.append(escritas))
+
+    entrada = pd.read_csv(rutaCsvGrande)
+    salida = pd.read_csv(rutaSalida)
+    assert filas == len(entrada) == len(salida)
+    assert progresos[-1] == filas and len(progresos) == 10
+    pd.testing.assert_series_equal(salida['Entrada'], entrada['Entrada'])
+    np.testing.assert_allclose(salida['prediccion_Salida'], modelo.predict(entrada[['Entrada']]))
+
+
+def test_CliSinQt(rutaCsvGrande, tmp_path):
+    """
+    La línea de comandos debe entrenar, guardar y predecir sin importar PyQt6.
+    """
+    rutaSrc = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    rutaModelo = os.path.join(tmp_path, "cli.pkl")
+    rutaSalida = os.path.join(tmp_path, "cli_pred.csv")
+    codigo = (
+        "import sys; import cli\n"
+        f"assert cli.main(['entrenar', {rutaCsvGrande!r}, '--entrada', 'Entrada', '--salida', 'Salida',"
+        f" '--modelo', 'Regresión Lineal', '--guardar', {rutaModelo!r}]) == 0\n"
+        f"assert cli.main(['predecir', {rutaModelo!r}, {rutaCsvGrande!r}, {rutaSalida!r}]) == 0\n"
+        "assert not any(m.startswith('PyQt6') for m in sys.modules), 'La CLI ha importado Qt'\n"
+    )
+    resultado = subprocess.run([sys.executable, "-c", codigo], cwd=rutaSrc, capture_output=True, text=True, timeout=120)
+
+    assert resultado.returncode == 0, resultado.stderr
+    assert "R² Test" in resultado.stdout
+    assert len(pd.read_csv(rutaSalida)) == 10_000
+
+
+def test_ImportacionDiferida():
+    """
+    Importar el Backend no debe cargar scikit-learn hasta que se use un modelo.
+    """
+    rutaSrc = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    codigo = (
+        "import sys\n"
+        "from Backend import ProcesadoDatos, BusquedaHiperparametros\n"
+        "assert 'sklearn' not in sys.modules, 'sklearn importado al cargar el Backend'\n"
+        "ProcesadoDatos.crearEstimador('KNN')\n"
+        "assert 'sklearn.neighbors' in sys.modules\n"
+    )
+    resultado = subprocess.run([sys.executable, "-c", codigo], cwd=rutaSrc, capture_output=True, text=True, timeout=60)
+    assert resultado.returncode == 0, resultado.stderr
+
+
+
+def test_Submuestreo():
+    """
+    La submuestra respeta el presupuesto, conserva extremos y atípicos,
+    es reproducible y al restringir el rango solo devuelve puntos visibles.
+    """
+    rng = np.random.default_rng(0)
+    n = 200_000
+    x = np.concatenate([rng.normal(0, 1, n - 3), [40.0, 0.0, -35.0]])
+    y = np.concatenate([rng.normal(0, 1, n - 3), [0.0, 50.0, 0.0]])
+    y[10] = np.nan
+
+    indices = submuestrear([x, y], maxPuntos=5_000)
+    assert len(indices) <= 5_000
+    assert {n - 3, n - 2, n - 1} <= set(indices)
+    assert 10 not in indices
+    assert np.array_equal(indices, submuestrear([x, y], maxPuntos=5_000))
+
+    rango = [(0.0, 0.5), (0.0, 0.5)]
+    indicesZoom = submuestrear([x, y], maxPuntos=5_000, rango=rango)
+    assert len(indicesZoom) == 5_000
+    assert ((x[indicesZoom] >= 0) & (x[indicesZoom] <= 0.5) & (y[indicesZoom] >= 0) & (y[indicesZoom] <= 0.5)).all()
+
+    # Con pocos puntos no se descarta nada
+    assert len(submuestrear([x[:100], y[:100]], maxPuntos=5_000)) == 99
+
+
+def test_SuperficieModelo_AdaptativaYCacheada():
+    """
+    La línea de un árbol se refina alrededor de los saltos, coincide con predict
+    y la segunda evaluación sale de la caché hasta que se invalida.
+    """
+    from sklearn.tree import DecisionTreeRegressor
+
+    class ArbolContador(DecisionTreeRegressor):
+        llamadas = 0
+
+        def predict(self, X, check_input=True):
+            ArbolContador.llamadas += 1
+            return super().predict(X, check_input)
+
+    x = np.linspace(0, 10, 200)
+    modelo = ArbolContador(max_depth=3).fit(pd.DataFrame({'Entrada': x}), np.floor(x))
+
+    xLinea, yLinea = SuperficieModelo.evaluarLinea(modelo, 'Entrada', -1, 11, puntosIniciales=32)
+    assert len(xLinea) > 32
+    assert np.all(np.diff(xLinea) > 0)
+    assert np.allclose(yLinea, DecisionTreeRegressor.predict(modelo, pd.DataFrame({'Entrada': xLinea})))
+
+    llamadas = ArbolContador.llamadas
+    xCache, _ = SuperficieModelo.evaluarLinea(modelo, 'Entrada', -1, 11, puntosIniciales=32)
+    assert xCache is xLinea
+    assert ArbolContador.llamadas == llamadas
+
+    SuperficieModelo.invalidarCacheSuperficie()
+    SuperficieModelo.evaluarLinea(modelo, 'Entrada', -1, 11, puntosIniciales=32)
+    assert ArbolContador.llamadas > llamadas
+
+
+def test_ArtefactoModelo_CabeceraYLegado(dfClasificacion, tmp_path, monkeypatch):
+    """
+    La cabecera se lee sin deserializar el estimador, los arrays grandes salen
+    fuera del pickle y los .pkl del formato antiguo se siguen pudiendo cargar.
+    """
+    n = 50_000
+    df = pd.DataFrame({'Entrada': np.linspace(0, 10, n), 'Salida': (np.linspace(0, 10, n) > 5).astype(int)})
+    (_, _, _, _, modelo, _, _, r2Tr, r2Te, ecmTr, ecmTe, _, _, _) = crearAjustarModelo(df, df, ['Entrada'], 'Salida', "KNN")
+    dicSalida = {'No': 0, 'Sí': 1}
+    dictModelo = crearDiccionarioModelo(modelo, ['Entrada'], 'Salida', r2Tr, r2Te, ecmTr, ecmTe, "KNN grande", dicSalida)
+
+    ruta = str(tmp_path / "knn.pkl")
+    assert crearModeloDisco(dictModelo, ruta) is None
+    # Los permisos son los de un archivo normal (umask), no los 0600 del temporal
+    if os.name == "posix":
+        referencia = tmp_path / "referencia"
+        referencia.write_bytes(b"")
+        assert os.stat(ruta).st_mode & 0o777 == os.stat(referencia).st_mode & 0o777
+        # Al sobrescribir se conservan los permisos del modelo anterior
+        os.chmod(ruta, 0o640)
+        assert crearModeloDisco(dictModelo, ruta) is None
+        assert os.stat(ruta).st_mode & 0o777 == 0o640
+
+    cabecera = leerCabeceraModelo(ruta)
+    assert "modelo" not in cabecera
+    assert cabecera['columnasEntrada'] == ['Entrada']
+    assert cabecera['dicColumnaSalida'] == dicSalida
+    assert cabecera['descripcion'] == "KNN grande"
+    assert cabecera['tipoEstimador'] == type(modelo).__name__
+
+    cargado = cargarModeloDisco(ruta)
+    entrada = pd.DataFrame({'Entrada': [1.0, 9.0]})
+    assert list(cargado['modelo'].predict(entrada)) == list(modelo.predict(entrada))
+    assert cargado['metricas'] == dictModelo['metricas']
+    # Sin proyección (como en Windows) se puede volver a guardar sobre la ruta del modelo cargado
+    monkeypatch.setattr(ArtefactoModelo, "_proyectarBuffers", False)
+    cargado = cargarModeloDisco(ruta)
+    assert crearModeloDisco(cargado, ruta) is None
+    assert list(cargado['modelo'].predict(entrada)) == list(modelo.predict(entrada))
+    assert list(cargarModeloDisco(ruta)['modelo'].predict(entrada)) == list(modelo.predict(entrada))
+
+    rutaAntigua = str(tmp_path / "antiguo.pkl")
+    with open(rutaAntigua, 'wb') as f:
+        pk.dump(dictModelo, f)
+    assert leerCabeceraModelo(rutaAntigua)['formula'] == dictModelo['formula']
+    assert "modelo" not in leerCabeceraModelo(rutaAntigua)
+    # Con conModelo el .pkl antiguo trae ya el estimador; un artefacto nunca lo trae
+    completo = leerCabeceraModelo(rutaAntigua, conModelo=True)
+    assert list(completo['modelo'].predict(entrada)) == list(modelo.predict(entrada))
+    assert "modelo" not in leerCabeceraModelo(ruta, conModelo=True)
+    assert list(cargarModeloDisco(rutaAntigua)['modelo'].predict(entrada)) == list(modelo.predict(entrada))
+
+
+def test_RegistroModelos(dfRegresion, tmp_path, monkeypatch):
+    """
+    Registrar, consultar e indexar modelos solo lee cabeceras: nunca se
+    deserializa un estimador.
+    """
+    rutaRegistro = str(tmp_path / "registro.sqlite")
+    carpeta = tmp_path / "modelos"
+    carpeta.mkdir()
+    (_, _, _, _, modelo, _, _, r2Tr, _, ecmTr, ecmTe, _, _, _) = crearAjustarModelo(
+        dfRegresion, dfRegresion, ['Entrada'], 'Salida', "Regresión Lineal")
+    for nombre, salida, r2Test in [("a", 'Salida', 0.5), ("b", 'Salida', 0.9), ("c", 'Otra', 0.99)]:
+        dictModelo = crearDiccionarioModelo(modelo, ['Entrada'], salida, r2Tr, r2Test, ecmTr, ecmTe, f"modelo {nombre}", None)
+        assert crearModeloDisco(dictModelo, str(carpeta / f"{nombre}.pkl")) is None
+
+    def sinDeserializar(*args, **kwargs):
+        raise AssertionError("Se ha deserializado un estimador")
+    monkeypatch.setattr(ArtefactoModelo.pk, "loads", sinDeserializar)
+
+    RegistroModelos.registrarModelo(str(carpeta / "a.pkl"), rutaRegistro=rutaRegistro)
+    registrados, omitidos = RegistroModelos.indexarCarpeta(str(carpeta), rutaRegistro=rutaRegistro)
+    assert (registrados, omitidos) == (2, [])  # "a" ya estaba registrado y no ha cambiado
+
+    mejor = RegistroModelos.mejorModelo('Salida', rutaRegistro=rutaRegistro)
+    assert mejor['ruta'] == str(carpeta / "b.pkl")
+    assert mejor['columnasEntrada'] == ['Entrada']
+    assert RegistroModelos.columnasSalidaRegistradas(rutaRegistro) == ['Otra', 'Salida']
+    assert list(RegistroModelos.buscarModelos(texto="modelo a", rutaRegistro=rutaRegistro)['descripcion']) == ["modelo a"]
+    assert len(RegistroModelos.buscarModelos(ordenarPor="guardado", rutaRegistro=rutaRegistro)) == 3
+
+    os.remove(carpeta / "c.pkl")
+    assert RegistroModelos.eliminarInexistentes(rutaRegistro) == 1
+    assert RegistroModelos.columnasSalidaRegistradas(rutaRegistro) == ['Salida']
+
+
+@pt.mark.parametrize("nombreModelo", ["Regresión Lineal", "Regresión Logística", "Regresión Logística Binaria"])
+def test_PuntuadorLineal_IgualQueSklearn(dfRegresion, dfClasificacion, nombreModelo):
+    """
+    El puntuador numpy da las mismas predicciones que predict de sklearn,
+    con una fila, un lote o un buffer de float64.
+    """
+    df = dfRegresion if nombreModelo == "Regresión Lineal" else dfClasificacion
+    modelo = crearAjustarModelo(df, df, ['Entrada'], 'Salida', nombreModelo)[4]
+    puntuador = obtenerPuntuador(modelo)
+    assert puntuador is not None
+    assert obtenerPuntuador(modelo) is puntuador
+
+    lote = np.linspace(-2, 12, 57).reshape(-1, 1)
+    esperado = modelo.predict(pd.DataFrame(lote, columns=['Entrada']))
+    np.testing.assert_allclose(puntuador.predecir(lote), esperado)
+    np.testing.assert_allclose(puntuador.predecir(lote.tobytes()), esperado)
+    np.testing.assert_allclose(puntuador.predecir([4.0]), modelo.predict(pd.DataFrame({'Entrada': [4.0]})))
+    if nombreModelo != "Regresión Lineal":
+        np.testing.assert_allclose(puntuador.predecirProbabilidad(lote), modelo.predict_proba(pd.DataFrame(lote, columns=['Entrada'])))
+
+    with pt.raises(ValueError):
+        puntuador.predecir([np.nan])
+    assert obtenerPuntuador(crearAjustarModelo(df, df, ['Entrada'], 'Salida', "KNN")[4]) is None
+
+
+def test_ServidorPrediccion_Localhost(dfRegresion, dfClasificacion, tmp_path):
+    """
+    El servidor responde en localhost, agrupa las peticiones concurrentes en
+    lotes y devuelve lo mismo que predict (etiquetas originales en clasificación).
+    """
+    import json
+    import urllib.request
+    import urllib.error
+    from concurrent.futures import ThreadPoolExecutor
+    from src.Backend.ServidorPrediccion import ServidorPrediccion
+
+    lineal = crearAjustarModelo(dfRegresion, dfRegresion, ['Entrada'], 'Salida', "Regresión Lineal")[4]
+    arbol = crearAjustarModelo(dfRegresion, dfRegresion, ['Entrada'], 'Salida', "Árbol de Decisión")[4]
+    dicSalida = {"no": 0, "si": 1}
+    dfBinario = dfClasificacion.assign(Salida=(dfClasificacion['Salida'] > 0).astype(int))
+    logistica = crearAjustarModelo(dfBinario, dfBinario, ['Entrada'], 'Salida', "Regresión Logística Binaria")[4]
+    rutaLineal = os.path.join(tmp_path, "lineal.pkl")
+    crearModeloDisco(crearDiccionarioModelo(lineal, ['Entrada'], 'Salida', 1, 1, 0, 0, "", None), rutaLineal)
+    servidor = ServidorPrediccion({"lineal": rutaLineal,
+                                   "arbol": crearDiccionarioModelo(arbol, ['Entrada'], 'Salida', 1, 1, 0, 0, "", None),
+                                   "binario": crearDiccionarioModelo(logistica, ['Entrada'], 'Salida', 1, 1, 0, 0, "", dicSalida)},
+                                  puerto=0, esperaMaxMs=50)
+    puerto = servidor.iniciarEnSegundoPlano()
+    url = f"http://127.0.0.1:{puerto}"
+
+    def pedir(ruta, cuerpo=None):
+        datos = None if cuerpo is None else json.dumps(cuerpo).encode()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url + ruta, data=datos), timeout=10) as r:
+                return r.status, json.loads(r.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    try:
+        assert {m["nombre"] for m in pedir("/modelos")[1]["modelos"]} == {"lineal", "arbol", "binario"}
+        valores = [[float(v)] for v in np.linspace(0, 10, 40)]
+        with ThreadPoolExecutor(20) as hilos:
+            respuestas = list(hilos.map(lambda fila: pedir("/predecir/arbol", {"filas": [fila]}), valores))
+        assert all(estado == 200 for estado, _ in respuestas)
+        np.testing.assert_allclose([r["predicciones"][0] for _, r in respuestas],
+                                   arbol.predict(pd.DataFrame(valores, columns=['Entrada'])))
+
+        estado, r = pedir("/predecir/lineal", {"filas": [{"Entrada": 2.0}, {"Entrada": 7.5}]})
+        np.testing.assert_allclose(r["predicciones"], lineal.predict(pd.DataFrame({'Entrada': [2.0, 7.5]})))
+        assert set(pedir("/predecir/binario", {"filas": valores})[1]["predicciones"]) <= {"si", "no"}
+
+        assert pedir("/predecir/nada", {"filas": [[1.0]]})[0] == 404
+        assert pedir("/predecir/lineal", {"filas": [[1.0, 2.0]]})[0] == 400
+        assert pedir("/predecir/lineal", {"filas": [{"Otra": 1.0}]})[0] == 400
+
+        metricas = pedir("/metricas")[1]
+        assert metricas["filasPredichas"] == 40 + 2 + 40
+        # Las 40 peticiones concurrentes al árbol no se han predicho de una en una
+        assert metricas["lotes"] < 40
+        assert metricas["errores"] == 3
+        assert metricas["latenciaMs"]["p50"] is not None
+
+        # Content-Length no numérico o negativo: 400, no un error sin respuesta
+        import socket
+        for longitud in ["abc", "-5"]:
+            with socket.create_connection(("127.0.0.1", puerto), timeout=10) as s:
+                s.sendall(f"POST /predecir/lineal HTTP/1.1\r\nContent-Length: {longitud}\r\n\r\n".encode())
+                assert s.recv(1024).startswith(b"HTTP/1.1 400")
+        # Una cabecera de más de 64 KiB: 431
+        with socket.create_connection(("127.0.0.1", puerto), timeout=10) as s:
+            s.sendall(b"GET /salud HTTP/1.1\r\nX-Larga: " + b"a" * 70_000 + b"\r\n\r\n")
+            assert s.recv(1024).startswith(b"HTTP/1.1 431")
+        # null sin preprocesado que lo rellene: 400 con el nombre de la columna
+        estado, r = pedir("/predecir/lineal", {"filas": [[1.0], [None]]})
+        assert estado == 400 and "Entrada" in r["error"]
+    finally:
+        servidor.detenerSegundoPlano()
+
+
+def test_DespachadorPrediccion_AgrupaPeticiones(dfRegresion):
+    """
+    Las peticiones concurrentes contra un modelo se agrupan en menos llamadas a
+    predict, cada una recibe sus filas, y una petición inválida no hace fallar
+    a las demás de su lote.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from src.Backend.DespachadorPrediccion import DespachadorPrediccion
+
+    arbol = crearAjustarModelo(dfRegresion, dfRegresion, ['Entrada'], 'Salida', "Árbol de Decisión")[4]
+    lineal = crearAjustarModelo(dfRegresion, dfRegresion, ['Entrada'], 'Salida', "Regresión Lineal")[4]
+    despachador = DespachadorPrediccion(maxLote=64, esperaMaxMs=20)
+    valores = np.linspace(0, 10, 200)
+    with ThreadPoolExecutor(16) as hilos:
+        resultados = list(hilos.map(lambda v: despachador.predecir(arbol, [[v]], ['Entrada']), valores))
+    np.testing.assert_allclose(np.concatenate(resultados), arbol.predict(pd.DataFrame({'Entrada': valores})))
+    estadisticas = despachador.estadisticas()
+    assert estadisticas["peticiones"] == estadisticas["filas"] == 200
+    assert estadisticas["lotes"] < 200
+
+    # DataFrame de entrada y modelo lineal (puntuador numpy)
+    np.testing.assert_allclose(despachador.predecir(lineal, dfRegresion[['Entrada']]), lineal.predict(dfRegresion[['Entrada']]))
+    futuros = [despachador.enviar(lineal, [[1.0]], ['Entrada']), despachador.enviar(lineal, [[np.nan]], ['Entrada']),
+               despachador.enviar(lineal, [[2.0]], ['Entrada'])]
+    with pt.raises(ValueError):
+        futuros[1].result(5)
+    np.testing.assert_allclose([futuros[0].result(5)[0], futuros[2].result(5)[0]],
+                               lineal.predict(pd.DataFrame({'Entrada': [1.0, 2.0]})))
+
+
+@pt.mark.parametrize("opcion, metodo", [("Rellenar con la media (Numpy)", "mean"), ("Rellenar con la mediana", "median"),
+                                        ("Rellenar con un valor constante", None), ("Eliminar filas con NaN", None)])
+def test_Preprocesado_Vectorizado(opcion, metodo):
+    """
+    La imputación por bloques da lo mismo que rellenar columna a columna,
+    conserva el orden y los tipos de las columnas y no modifica el original.
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'a': rng.random(500), 'b': rng.random(500).astype(np.float32), 'n': rng.integers(0, 5, 500),
+                       'texto': rng.choice(['x', 'y'], 500), 'vacia': np.nan, 'Salida': rng.random(500), 'otra': 1.0})
+    for col in ['a', 'b', 'Salida']:
+        df.loc[rng.random(500) < 0.1, col] = np.nan
+    original = df.copy()
+    entrada = ['a', 'b', 'n', 'texto', 'vacia']
+
+    resultado, _, columnas = aplicarPreprocesadoCalcular(entrada, 'Salida', df, opcion, 2.5)
+
+    pd.testing.assert_frame_equal(df, original)
+    assert list(resultado.columns) == columnas == entrada + ['Salida']
+    if metodo is None and opcion.startswith("Eliminar"):
+        esperado = df[columnas].dropna(ignore_index=True)
+    else:
+        esperado = df[columnas].copy()
+        for col in ['a', 'b', 'Salida']:
+            esperado[col] = esperado[col].fillna(getattr(esperado[col], metodo)() if metodo else 2.5)
+        if metodo is None:
+            esperado['vacia'] = 2.5
+    pd.testing.assert_frame_equal(resultado, esperado, rtol=1e-5)
+
+
+def test_HistorialPreprocesado_DeshacerRehacerReproducir():
+    """
+    Los pasos encadenados dan lo mismo que aplicarlos uno tras otro, deshacer y
+    rehacer recuperan cada estado, y solo se guardan las columnas modificadas.
+    """
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({f'c{i}': rng.random(400) for i in range(8)}).assign(Salida=rng.random(400))
+    for col in ['c0', 'c1', 'Salida']:
+        df.loc[rng.random(400) < 0.15, col] = np.nan
+    original = df.copy()
+    historial = HistorialPreprocesado(df)
+
+    historial.aplicar("Eliminar filas con NaN", ['c0'], 'c2')
+    assert historial.bytesModificados() == 0  # eliminar filas no copia columnas
+    historial.aplicar("Rellenar con la mediana", ['c1', 'c3'], 'Salida')
+    # Solo c1 y Salida tenían NaN: son las únicas columnas copiadas
+    assert historial.bytesModificados() == 2 * len(df) * 8
+    for _ in range(5):
+        historial.aplicar("Rellenar con la media (Numpy)", ['c1', 'c3'], 'Salida')
+    assert historial.bytesModificados() == 2 * len(df) * 8
+
+    columnas = ['c1', 'c3', 'Salida']
+    paso1 = aplicarPreprocesadoCalcular(['c0'], 'c2', df, "Eliminar filas con NaN", 0)[0]
+    esperado = aplicarPreprocesadoCalcular(['c1', 'c3'], 'Salida', df.dropna(subset=['c0', 'c2'], ignore_index=True),
+                                           "Rellenar con la mediana", 0)[0]
+    pd.testing.assert_frame_equal(historial.dataFrame(columnas), esperado)
+
+    while historial.puedeDeshacer and len(historial.pasos) > 1:
+        historial.deshacer()
+    pd.testing.assert_frame_equal(historial.dataFrame(['c0', 'c2']), paso1)
+    historial.deshacer()
+    pd.testing.assert_frame_equal(historial.dataFrame(), df)
+    assert historial.rehacer().opcion == "Eliminar filas con NaN"
+    historial.rehacer()
+    pd.testing.assert_frame_equal(historial.dataFrame(columnas), esperado)
+    assert historial.puedeRehacer
+
+    # Un paso nuevo descarta lo que se podía rehacer; reproducir repite los pasos sobre otros datos
+    historial.aplicar("Rellenar con un valor constante", ['c0'], 'c1', 3)
+    assert not historial.puedeRehacer and len(historial.pasos) == 3
+    pd.testing.assert_frame_equal(historial.reproducir(original.copy()).dataFrame(), historial.dataFrame())
+    pd.testing.assert_frame_equal(df, original)
+
+
+def test_PreprocesadoAjustado_GuardadoConElModelo(tmp_path):
+    """
+    Los valores de relleno aprendidos al entrenar se guardan con el modelo y se
+    aplican a los datos nuevos al predecir, sin volver a los de entrenamiento.
+    """
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'x1': rng.random(200), 'x2': rng.random(200) * 10})
+    df['Salida'] = 3 * df['x1'] - df['x2'] + 1
+    df.loc[rng.random(200) < 0.2, 'x1'] = np.nan
+    historial = HistorialPreprocesado(df)
+    historial.aplicar("Rellenar con la mediana", ['x1', 'x2'], 'Salida')
+    dfEntrenamiento = historial.dataFrame(['x1', 'x2', 'Salida'])
+    pipeline = historial.pipeline()
+    mediana = df['x1'].median()
+    assert pipeline.pasos[0].valores['x1'] == pt.approx(mediana)
+    assert pipeline.pasos[0].valores['x2'] == pt.approx(df['x2'].median())
+
+    _, _, _, _, modelo, _, _, r2Train, r2Test, ecmTrain, ecmTest, _, _, _ = crearAjustarModelo(
+        dfEntrenamiento, dfEntrenamiento, ['x1', 'x2'], 'Salida', "Regresión Lineal")
+    rutaModelo = os.path.join(tmp_path, "modelo.pkl")
+    crearModeloDisco(crearDiccionarioModelo(modelo, ['x1', 'x2'], 'Salida', r2Train, r2Test, ecmTrain, ecmTest,
+                                            "", None, pipeline), rutaModelo)
+    assert leerCabeceraModelo(rutaModelo)["preprocesado"] == pipeline.aDiccionario()
+    assert isinstance(cargarModeloDisco(rutaModelo)["preprocesado"], PipelinePreprocesado)
+
+    nuevos = pd.DataFrame({'x1': [0.5, np.nan, 0.1], 'x2': [np.nan, 2.0, 3.0]})
+    rutaEntrada, rutaSalida = os.path.join(tmp_path, "nuevos.csv"), os.path.join(tmp_path, "salida.csv")
+    nuevos.to_csv(rutaEntrada, index=False)
+    predecirArchivo(rutaModelo, rutaEntrada, rutaSalida, nJobs=1)
+
+    salida = pd.read_csv(rutaSalida)
+    rellenos = nuevos.fillna({'x1': mediana, 'x2': df['x2'].median()})
+    np.testing.assert_allclose(salida['prediccion_Salida'], modelo.predict(rellenos))
+    assert salida['x1'].isna().sum() == 1  # las entradas se escriben tal cual
+    matriz = nuevos.to_numpy()
+    np.testing.assert_allclose(pipeline.transformarMatriz(matriz, ['x1', 'x2']), rellenos.to_numpy())
+
+
+def test_PerfilColumnas_UnaPasadaYCache():
+    """
+    El perfil coincide con las operaciones de pandas que sustituye, se calcula
+    una sola vez por DataFrame y se recalcula la columna que cambia de tipo.
+    """
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({'continua': rng.random(100_000), 'binaria': rng.choice(['si', 'no'], 100_000),
+                       'texto': rng.choice(['1.5', '2', 'x'], 100_000), 'numTexto': rng.choice(['1.5', '2'], 100_000),
+                       'entera': rng.integers(0, 7, 100_000)})
+    df.loc[::10, 'continua'] = np.nan
+
+    perfiles = perfilarDataFrame(df)
+    for col, perfil in perfiles.items():
+        assert perfil.nulos == df[col].isna().sum()
+        if perfil.unicosExactos:
+            assert perfil.unicos == df[col].nunique()
+    assert not perfiles['continua'].unicosExactos and perfiles['continua'].unicos > 1000
+    assert perfiles['continua'].minimo == df['continua'].min() and perfiles['continua'].maximo == df['continua'].max()
+    assert perfiles['continua'].cuantiles[0.5] == pt.approx(df['continua'].median(), abs=0.02)
+    assert perfiles['binaria'].esBinaria and not perfiles['binaria'].convertible
+    assert perfiles['numTexto'].convertible and not perfiles['texto'].convertible
+    assert perfilarDataFrame(df)['entera'] is perfiles['entera']  # segunda consulta: de la caché
+
+    assert cargaColumnasNumericas(df) == ['continua', 'numTexto', 'entera']
+    assert pd.api.types.is_float_dtype(df['numTexto'])
+    transformarColumnaBinariaAuto(df, 'binaria')
+    nuevo = perfilarDataFrame(df)['binaria']
+    assert nuevo.numerica and nuevo.esBinaria and nuevo is not perfiles['binaria']
+
+
+def test_CuantilesStreaming_KLLYExactos():
+    """
+    El sketch KLL da cuantiles con error de rango pequeño y memoria acotada,
+    también fusionando sketches de bloques distintos; mientras los datos caben,
+    el estimador da los cuantiles exactos, y la imputación por bloques coincide
+    con la del DataFrame completo.
+    """
+    rng = np.random.default_rng(4)
+    valores = rng.lognormal(size=1_000_000)
+    ordenados = np.sort(valores)
+    probabilidades = [0.01, 0.25, 0.5, 0.75, 0.99]
+
+    a, b = SketchKLL(semilla=0), SketchKLL(semilla=1)
+    for i, bloque in enumerate(np.array_split(valores, 20)):
+        (a if i % 2 else b).actualizar(bloque)
+    a.fusionar(b)
+    assert a.n == len(valores) and a.tamano() < 2000
+    rangos = np.searchsorted(ordenados, a.cuantiles(probabilidades)) / len(valores)
+    np.testing.assert_allclose(rangos, probabilidades, atol=0.02)
+    assert a.cuantil(0) == ordenados[0] and a.cuantil(1) == ordenados[-1]
+
+    estimador = EstimadorCuantiles(maxExacto=len(valores))
+    for bloque in np.array_split(valores, 7):
+        estimador.actualizar(np.append(bloque, np.nan))
+    assert estimador.esExacto
+    np.testing.assert_allclose(estimador.cuantiles(probabilidades), np.quantile(valores, probabilidades))
+    assert not EstimadorCuantiles(maxExacto=1000).actualizar(valores).esExacto
+
+    df = pd.DataFrame({'a': valores[:50_000], 'b': rng.random(50_000), 'texto': 'x'})
+    df.loc[::4, 'a'] = np.nan
+    bloques = [df.iloc[i:i + 4096] for i in range(0, len(df), 4096)]
+    for metodo in ['media', 'mediana']:
+        completo = ImputadorNan(['a', 'b', 'texto'], metodo).ajustar(df).valores
+        assert ImputadorNan(['a', 'b', 'texto'], metodo).ajustarPorBloques(bloques).valores == pt.approx(completo)
+
+
+def test_EntrenamientoPorBloques(tmp_path):
+    """
+    Entrenando por bloques, la regresión lineal es la misma que con todo el
+    archivo en memoria (ecuaciones normales exactas) y da las mismas métricas;
+    la logística (SGD) clasifica bien y el datasplit reparte todas las filas.
+    """
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import r2_score, mean_squared_error
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({'a': rng.normal(size=20_000), 'b': rng.normal(100, 10, size=20_000)})
+    df['y'] = 3 * df['a'] - 0.5 * df['b'] + rng.normal(size=len(df))
+    df['clase'] = np.where(df['a'] - 0.1 * df['b'] > -10, 'alta', 'baja')
+    ruta = os.path.join(tmp_path, "grande.csv")
+    df.to_csv(ruta, index=False)
+    df = pd.read_csv(ruta)
+
+    r = entrenarPorBloques(ruta, ['a', 'b'], 'y', "Regresión Lineal", tamTest=0, tamBloque=3000)
+    referencia = LinearRegression().fit(df[['a', 'b']], df['y'])
+    np.testing.assert_allclose(r['modelo'].coef_, referencia.coef_, rtol=1e-9)
+    assert r['modelo'].intercept_ == pt.approx(referencia.intercept_)
+    prediccion = referencia.predict(df[['a', 'b']])
+    assert r['r2Train'] == pt.approx(r2_score(df['y'], prediccion))
+    assert r['ecmTrain'] == pt.approx(mean_squared_error(df['y'], prediccion))
+    assert r['accTrain'] == "No compatible (Regresion)" and r['filasTrain'] == len(df)
+
+    r = entrenarPorBloques(ruta, ['a', 'b'], 'clase', "Regresión Logística Binaria", tamBloque=3000, epocas=3)
+    assert r['filasTrain'] + r['filasTest'] == len(df) and 0.15 < r['filasTest'] / len(df) < 0.25
+    assert r['accTest'] > 0.95 and r['r2Test'] == "No compatible (Clasificación)"
+    assert list(r['modelo'].predict(df[['a', 'b']].iloc[:5])) == list(obtenerPuntuador(r['modelo']).predecir(df[['a', 'b']].iloc[:5]))
+
+    with pt.raises(ValueError):
+        entrenarPorBloques(ruta, ['a', 'b'], 'y', "SVR")
+
+
+# ==========================================
+# TESTS DE INTERFAZ
+# ==========================================
+
+def test_PandasModelConColor_Virtualizado(appQt):
+    """
+    Con un DataFrame grande la tabla informa de todas las filas pero solo
+    formatea los bloques que se piden, con la caché de bloques acotada.
+    """
+    from PyQt6.QtCore import Qt
+    n = 300_000
+    df = pd.DataFrame({'a': np.arange(n, dtype=float), 'b': np.arange(n), 'c': [f"t{i % 7}" for i in range(n)]})
+    df.loc[::1000, 'a'] = np.nan
+    modelo = PandasModelConColor(df, columna_verde='b', columna_roja='c', tachar_nan=True)
+
+    assert modelo.rowCount() == n and modelo.columnCount() == 3
+    assert len(modelo.cache_bloques) == 0
+    assert modelo.data(modelo.index(n - 1, 1)) == str(n - 1)
+    assert modelo.data(modelo.index(12_345, 2)) == f"t{12_345 % 7}"
+    assert modelo.data(modelo.index(1001, 0)) == "1001.0"
+    assert len(modelo.cache_bloques) == 3
+
+    # NaN tachado y colores de las columnas marcadas
+    assert modelo.data(modelo.index(2000, 0)) == "nan"
+    assert modelo.data(modelo.index(2000, 0), Qt.ItemDataRole.FontRole).strikeOut()
+    assert modelo.data(modelo.index(2001, 0), Qt.ItemDataRole.FontRole) is None
+    assert modelo.data(modelo.index(5, 1), Qt.ItemDataRole.BackgroundRole) is modelo.brush_verde
+    assert modelo.data(modelo.index(5, 2), Qt.ItemDataRole.BackgroundRole) is modelo.brush_rojo
+    assert modelo.data(modelo.index(5, 0), Qt.ItemDataRole.BackgroundRole) is None
+    assert modelo.headerData(2, Qt.Orientation.Horizontal) == 'c'
+
+    # Recorrer toda la tabla no deja más bloques en memoria que el máximo
+    for fila in range(0, n, modelo.tamBloqueFilas):
+        assert modelo.data(modelo.index(fila, 1)) == str(fila)
+    assert len(modelo.cache_bloques) == modelo.maxBloquesCache
+
+
+def test_GestorTrabajos_OrdenYCancelacion(appQt):
+    """
+    Los trabajos se ejecutan de uno en uno en orden de llegada, cada etapa
+    recibe el resultado de la anterior y cancelar aborta el activo (también
+    una etapa en el proceso trabajador) y descarta los pendientes.
+    """
+    import threading
+    import time
+    gestor = GestorTrabajos()
+    eventos = []
+    try:
+        for i in range(3):
+            trabajo = Trabajo(f"trabajo {i}")
+            trabajo.agregarEtapa("inicio", lambda i=i: (eventos.append(f"inicio {i}"), i)[1])
+            trabajo.agregarEtapa("doble", lambda r: r * 2)
+            gestor.encolar(trabajo, alTerminar=lambda r, i=i: eventos.append(f"fin {i}: {r}"))
+        fallido = Trabajo("fallido").agregarEtapa("error", lambda: 1 / 0)
+        gestor.encolar(fallido, alFallar=lambda e: eventos.append(type(e).__name__))
+        assert esperarQt(appQt, lambda: not gestor.estaOcupado())
+        assert eventos == ["inicio 0", "fin 0: 0", "inicio 1", "fin 1: 2", "inicio 2", "fin 2: 4", "ZeroDivisionError"]
+
+        # Un trabajo en un hilo que comprueba la cancelación y dos pendientes
+        eventos.clear()
+        empezado = threading.Event()
+        activo = Trabajo("activo")
+
+        def bucle():
+            empezado.set()
+            while True:
+                activo.notificarProgreso(0.5)
+                time.sleep(0.01)
+        activo.agregarEtapa("bucle", bucle)
+        gestor.encolar(activo, alTerminar=lambda r: eventos.append("fin activo"),
+                       alCancelar=lambda: eventos.append("cancelado activo"))
+        for i in range(2):
+            gestor.encolar(Trabajo(f"pendiente {i}").agregarEtapa("nada", lambda: eventos.append("ejecutado")),
+                           alCancelar=lambda i=i: eventos.append(f"cancelado {i}"))
+        assert esperarQt(appQt, empezado.is_set)
+        gestor.cancelar()
+        assert esperarQt(appQt, lambda: not gestor.estaOcupado())
+        assert eventos == ["cancelado 0", "cancelado 1", "cancelado activo"]
+
+        # Una etapa en el proceso trabajador se interrumpe matando el proceso
+        eventos.clear()
+        enProceso = Trabajo("en proceso").agregarEtapa("durmiendo", time.sleep, 60, enProceso=True)
+        gestor.encolar(enProceso, alCancelar=lambda: eventos.append("cancelado en proceso"))
+        assert esperarQt(appQt, lambda: gestor._pool is not None)
+        inicio = time.time()
+        gestor.cancelar()
+        assert esperarQt(appQt, lambda: not gestor.estaOcupado())
+        assert eventos == ["cancelado en proceso"] and time.time() - inicio < 10
+    finally:
+        gestor.cerrar()
+        esperarQt(appQt, lambda: not gestor.estaOcupado())
+
+
+def test_VisorPlotly_Persistente():
+    """
+    Cada placeholder tiene un único visor web: la figura pedida antes de que
+    cargue la página se dibuja al cargar, una predicción nueva solo envía la
+    traza que cambia y limpiar vacía la gráfica sin destruir la vista.
+    """
+    rutaSrc = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    codigo = (
+        "import sys\n"
+        "from PyQt6.QtCore import Qt\n"
+        "from PyQt6.QtWidgets import QApplication, QWidget\n"
+        "QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)\n"
+        "app = QApplication([])\n"
+        "try:\n"
+        "    import PyQt6.QtWebEngineWidgets\n"
+        "except ImportError as e:\n"
+        "    print('SIN_WEBENGINE', e); sys.exit(0)\n"
+        "import plotly.graph_objects as go\n"
+        "from Backend.PlotGraficas import obtenerVisor, mostrarFigura, limpiarLayout\n"
+        "placeholder = QWidget()\n"
+        "visor = obtenerVisor(placeholder)\n"
+        "assert obtenerVisor(placeholder) is visor\n"
+        "llamadas = []\n"
+        "visor._ejecutar = llamadas.append\n"
+        "datos = go.Scatter(x=[0, 1, 2], y=[1, 3, 5], name='datos')\n"
+        "mostrarFigura(go.Figure([datos]), placeholder)\n"
+        "assert llamadas == []\n"
+        "visor._alCargar(True)\n"
+        "assert len(llamadas) == 1 and llamadas[0].startswith('dibujar(')\n"
+        "mostrarFigura(go.Figure([datos, go.Scatter(x=[1.5], y=[4], name='prediccion')]), placeholder)\n"
+        "assert len(llamadas) == 2 and llamadas[1].startswith('actualizarTrazas([], [')\n"
+        "assert 'prediccion' in llamadas[1] and 'datos' not in llamadas[1]\n"
+        "limpiarLayout(placeholder)\n"
+        "assert llamadas[-1] == 'limpiar();' and obtenerVisor(placeholder) is visor\n"
+    )
+    entorno = dict(os.environ)
+    if sys.platform.startswith("linux") and not entorno.get("DISPLAY"):
+        entorno.setdefault("QT_QPA_PLATFORM", "offscreen")
+    resultado = subprocess.run([sys.executable, "-c", codigo], cwd=rutaSrc, env=entorno,
+                               capture_output=True, text=True, timeout=120)
+    assert resultado.returncode == 0, resultado.stderr
+    if "SIN_WEBENGINE" in resultado.stdout:
+        pt.skip(f"QtWebEngine no disponible: {resultado.stdout.strip()}")